@@ -63,5 +63,15 @@ def create_app(config_class=Config):
 
     from app.search import search as search_blueprint
     app.register_blueprint(search_blueprint)
+
+    from app.analytics import analytics as analytics_blueprint
+    app.register_blueprint(analytics_blueprint)
+
+    # Thumbnails/previews of new evidence, made after commit
+    from app import derivatives  # noqa: F401
+
+    # N+1 guard for tests (SQL_STATEMENT_LIMIT)
+    from app import statement_guard
+    statement_guard.init_app(app)
     
     return app
@@ -0,0 +1,179 @@
+"""
+Station analytics computed over columnar extracts.
+
+Each figure set starts from two narrow SELECTs, one over the station's cases
+and one over its FIRs, restricted to the time window. The database returns
+only ids, timestamps, integer status codes and counters; they are loaded
+into NumPy arrays and every metric (status split, case age distribution,
+monthly trends, evidence density, officer workload) is a vectorised
+reduction over them, not a query or a Python loop per case.
+
+Evidence per case comes from the stored Case.evidence_count counter
+(app/cases/counters.py), so no evidence rows are read. Results are kept per
+(station, window) for ANALYTICS_CACHE_TTL seconds; analytics tolerate that
+staleness, so writes do not invalidate them.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import case, func, select
+
+from app import db
+from app.models import Case, FIR, User
+
+# Selectable time windows: key -> days back from now (None: everything)
+WINDOWS = {'30d': 30, '90d': 90, '1y': 365, 'all': None}
+DEFAULT_WINDOW = '1y'
+# Case status -> code computed in SQL; anything else is OTHER
+STATUSES = ('Open', 'In Progress', 'Closed', 'Court', 'Pending')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+OTHER = len(STATUSES)
+CLOSED = STATUS_CODES['Closed']
+ACTIVE = np.array([STATUS_CODES['Open'], STATUS_CODES['In Progress']])
+# Case age buckets, in hours
+AGE_BUCKETS = (('< 1 day', 0), ('1-7 days', 24), ('7-30 days', 24 * 7),
+               ('30-90 days', 24 * 30), ('> 90 days', 24 * 90))
+TOP_LIMIT = 10
+
+MonthCount = namedtuple('MonthCount', 'month count')
+CaseDensity = namedtuple('CaseDensity', 'case_id incidents evidence_count')
+
+
+class AnalyticsCache:
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        ttl = current_app.config.get('ANALYTICS_CACHE_TTL', 300)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+        if hit is not None and now - hit[1] < ttl:
+            return hit[0]
+        result = compute(*key)
+        if ttl:
+            with self._lock:
+                self._entries[key] = (result, now)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analytics_cache = AnalyticsCache()
+
+
+def _columns(statement, *dtypes):
+    # One array per selected column, in order
+    rows = db.session.execute(statement).all()
+    columns = zip(*rows) if rows else [()] * len(dtypes)
+    return [np.array(column, dtype=dtype) for column, dtype in zip(columns, dtypes)]
+
+
+def _status_code(column):
+    return case(STATUS_CODES, value=column, else_=OTHER)
+
+
+def _extract_cases(station_id, since):
+    statement = select(
+        Case.id,
+        Case.created_at,
+        func.coalesce(Case.incident_date, Case.created_at),
+        _status_code(Case.status),
+        func.coalesce(Case.assigned_officer_id, 0),
+        func.coalesce(Case.evidence_count, 0),
+    ).where(Case.station_id == station_id).order_by(Case.id)
+    if since is not None:
+        statement = statement.where(Case.created_at >= since)
+    return _columns(statement, np.int64, 'datetime64[s]', 'datetime64[s]', np.int64, np.int64, np.int64)
+
+
+def _extract_firs(station_id, since):
+    statement = select(
+        FIR.case_id,
+        FIR.created_at,
+        case((FIR.status == 'Pending', 1), else_=0),
+    ).where(FIR.station_id == station_id)
+    if since is not None:
+        statement = statement.where(FIR.created_at >= since)
+    return _columns(statement, np.int64, 'datetime64[s]', np.int64)
+
+
+def _monthly(timestamps):
+    months = timestamps[~np.isnat(timestamps)].astype('datetime64[M]')
+    labels, counts = np.unique(months, return_counts=True)
+    return [MonthCount(month, int(n))
+            for month, n in zip(np.datetime_as_string(labels, unit='M').tolist(), counts.tolist())]
+
+
+def _per_case(case_ids, keys):
+    # How often each of the sorted ``case_ids`` occurs in ``keys``
+    counts = np.zeros(len(case_ids), dtype=np.int64)
+    found, n = np.unique(keys, return_counts=True)
+    pos = np.searchsorted(case_ids, found)
+    hit = pos < len(case_ids)
+    hit[hit] = case_ids[pos[hit]] == found[hit]
+    counts[pos[hit]] = n[hit]
+    return counts
+
+
+def compute_analytics(station_id, window):
+    now = datetime.utcnow()
+    days = WINDOWS[window]
+    since = now - timedelta(days=days) if days is not None else None
+    case_ids, opened, incident_at, status, officer, evidence = _extract_cases(station_id, since)
+    fir_case_ids, filed, fir_pending = _extract_firs(station_id, since)
+
+    status_counts = np.bincount(status, minlength=OTHER + 1)
+
+    # Age of the cases still open (anything but Closed), in hours
+    not_closed = (status != CLOSED) & ~np.isnat(opened)
+    ages = (np.datetime64(now, 's') - opened[not_closed]).astype(np.float64) / 3600
+    edges = [hours for _, hours in AGE_BUCKETS] + [np.inf]
+    age_histogram, _ = np.histogram(ages, bins=edges)
+
+    # Evidence and incidents (FIRs) per case; the densest cases first
+    incidents = _per_case(case_ids, fir_case_ids)
+    order = np.lexsort((case_ids, -incidents, -evidence))
+    order = order[(evidence[order] > 0) | (incidents[order] > 0)][:TOP_LIMIT]
+
+    # Active cases per lead officer
+    leads = officer[np.isin(status, ACTIVE) & (officer > 0)]
+    officer_ids, loads = np.unique(leads, return_counts=True)
+    busiest = np.lexsort((officer_ids, -loads))[:TOP_LIMIT]
+    names = dict(db.session.execute(
+        select(User.id, User.full_name).where(User.id.in_(officer_ids[busiest].tolist()))
+    ).all()) if len(busiest) else {}
+
+    return {
+        'total_cases': len(case_ids),
+        'open_cases': int(status_counts[STATUS_CODES['Open']]),
+        'in_progress_cases': int(status_counts[STATUS_CODES['In Progress']]),
+        'closed_cases': int(status_counts[CLOSED]),
+        'average_case_age': round(float(ages.mean()), 1) if len(ages) else None,
+        'median_case_age': round(float(np.median(ages)), 1) if len(ages) else None,
+        'age_distribution': [(label, int(n)) for (label, _), n in zip(AGE_BUCKETS, age_histogram.tolist())],
+        'total_records': len(fir_case_ids),
+        'pending_records': int(fir_pending.sum()),
+        'average_evidence': round(float(evidence.mean()), 1) if len(evidence) else 0.0,
+        'case_breakdown': [CaseDensity(int(case_ids[i]), int(incidents[i]), int(evidence[i])) for i in order],
+        'incident_trend': _monthly(incident_at),
+        'fir_counts': _monthly(filed),
+        'officer_workload': [(names.get(int(officer_ids[i]), f'#{officer_ids[i]}'), int(loads[i])) for i in busiest],
+    }
+
+
+def station_analytics(station_id, window=DEFAULT_WINDOW):
+    """
+    Analytics of one station over ``window`` (a WINDOWS key), cached.
+    """
+    if window not in WINDOWS:
+        window = DEFAULT_WINDOW
+    return analytics_cache.get((station_id, window), compute_analytics)
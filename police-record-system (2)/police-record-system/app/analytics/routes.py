@@ -0,0 +1,20 @@
+from flask import abort, render_template, request
+from flask_login import login_required, current_user
+from app.analytics import analytics
+from app.analytics.metrics import DEFAULT_WINDOW, WINDOWS, station_analytics
+
+ANALYTICS_ROLES = ('admin', 'inspector', 'sho')
+
+
+@analytics.route('/analytics')
+@login_required
+def analytics_dashboard():
+    if current_user.role not in ANALYTICS_ROLES:
+        abort(403)
+
+    window = request.args.get('window', DEFAULT_WINDOW)
+    if window not in WINDOWS:
+        window = DEFAULT_WINDOW
+    # Station scoped, computed from columnar extracts and cached per window
+    figures = station_analytics(current_user.station_id, window)
+    return render_template('analytics_dashboard.html', window=window, windows=WINDOWS, **figures)
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 cases = Blueprint('cases', __name__)
 
-from app.cases import routes
+from app.cases import routes, uploads, api
@@ -0,0 +1,81 @@
+"""
+JSON representation of a case, for clients on slow links.
+
+    GET /api/cases/<id>?fields=title,status,participants
+
+``fields`` is a sparse fieldset: any of CASE_FIELDS and COLLECTIONS, comma
+separated. Without it every case field and no collection is returned; only
+the collections asked for are loaded. Responses carry the ETag and
+Last-Modified of app/cases/freshness.py, so revalidating an unchanged case
+is a 304 worked out from the case row alone.
+"""
+from datetime import date, datetime
+
+from flask import abort, jsonify, request, url_for
+from flask_login import login_required
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.cases import cases
+from app.cases.freshness import case_validators, not_modified, not_modified_response, with_validators
+from app.cases.routes import can_view_case
+from app.models import Case
+
+CASE_FIELDS = (
+    'id', 'case_number', 'title', 'offense_type', 'short_description', 'description',
+    'incident_date', 'location', 'gps_coordinates', 'status', 'priority', 'is_cognizable',
+    'ipc_sections', 'court_status', 'verdict', 'confidentiality_level', 'tags', 'related_case_ids',
+    'assigned_officer_id', 'created_by_id', 'created_at', 'updated_at',
+)
+
+# collection -> columns of each item
+COLLECTIONS = {
+    'participants': ('id', 'name', 'type', 'contact_info', 'details', 'dob', 'address', 'national_id', 'status'),
+    'evidence': ('id', 'description', 'type', 'status', 'filename', 'size', 'sha256', 'collected_at'),
+    'firs': ('id', 'fir_number', 'status', 'details', 'created_at'),
+    'tasks': ('id', 'title', 'status', 'priority', 'due_date', 'assigned_to_id', 'completed_at'),
+    'officers': ('id', 'full_name', 'role', 'badge_number'),
+}
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _item(collection, obj):
+    item = {column: _value(getattr(obj, column)) for column in COLLECTIONS[collection]}
+    if collection == 'evidence' and obj.sha256:
+        item['url'] = url_for('cases.evidence_file', evidence_id=obj.id)
+        if obj.thumbnail:
+            item['thumbnail_url'] = url_for('cases.evidence_derivative', evidence_id=obj.id, variant='thumbnail')
+    return item
+
+
+@cases.route('/api/cases/<int:case_id>')
+@login_required
+def case_json(case_id):
+    case = db.session.get(Case, case_id)
+    if case is None:
+        abort(404)
+    if not can_view_case(case):
+        return jsonify({'status': 'error', 'message': 'Access denied'}), 403
+
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(CASE_FIELDS)
+    unknown = [f for f in fields if f not in CASE_FIELDS and f not in COLLECTIONS]
+    if unknown:
+        return jsonify({'status': 'error', 'message': f"Unknown fields: {', '.join(unknown)}",
+                        'fields': list(CASE_FIELDS) + list(COLLECTIONS)}), 400
+
+    validators = case_validators(case, 'json:' + ','.join(fields))
+    if not_modified(validators):
+        return not_modified_response(validators)
+
+    collections = [f for f in fields if f in COLLECTIONS]
+    if collections:
+        Case.query.options(*[selectinload(getattr(Case, c)) for c in collections]).filter_by(id=case.id).one()
+    data = {f: _value(getattr(case, f)) for f in fields if f in CASE_FIELDS}
+    for collection in collections:
+        data[collection] = [_item(collection, obj) for obj in getattr(case, collection)]
+    return with_validators(jsonify(data), validators)
@@ -0,0 +1,174 @@
+"""
+Per-case counters and change stamp, kept up to date on every write.
+
+Case rows carry evidence_count, participant_count and open_task_count, and
+children_updated_at: when any row shown with the case (participant, evidence,
+FIR, task, statement, investigation update, the team) was last written. Lists
+and dashboards read these instead of counting per row; the case page
+validators (app/cases/freshness.py) and Case.last_activity_at use the stamp.
+
+Mapper hooks collect what a flush writes and an after_flush hook applies it
+in the same transaction, with one UPDATE per distinct set of deltas, leaving
+updated_at alone. Bulk statements bypass it, so code issuing them calls
+record_changes itself (see app/cases/sync.py). ``flask repair-case-counters``
+recomputes every counter from the child tables and reports drift.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Case, Evidence, FIR, InvestigationUpdate, Participant, Statement, Task
+
+CHILD_MODELS = (Participant, Evidence, FIR, Task, Statement, InvestigationUpdate)
+COUNTERS = ('evidence_count', 'participant_count', 'open_task_count')
+PENDING_KEY = 'case_changes'
+
+
+def _is_open(task_status):
+    return task_status != 'Completed'
+
+
+def _before(obj, key):
+    # Value at the start of the flush
+    history = inspect(obj).attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(obj, key)
+
+
+def _contribution(obj, task_status=None):
+    if isinstance(obj, Participant):
+        return 'participant_count'
+    if isinstance(obj, Evidence):
+        return 'evidence_count'
+    if isinstance(obj, Task) and _is_open(task_status):
+        return 'open_task_count'
+    return None
+
+
+def record_changes(connection, case_ids, deltas=None):
+    """
+    Stamps children_updated_at on ``case_ids`` and adds ``deltas``
+    ({case_id: {counter: change}}) to their counters, leaving updated_at as is.
+    """
+    deltas = deltas or {}
+    groups = defaultdict(list)
+    for case_id in {i for i in list(case_ids) + list(deltas) if i is not None}:
+        change = tuple(sorted((k, n) for k, n in deltas.get(case_id, {}).items() if n))
+        groups[change].append(case_id)
+
+    table = Case.__table__
+    now = datetime.utcnow()
+    for change, ids in groups.items():
+        values = {'children_updated_at': now, 'updated_at': table.c.updated_at}
+        values.update({k: table.c[k] + n for k, n in change})
+        connection.execute(update(table).where(table.c.id.in_(sorted(ids))).values(**values))
+
+
+def _pending(session):
+    # (touched case ids, {case_id: Counter}) of the flush in progress
+    return session.info.setdefault(PENDING_KEY, (set(), defaultdict(Counter)))
+
+
+def _on_insert(mapper, connection, target):
+    touched, deltas = _pending(object_session(target))
+    touched.add(target.case_id)
+    counter = _contribution(target, getattr(target, 'status', None))
+    if counter:
+        deltas[target.case_id][counter] += 1
+
+
+def _on_update(mapper, connection, target):
+    session = object_session(target)
+    if not session.is_modified(target, include_collections=False):
+        return
+    # Possibly moved to another case, or a task opened/closed
+    touched, deltas = _pending(session)
+    old_case, new_case = _before(target, 'case_id'), target.case_id
+    touched.update((old_case, new_case))
+    is_task = isinstance(target, Task)
+    old = _contribution(target, _before(target, 'status') if is_task else None)
+    new = _contribution(target, target.status if is_task else None)
+    if old:
+        deltas[old_case][old] -= 1
+    if new:
+        deltas[new_case][new] += 1
+
+
+def _on_delete(mapper, connection, target):
+    # Also fires for delete-orphans, which never show up in session.deleted
+    touched, deltas = _pending(object_session(target))
+    case_id = _before(target, 'case_id')
+    touched.add(case_id)
+    counter = _contribution(target, _before(target, 'status') if isinstance(target, Task) else None)
+    if counter:
+        deltas[case_id][counter] -= 1
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for model in CHILD_MODELS:
+    event.listen(model, 'after_insert', _on_insert)
+    event.listen(model, 'after_update', _on_update)
+    event.listen(model, 'after_delete', _on_delete)
+    # Load the old case before it is replaced, so the move can be counted
+    event.listen(model.case_id, 'set', _load_old_value, active_history=True)
+event.listen(Task.status, 'set', _load_old_value, active_history=True)
+
+
+@event.listens_for(Session, 'after_flush')
+def _on_flush(session, flush_context):
+    touched, deltas = session.info.pop(PENDING_KEY, (set(), {}))
+    for obj in session.dirty:
+        # Team changes only write the case_officers table
+        if isinstance(obj, Case) and inspect(obj).attrs.officers.history.has_changes():
+            touched.add(obj.id)
+    if touched:
+        record_changes(session.connection(), touched, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def _actual_counts():
+    return {
+        'evidence_count': select(func.count(Evidence.id)).where(Evidence.case_id == Case.id).scalar_subquery(),
+        'participant_count': select(func.count(Participant.id)).where(Participant.case_id == Case.id).scalar_subquery(),
+        'open_task_count': select(func.count(Task.id)).where(
+            Task.case_id == Case.id, or_(Task.status.is_(None), Task.status != 'Completed')).scalar_subquery(),
+    }
+
+
+def find_drift():
+    """
+    (case id, counter, stored, actual) for every stored counter that is off.
+    """
+    actual = _actual_counts()
+    rows = db.session.execute(
+        select(Case.id, *[getattr(Case, k) for k in COUNTERS], *[actual[k].label(f'actual_{k}') for k in COUNTERS])
+        .where(or_(*[getattr(Case, k) != actual[k] for k in COUNTERS]))
+    )
+    return [(row.id, k, getattr(row, k), getattr(row, f'actual_{k}'))
+            for row in rows for k in COUNTERS if getattr(row, k) != getattr(row, f'actual_{k}')]
+
+
+def repair():
+    """
+    Recomputes every case's counters in one UPDATE and commits. Returns the
+    drift found beforehand (see find_drift).
+    """
+    drift = find_drift()
+    if drift:
+        table = Case.__table__
+        actual = _actual_counts()
+        db.session.execute(
+            update(table).where(table.c.id.in_(sorted({case_id for case_id, *_ in drift})))
+            .values(updated_at=table.c.updated_at, **actual)
+        )
+        db.session.commit()
+    return drift
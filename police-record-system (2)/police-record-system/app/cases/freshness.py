@@ -0,0 +1,99 @@
+"""
+Change markers and HTTP validators for case pages.
+
+``Case.updated_at`` only moves when the case row itself is edited. Writes to
+the rows shown with it (participants, evidence, FIRs, tasks, statements,
+investigation updates, the officer team) stamp ``Case.children_updated_at``
+instead (app/cases/counters.py). Together, as ``Case.last_activity_at``, the
+two columns tell whether anything on the case page can have changed, so a
+conditional GET is answered from the case row alone:
+
+    validators = case_validators(case, 'html', forms=True)
+    if not_modified(validators):
+        return not_modified_response(validators)
+
+Responses carry an ETag and a Last-Modified. If-None-Match takes precedence
+(RFC 9110, 13.2.2): If-Modified-Since, whose one-second precision can miss
+a second write within the same second, is only used when a client sends no
+ETag back.
+
+A page with forms embeds a CSRF token, which expires after
+WTF_CSRF_TIME_LIMIT. Its ETag therefore covers the session's token and
+changes every half of that limit, and its Last-Modified is never older than
+the start of that period, so a page revalidated with a 304 still has a token
+with at least that long to live.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, request, session as flask_session
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+
+
+def last_modified(case):
+    return case.last_activity_at or case.created_at
+
+
+def _csrf_period():
+    """
+    (key, start) of the CSRF token the page embeds: the session's token and
+    the half time limit period we are in, and when that period began.
+    """
+    config = current_app.config
+    if not config.get('WTF_CSRF_ENABLED', True):
+        return '', None
+    generate_csrf()  # Makes sure the session holds its token before it is read
+    token = flask_session.get(config.get('WTF_CSRF_FIELD_NAME', 'csrf_token'), '')
+    limit = config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    if not limit:
+        return f'{token}:0', None
+    length = max(limit // 2, 1)
+    period = int(time.time() // length)
+    return f'{token}:{period}', datetime.utcfromtimestamp(period * length)
+
+
+def case_validators(case, variant, forms=False):
+    """
+    (ETag, Last-Modified) of one representation of a case. The ETag also
+    covers who is asking, since pages differ per user and role, and with
+    ``forms`` the CSRF token the page embeds.
+    """
+    changed = last_modified(case)
+    key = f'{case.id}:{changed.isoformat()}:{variant}:{current_user.id}:{current_user.role}'
+    if forms:
+        csrf_key, period_start = _csrf_period()
+        key += ':' + csrf_key
+        if period_start is not None:
+            changed = max(changed, period_start)
+    return hashlib.sha1(key.encode()).hexdigest(), changed
+
+
+def not_modified(validators):
+    # A pending flash message still has to be rendered
+    if '_flashes' in flask_session:
+        return False
+    etag, changed = validators
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    return since is not None and changed.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+def _set_validators(response, validators):
+    etag, changed = validators
+    response.set_etag(etag)
+    response.last_modified = changed
+    # Browsers must ask again each time; the answer is often a 304
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified_response(validators):
+    return _set_validators(current_app.response_class(status=304), validators)
+
+
+def with_validators(response, validators):
+    return _set_validators(current_app.make_response(response), validators)
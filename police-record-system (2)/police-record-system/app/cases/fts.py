@@ -0,0 +1,75 @@
+"""
+Full-text search over cases using the SQLite FTS5 table ``case_fts``.
+
+``case_fts`` is an external-content index on the ``case`` table (created by
+migration 7b1f0c2d9e4a, extended with the Latin shadow columns in c4d2a7e9f813)
+that stores only the inverted index; SQLite triggers keep it in sync with every
+insert, update and delete on ``case``.
+"""
+import re
+
+from sqlalchemy import func, literal_column, select, table, column, text
+
+from app import db
+from app.models import Case
+
+FTS_TABLE = 'case_fts'
+FTS_COLUMNS = ('case_number', 'title', 'short_description', 'description',
+               'location', 'tags', 'ipc_sections', 'title_latin', 'description_latin')
+
+case_fts = table(FTS_TABLE, column('rowid'))
+
+_available = {}
+
+
+def fts_available():
+    """
+    True when the database has the case_fts table (SQLite with the migration applied).
+    """
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _available:
+        if engine.dialect.name != 'sqlite':
+            _available[key] = False
+        else:
+            with engine.connect() as conn:
+                found = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {'name': FTS_TABLE}
+                ).first()
+            _available[key] = found is not None
+    return _available[key]
+
+
+def build_match_expression(terms):
+    """
+    Turns free-text search terms into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix query ("raj"* matches Rajesh), words of
+    one term are AND-ed and alternative terms (e.g. a transliteration) are OR-ed.
+    Returns None if no term contains a searchable word.
+    """
+    groups = []
+    for term in terms:
+        words = re.findall(r'[\w\u0900-\u097F]+', term or '')
+        if words:
+            groups.append('(' + ' '.join(f'"{w}"*' for w in words) + ')')
+    return ' OR '.join(sorted(set(groups))) or None
+
+
+def apply_fts_search(query, terms):
+    """
+    Restricts a Case query to full-text matches ordered by bm25 relevance.
+    Returns None if the terms contain nothing to match on.
+    """
+    expression = build_match_expression(terms)
+    if expression is None:
+        return None
+
+    matches = (
+        select(case_fts.c.rowid.label('case_id'),
+               func.bm25(literal_column(FTS_TABLE)).label('rank'))
+        .where(literal_column(FTS_TABLE).op('MATCH')(expression))
+        .subquery()
+    )
+    return query.join(matches, matches.c.case_id == Case.id).order_by(matches.c.rank)
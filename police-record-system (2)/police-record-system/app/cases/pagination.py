@@ -0,0 +1,104 @@
+"""
+Pagination for the case list.
+
+Large lists are paged with a keyset (cursor) on (created_at, id) instead of
+OFFSET: the next page is "the 10 cases older than the last one shown", which
+the (station_id, created_at, id) index answers without scanning the pages
+before it. Cursors are opaque strings carried in the ``after`` / ``before``
+query arguments.
+
+Totals come from a short-lived per-process cache rather than a COUNT on
+every page, so they can lag new cases by up to CASE_COUNT_TTL seconds.
+"""
+import base64
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import tuple_
+
+from app.models import Case
+
+COUNT_CACHE_SIZE = 1024
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def cached_count(key, query):
+    """
+    Row count of ``query``, recomputed at most every CASE_COUNT_TTL seconds per key.
+    """
+    ttl = current_app.config.get('CASE_COUNT_TTL', 60)
+    now = time.monotonic()
+    hit = _counts.get(key)
+    if hit is not None and now - hit[1] < ttl:
+        return hit[0]
+    total = query.order_by(None).count()
+    with _counts_lock:
+        if len(_counts) >= COUNT_CACHE_SIZE:
+            _counts.clear()
+        _counts[key] = (total, now)
+    return total
+
+
+def encode_cursor(case):
+    raw = f'{case.created_at.isoformat()}|{case.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns (created_at, id), or None for a missing or malformed cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, case_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(case_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class KeysetPage:
+    """
+    One page of cases, newest first, with cursors to its neighbours.
+    Mirrors the attributes of a Flask-SQLAlchemy Pagination the template uses.
+    """
+    is_keyset = True
+
+    def __init__(self, items, per_page, total, has_next, has_prev):
+        self.items = items
+        self.per_page = per_page
+        self.total = total
+        self.has_next = has_next and bool(items)
+        self.has_prev = has_prev and bool(items)
+        self.next_cursor = encode_cursor(items[-1]) if self.has_next else None
+        self.prev_cursor = encode_cursor(items[0]) if self.has_prev else None
+
+
+def keyset_paginate(query, per_page, after=None, before=None, total=None):
+    """
+    Pages ``query`` by (created_at, id) descending. ``after`` asks for the page
+    following a cursor, ``before`` for the page preceding one; with neither
+    the first page is returned.
+    """
+    key = tuple_(Case.created_at, Case.id)
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before is not None:
+        # Walk backwards in ascending order, then flip the page round
+        rows = (query.filter(key > tuple_(*before))
+                .order_by(Case.created_at.asc(), Case.id.asc())
+                .limit(per_page + 1).all())
+        has_prev = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        return KeysetPage(items, per_page, total, has_next=True, has_prev=has_prev)
+
+    if after is not None:
+        query = query.filter(key < tuple_(*after))
+    rows = query.order_by(Case.created_at.desc(), Case.id.desc()).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], per_page, total,
+                      has_next=len(rows) > per_page, has_prev=after is not None and bool(rows))
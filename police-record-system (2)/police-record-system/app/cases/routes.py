@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, abort, send_file
 from datetime import datetime
 from flask_login import login_required, current_user
 from app import db
@@ -6,6 +6,13 @@ from app.cases import cases
 from app.forms import CaseForm, FIRForm
 from app.models import Case, FIR, User, Participant, Evidence, case_officers
 from app.utils import transliterate_to_english, station_scoped, log_audit
+from app.cases.fts import fts_available, apply_fts_search
+from app.cases.pagination import cached_count, keyset_paginate
+from app.loaders import with_profile
+from app.statement_guard import statement_limit
+from app.sequences import next_number, peek_number
+from app.cases.sync import submitted_participants, sync_participants, sync_officers
+from app.cases.freshness import case_validators, not_modified, not_modified_response, with_validators
 from sqlalchemy import or_
 
 @cases.route('/cases')
@@ -33,27 +40,68 @@ def list_cases():
     if search_query:
         transliterated_query = transliterate_to_english(search_query)
         search_terms = {search_query, transliterated_query}
-        conditions = []
-        for term in search_terms:
-            like_pattern = f"%{term}%"
-            conditions.extend([
-                Case.case_number.ilike(like_pattern),
-                Case.title.ilike(like_pattern),
-                Case.description.ilike(like_pattern)
-            ])
-        query = query.filter(or_(*conditions))
+        # Indexed full-text search (bm25 ranked) when the FTS5 table exists
+        ranked = apply_fts_search(query, search_terms) if fts_available() else None
+        if ranked is not None:
+            query = ranked
+        else:
+            conditions = []
+            for term in search_terms:
+                like_pattern = f"%{term}%"
+                conditions.extend([
+                    Case.case_number.ilike(like_pattern),
+                    Case.title.ilike(like_pattern),
+                    Case.title_latin.ilike(like_pattern),
+                    Case.description.ilike(like_pattern)
+                ])
+            query = query.filter(or_(*conditions))
         
     
-    cases_list = query.order_by(Case.created_at.desc()).paginate(page=page, per_page=10)
+    # Totals are cached per station/visibility/search for CASE_COUNT_TTL seconds
+    scope = 'station' if current_user.role in ['admin', 'inspector'] else (current_user.role, current_user.id)
+    total = cached_count((current_user.station_id, scope, search_query), query)
+
+    # Large unfiltered lists page by cursor; small lists, explicit page numbers
+    # and search results keep the numbered pages. A (created_at, id) cursor
+    # over results ordered by relevance would skip or repeat rows, so a search
+    # ignores any cursor it is given
+    after, before = request.args.get('after'), request.args.get('before')
+    if not search_query and (after or before or (
+            page == 1 and total > current_app.config.get('CASE_LIST_PAGE_NUMBERS_MAX', 200))):
+        cases_list = keyset_paginate(query, 10, after=after, before=before, total=total)
+    else:
+        cases_list = query.order_by(Case.created_at.desc(), Case.id.desc()).paginate(page=page, per_page=10, count=False)
+        cases_list.total = total
     return render_template('cases.html', cases=cases_list, search_query=search_query)
 
 from werkzeug.utils import secure_filename
+from app.evidence_store import save_upload, stored_file, stored_path
+import mimetypes
 import os
 
-# Configure upload folder
-UPLOAD_FOLDER = os.path.join(os.getcwd(), 'app', 'static', 'evidence')
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+
+def add_uploaded_evidence(case, form):
+    """
+    Streams the files of the case form into the evidence store and adds an
+    Evidence row for each.
+    """
+    for file in form.evidence_files.data or []:
+        if not file.filename:
+            continue
+        filename = secure_filename(file.filename)
+        blob = save_upload(file)
+        db.session.add(Evidence(
+            station_id=current_user.station_id,
+            case_id=case.id,
+            description=form.evidence_description.data or f"Uploaded file: {filename}",
+            type="Digital",
+            location=blob.location,
+            sha256=blob.sha256,
+            size=blob.size,
+            filename=filename,
+            custodian_id=current_user.id,
+            collected_at=form.evidence_collected_at.data or datetime.utcnow()
+        ))
 
 @cases.route('/cases/new', methods=['GET', 'POST'])
 @login_required
@@ -70,12 +118,7 @@ def create_case():
     if form.validate_on_submit():
         case_num = form.case_number.data
         if not case_num:
-            now = datetime.now()
-            year = now.strftime('%Y')
-            prefix = f"CASE-{year}-"
-            count = Case.query.filter(Case.case_number.like(f"{prefix}%")).count()
-            sequence = str(count + 1).zfill(4)
-            case_num = f"{prefix}{sequence}"
+            case_num = next_number('case', current_user.station)
 
         case = Case(
             station_id=current_user.station_id,
@@ -104,54 +147,12 @@ def create_case():
         db.session.add(case)
         db.session.flush() 
         
-        # Participants
-        names = request.form.getlist('participant_name[]')
-        types = request.form.getlist('participant_type[]')
-        contacts = request.form.getlist('participant_contact[]')
-        details = request.form.getlist('participant_details[]')
-        dobs = request.form.getlist('participant_dob[]')
-        national_ids = request.form.getlist('participant_national_id[]')
-        addresses = request.form.getlist('participant_address[]')
-        
-        for i in range(len(names)):
-            if names[i] and len(names[i]) > 1:
-                p = Participant(
-                    case_id=case.id,
-                    name=names[i],
-                    type=types[i] if i < len(types) else 'Witness',
-                    contact_info=contacts[i] if i < len(contacts) else '',
-                    details=details[i] if i < len(details) else '',
-                    dob=datetime.strptime(dobs[i], '%Y-%m-%d').date() if i < len(dobs) and dobs[i] else None,
-                    national_id=national_ids[i] if i < len(national_ids) else None,
-                    address=addresses[i] if i < len(addresses) else None
-                )
-                db.session.add(p)
-        
-        # Team
-        selected_officer_ids = request.form.getlist('officer_ids')
-        for officer_id in selected_officer_ids:
-            officer = User.query.get(int(officer_id))
-            if officer and officer.station_id == current_user.station_id:
-                case.officers.append(officer)
+        # Participants and team
+        sync_participants(case, submitted_participants(min_length=2))
+        sync_officers(case, request.form.getlist('officer_ids'))
         
         # Evidence
-        if form.evidence_files.data:
-            for file in form.evidence_files.data:
-                if file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                    filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-                    file.save(filepath)
-                    evidence = Evidence(
-                        station_id=current_user.station_id,
-                        case_id=case.id,
-                        description=form.evidence_description.data or f"Uploaded file: {filename}",
-                        type="Digital",
-                        location=unique_filename,
-                        custodian_id=current_user.id,
-                        collected_at=form.evidence_collected_at.data or datetime.utcnow()
-                    )
-                    db.session.add(evidence)
+        add_uploaded_evidence(case, form)
 
         db.session.commit()
         log_audit('CREATE_CASE', 'Case', case.id, f"Created case {case.case_number} by {current_user.role}")
@@ -161,18 +162,90 @@ def create_case():
     return render_template('create_case.html', title='New Case', form=form)
 @cases.route('/cases/<int:case_id>')
 @login_required
+@statement_limit(10)
 def case_detail(case_id):
-    case = Case.query.get_or_404(case_id)
+    # Case row only: enough for the access check and a 304
+    case = db.session.get(Case, case_id)
+    if case is None:
+        abort(404)
     
     # Enforce Isolation
     if current_user.role in ['officer', 'io']:
         is_assigned = (case.assigned_officer_id == current_user.id)
-        is_team_member = (current_user in case.officers)
+        is_team_member = on_team(case, current_user)
         if not (is_assigned or is_team_member):
              flash('You do not have permission to view this case.', 'danger')
              return redirect(url_for('cases.list_cases'))
 
-    return render_template('case_detail.html', case=case)
+    validators = case_validators(case, 'html', forms=True)
+    if not_modified(validators):
+        return not_modified_response(validators)
+
+    case = with_profile(Case.query, 'case_detail').filter_by(id=case_id).one()
+    return with_validators(render_template('case_detail.html', case=case), validators)
+
+def on_team(case, user):
+    # Without loading the whole team
+    return db.session.query(case_officers.c.user_id).filter_by(case_id=case.id, user_id=user.id).first() is not None
+
+def can_view_case(case):
+    """
+    User.can('view') plus the case_detail rule that officers and IOs only see
+    cases they lead or are on the team of.
+    """
+    if not current_user.can('view', case):
+        return False
+    if current_user.role in ['officer', 'io']:
+        return case.assigned_officer_id == current_user.id or on_team(case, current_user)
+    return True
+
+def _send_evidence(location, path, download_name, etag):
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    accel = current_app.config.get('EVIDENCE_ACCEL_REDIRECT')
+    if accel:
+        # The front proxy sends the file (and answers Range requests) itself
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel.rstrip('/') + '/' + location
+        response.headers.set('Content-Disposition', 'inline', filename=download_name)
+        if etag:
+            response.set_etag(etag)
+        response.make_conditional(request)
+    else:
+        # Range, If-None-Match and USE_X_SENDFILE are handled by send_file;
+        # the stored file is passed on to the server's sendfile when it has one
+        response = send_file(path, mimetype=mimetype, download_name=download_name, conditional=True,
+                             etag=etag or True, max_age=current_app.config['EVIDENCE_MAX_AGE'])
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config['EVIDENCE_MAX_AGE']
+    return response
+
+def _viewable_evidence(evidence_id):
+    evidence = Evidence.query.get_or_404(evidence_id)
+    if not can_view_case(evidence.case):
+        abort(403)
+    return evidence
+
+@cases.route('/evidence/<int:evidence_id>/file')
+@login_required
+def evidence_file(evidence_id):
+    evidence = _viewable_evidence(evidence_id)
+    path = stored_file(evidence)
+    if path is None:
+        abort(404)
+    return _send_evidence(evidence.location, path, evidence.filename or os.path.basename(path), evidence.sha256)
+
+@cases.route('/evidence/<int:evidence_id>/<any(thumbnail, preview):variant>')
+@login_required
+def evidence_derivative(evidence_id, variant):
+    # Small JPEGs made by app/derivatives.py
+    evidence = _viewable_evidence(evidence_id)
+    location = getattr(evidence, variant)
+    path = stored_path(location)
+    if path is None:
+        abort(404)
+    stem = os.path.splitext(evidence.filename or 'evidence')[0]
+    return _send_evidence(location, path, f'{stem}-{variant}.jpg', f'{evidence.sha256}-{variant}')
 
 @cases.route('/cases/<int:case_id>/add_fir', methods=['GET', 'POST'])
 @login_required
@@ -192,12 +265,8 @@ from flask import jsonify
 @cases.route('/cases/next-id')
 @login_required
 def get_next_case_id():
-    now = datetime.now()
-    year = now.strftime('%Y')
-    prefix = f"CASE-{year}-"
-    count = Case.query.filter(Case.case_number.like(f"{prefix}%")).count()
-    sequence = str(count + 1).zfill(4)
-    return jsonify({'next_id': f"{prefix}{sequence}"})
+    # Preview only; the number is allocated when the case is saved
+    return jsonify({'next_id': peek_number('case', current_user.station)})
 
 @cases.route('/cases/<int:case_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -223,73 +292,12 @@ def edit_case(case_id):
         form.populate_obj(case)
         # Manually update M2M and Custom Fields
         
-        # Officers team
-        selected_officer_ids = request.form.getlist('officer_ids')
-        case.officers = [] # Reset and re-add
-        for officer_id in selected_officer_ids:
-             officer = User.query.get(int(officer_id))
-             if officer:
-                 case.officers.append(officer)
-        
-        # Participants Handling
-        p_ids = request.form.getlist('participant_id[]')
-        names = request.form.getlist('participant_name[]')
-        types = request.form.getlist('participant_type[]')
-        contacts = request.form.getlist('participant_contact[]')
-        # ... fetch other lists ...
-        details = request.form.getlist('participant_details[]')
-        dobs = request.form.getlist('participant_dob[]')
-        national_ids = request.form.getlist('participant_national_id[]')
-        addresses = request.form.getlist('participant_address[]')
-
-        # Current IDs in DB
-        current_p_ids = [p.id for p in case.participants]
-        submitted_p_ids = [int(pid) for pid in p_ids if pid != 'new']
-        
-        # Delete removed
-        for pid in current_p_ids:
-            if pid not in submitted_p_ids:
-                Participant.query.filter_by(id=pid).delete()
-        
-        # Add/Update
-        for i in range(len(names)):
-            if not names[i]: continue
-            
-            pid = p_ids[i]
-            if pid == 'new':
-                 p = Participant(case_id=case.id)
-                 db.session.add(p)
-            else:
-                 p = Participant.query.get(int(pid))
-            
-            if p:
-                p.name = names[i]
-                p.type = types[i] if i < len(types) else 'Witness'
-                p.contact_info = contacts[i] if i < len(contacts) else ''
-                p.details = details[i] if i < len(details) else ''
-                p.dob = datetime.strptime(dobs[i], '%Y-%m-%d').date() if i < len(dobs) and dobs[i] else None
-                p.national_id = national_ids[i] if i < len(national_ids) else None
-                p.address = addresses[i] if i < len(addresses) else None
+        # Participants and team, diffed against what is stored
+        sync_officers(case, request.form.getlist('officer_ids'))
+        sync_participants(case, submitted_participants())
 
         # Evidence (Append New)
-        if form.evidence_files.data:
-             for file in form.evidence_files.data:
-                if file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                    filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-                    file.save(filepath)
-                    
-                    evidence = Evidence(
-                        station_id=current_user.station_id,
-                        case_id=case.id,
-                        description=form.evidence_description.data or f"Uploaded file: {filename}",
-                        type="Digital",
-                        location=unique_filename,
-                        custodian_id=current_user.id,
-                        collected_at=form.evidence_collected_at.data or datetime.utcnow()
-                    )
-                    db.session.add(evidence)
+        add_uploaded_evidence(case, form)
 
         db.session.commit()
         log_audit('UPDATE', 'Case', case.id, f"Updated case {case.case_number}")
@@ -0,0 +1,143 @@
+"""
+Diff-based sync of a case's participants and officer team.
+
+The case forms post the complete list of participants and officers. Rather
+than deleting, fetching and re-adding them one row at a time, the current
+state is loaded with one query, diffed against the submission, and the
+inserts, updates and deletes are applied as bulk statements inside the
+caller's transaction, so saving a case costs the same handful of statements
+however many witnesses it has.
+
+Bulk statements skip the ORM hooks, so the phonetic/Latin name keys are
+computed here, and the search index and the case's counters and change
+marker are told about the changes explicitly.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import request
+from sqlalchemy import delete, insert, select, update
+
+from app import db
+from app.cases.counters import record_changes
+from app.models import Participant, User, case_officers
+from app.phonetic import phonetic_key
+from app.search.index import SYNCED_OPTION, queue_participants
+from app.transliteration import to_latin
+
+PARTICIPANT_FIELDS = ('name', 'type', 'contact_info', 'details', 'dob', 'national_id', 'address')
+
+
+def submitted_participants(min_length=1):
+    """
+    Reads the participant rows of the posted case form as (id, values) pairs;
+    id is None for new rows. Rows whose name is shorter than ``min_length``
+    are skipped, except that an existing participant whose name was cleared
+    comes back as (id, None): kept as stored, neither updated nor deleted.
+    """
+    form = request.form
+    ids = form.getlist('participant_id[]')
+    names = form.getlist('participant_name[]')
+    types = form.getlist('participant_type[]')
+    contacts = form.getlist('participant_contact[]')
+    details = form.getlist('participant_details[]')
+    dobs = form.getlist('participant_dob[]')
+    national_ids = form.getlist('participant_national_id[]')
+    addresses = form.getlist('participant_address[]')
+
+    rows = []
+    for i, name in enumerate(names):
+        pid = ids[i] if i < len(ids) else 'new'
+        if len(name) < min_length:
+            if pid.isdigit():
+                rows.append((int(pid), None))
+            continue
+        rows.append((int(pid) if pid.isdigit() else None, {
+            'name': name,
+            'type': types[i] if i < len(types) else 'Witness',
+            'contact_info': contacts[i] if i < len(contacts) else '',
+            'details': details[i] if i < len(details) else '',
+            'dob': datetime.strptime(dobs[i], '%Y-%m-%d').date() if i < len(dobs) and dobs[i] else None,
+            'national_id': national_ids[i] if i < len(national_ids) else None,
+            'address': addresses[i] if i < len(addresses) else None,
+        }))
+    return rows
+
+
+def _with_name_keys(values):
+    # What Participant._set_name_keys would set
+    return dict(values, name_phonetic=phonetic_key(values['name']), name_latin=to_latin(values['name']))
+
+
+def sync_participants(case, submitted):
+    """
+    Makes the participants of ``case`` match ``submitted`` (see
+    submitted_participants): rows with no or an unknown id are inserted,
+    changed rows updated and rows missing from the submission deleted. Rows
+    submitted without values are left as they are.
+    Returns (inserted, updated, deleted) counts.
+    """
+    session = db.session
+    columns = [getattr(Participant, f) for f in PARTICIPANT_FIELDS]
+    current = {row.id: row for row in session.execute(
+        select(Participant.id, *columns).where(Participant.case_id == case.id))}
+
+    new_rows, changed, kept = [], [], set()
+    for pid, values in submitted:
+        row = current.get(pid)
+        if values is None:
+            kept.add(pid)
+            continue
+        if row is None:
+            new_rows.append(_with_name_keys(dict(values, case_id=case.id)))
+            continue
+        if pid not in kept and any(getattr(row, f) != values[f] for f in PARTICIPANT_FIELDS):
+            changed.append(_with_name_keys(dict(values, id=pid)))
+        kept.add(pid)
+    removed = [pid for pid in current if pid not in kept]
+
+    synced = {SYNCED_OPTION: True}
+    if removed:
+        session.execute(delete(Participant).where(Participant.id.in_(removed)).execution_options(**synced))
+    if changed:
+        session.execute(update(Participant).execution_options(**synced), changed)
+    written = [SimpleNamespace(case_id=case.id, **row) for row in changed]
+    if new_rows:
+        # Returning whole rows needs no parameter ordering, which SQLite
+        # could only honour one INSERT at a time
+        written += session.scalars(insert(Participant).returning(Participant), new_rows).all()
+
+    queue_participants(session, case, written, removed)
+    if removed or written:
+        record_changes(session.connection(), [case.id],
+                       {case.id: {'participant_count': len(new_rows) - len(removed)}})
+    session.expire(case, ['participants'])
+    return len(new_rows), len(changed), len(removed)
+
+
+def sync_officers(case, officer_ids):
+    """
+    Makes the team of ``case`` match ``officer_ids``. Ids of users outside the
+    case's station are ignored. Returns (added, removed) counts.
+    """
+    session = db.session
+    wanted = {int(i) for i in officer_ids if str(i).isdigit()}
+    current = set(session.scalars(
+        select(case_officers.c.user_id).where(case_officers.c.case_id == case.id)))
+
+    to_add = wanted - current
+    if to_add:
+        to_add = set(session.scalars(
+            select(User.id).where(User.id.in_(to_add), User.station_id == case.station_id)))
+    to_remove = current - wanted
+
+    if to_remove:
+        session.execute(delete(case_officers).where(
+            case_officers.c.case_id == case.id, case_officers.c.user_id.in_(to_remove)))
+    if to_add:
+        session.execute(insert(case_officers), [{'case_id': case.id, 'user_id': uid} for uid in sorted(to_add)])
+    if to_add or to_remove:
+        record_changes(session.connection(), [case.id])
+
+    session.expire(case, ['officers'])
+    return len(to_add), len(to_remove)
@@ -0,0 +1,244 @@
+"""
+Resumable evidence uploads.
+
+CCTV exports and phone extractions are sent in chunks, so a dropped
+connection costs one chunk instead of the whole file:
+
+    POST   /cases/<case_id>/uploads    {"filename", "size", "sha256"?, "description"?}
+                                       -> 201 {"id", "offset": 0, "chunk_max"}
+    GET    /uploads/<id>               -> {"id", "offset", "size"}   (where to resume)
+    PUT    /uploads/<id>               raw chunk; headers Upload-Offset, X-Chunk-SHA256
+                                       -> {"offset"}
+    POST   /uploads/<id>/complete      -> 201 {"evidence_id", "sha256", "size"}
+    DELETE /uploads/<id>               abandons the upload
+
+Chunks are streamed to <EVIDENCE_STORE>/tmp/<id>.part without being held in
+memory. A request first claims the offset with a conditional UPDATE and only
+writes once it holds the claim, so two PUTs at the same offset never write
+into the file together; the loser gets a 409. A chunk whose SHA-256 does not
+match its header is cut off again and must be resent. Completing checks the whole file against the declared size
+and digest and moves it into the evidence store as an Evidence row. Sessions
+idle for UPLOAD_SESSION_TTL are removed by ``flask gc-uploads``.
+
+Requests carry the login session cookie and an X-CSRFToken header.
+"""
+import os
+import re
+import secrets
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify, request
+from flask_login import current_user, login_required
+from sqlalchemy import update
+from werkzeug.utils import secure_filename
+
+from app import db
+from app.cases import cases
+from app.evidence_store import file_digest, ingest, part_path, temp_dir, write_at
+from app.models import Case, Evidence, UploadSession
+from app.utils import log_audit
+
+
+def _error(message, status, **extra):
+    return jsonify({'status': 'error', 'message': message, **extra}), status
+
+
+def _is_sha256(value):
+    return isinstance(value, str) and re.fullmatch(r'[0-9a-fA-F]{64}', value) is not None
+
+
+def _can_upload(case):
+    # Same rule as edit_case: officers only on cases they are on
+    if not current_user.can('view', case):
+        return False
+    return current_user.role != 'officer' or current_user.can('edit', case)
+
+
+def _get_upload(upload_id):
+    upload = db.session.get(UploadSession, upload_id)
+    if upload is None or upload.user_id != current_user.id:
+        return None
+    return upload
+
+
+def _discard(upload):
+    path = part_path(upload.id)
+    if os.path.exists(path):
+        os.remove(path)
+    db.session.delete(upload)
+
+
+@cases.route('/cases/<int:case_id>/uploads', methods=['POST'])
+@login_required
+def create_upload(case_id):
+    case = Case.query.get_or_404(case_id)
+    if not _can_upload(case):
+        return _error('Access denied', 403)
+
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(str(data.get('filename') or ''))
+    size = data.get('size')
+    digest = data.get('sha256')
+    if not filename:
+        return _error('filename is required', 400)
+    if type(size) is not int or not 0 < size <= current_app.config['UPLOAD_MAX_SIZE']:
+        return _error('size must be a positive number of bytes within the upload limit', 400)
+    if digest is not None and not _is_sha256(digest):
+        return _error('sha256 must be 64 hex characters', 400)
+
+    upload = UploadSession(
+        id=secrets.token_hex(16),
+        station_id=case.station_id,
+        case_id=case.id,
+        user_id=current_user.id,
+        filename=filename,
+        description=str(data.get('description') or '')[:200] or None,
+        size=size,
+        sha256=digest.lower() if digest else None,
+        received=0
+    )
+    db.session.add(upload)
+    db.session.commit()
+    return jsonify({'id': upload.id, 'offset': 0, 'chunk_max': current_app.config['UPLOAD_CHUNK_MAX']}), 201
+
+
+@cases.route('/uploads/<upload_id>', methods=['GET'])
+@login_required
+def upload_status(upload_id):
+    upload = _get_upload(upload_id)
+    if upload is None:
+        return _error('Upload not found', 404)
+    return jsonify({'id': upload.id, 'offset': upload.received, 'size': upload.size})
+
+
+@cases.route('/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    upload = _get_upload(upload_id)
+    if upload is None:
+        return _error('Upload not found', 404)
+
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return _error('Upload-Offset header is required', 400)
+    if offset != upload.received:
+        return _error('Offset does not match the bytes received', 409, offset=upload.received)
+    length = request.content_length
+    if length is None:
+        return _error('Content-Length is required', 411)
+    if length > current_app.config['UPLOAD_CHUNK_MAX']:
+        return _error('Chunk is too large', 413, chunk_max=current_app.config['UPLOAD_CHUNK_MAX'])
+    if offset + length > upload.size:
+        return _error('Chunk runs past the declared size', 400, offset=offset)
+    expected = request.headers.get('X-Chunk-SHA256', '')
+    if not _is_sha256(expected):
+        return _error('X-Chunk-SHA256 header is required', 400)
+
+    # Claim the offset before touching the file: only one writer at a time.
+    # A claim older than UPLOAD_CHUNK_CLAIM_TTL belongs to a request that died.
+    token = secrets.token_hex(16)
+    now = datetime.utcnow()
+    claim_expired = now - timedelta(seconds=current_app.config['UPLOAD_CHUNK_CLAIM_TTL'])
+    claimed = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload.id, UploadSession.received == offset,
+               (UploadSession.chunk_token.is_(None)) | (UploadSession.updated_at < claim_expired))
+        .values(chunk_token=token, updated_at=now)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return _error('Another chunk is being written at this offset; check the upload status', 409)
+
+    path = part_path(upload.id)
+    written, digest = write_at(path, offset, request.stream)
+    intact = written == length and digest == expected.lower()
+    if not intact:
+        os.truncate(path, offset)
+
+    # Release the claim, moving the offset on if the chunk arrived intact
+    moved = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload.id, UploadSession.chunk_token == token)
+        .values(chunk_token=None, updated_at=datetime.utcnow(),
+                received=offset + written if intact else offset)
+    ).rowcount
+    db.session.commit()
+    if not intact:
+        return _error('Chunk did not arrive intact; send it again', 422, offset=offset)
+    if not moved:
+        return _error('The upload changed while this chunk was written; check the upload status', 409)
+    return jsonify({'offset': offset + written})
+
+
+@cases.route('/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_upload(upload_id):
+    upload = _get_upload(upload_id)
+    if upload is None:
+        return _error('Upload not found', 404)
+    if upload.received != upload.size or upload.chunk_token is not None:
+        return _error('Upload is incomplete', 409, offset=upload.received)
+
+    path = part_path(upload.id)
+    digest = file_digest(path)
+    if upload.sha256 and digest != upload.sha256:
+        _discard(upload)
+        db.session.commit()
+        return _error('File does not match the declared SHA-256; upload discarded', 422)
+
+    blob = ingest(path, digest, upload.size)
+    evidence = Evidence(
+        station_id=upload.station_id,
+        case_id=upload.case_id,
+        description=upload.description or f"Uploaded file: {upload.filename}",
+        type="Digital",
+        location=blob.location,
+        sha256=blob.sha256,
+        size=blob.size,
+        filename=upload.filename,
+        custodian_id=current_user.id,
+        collected_at=datetime.utcnow()
+    )
+    db.session.add(evidence)
+    db.session.delete(upload)
+    db.session.commit()
+    log_audit('UPLOAD_EVIDENCE', 'Evidence', evidence.id,
+              f"Uploaded {evidence.filename} ({blob.size} bytes) to case {upload.case_id}")
+    return jsonify({'evidence_id': evidence.id, 'sha256': blob.sha256, 'size': blob.size}), 201
+
+
+@cases.route('/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def cancel_upload(upload_id):
+    upload = _get_upload(upload_id)
+    if upload is None:
+        return _error('Upload not found', 404)
+    _discard(upload)
+    db.session.commit()
+    return jsonify({'status': 'success'})
+
+
+def collect_stale_uploads(max_age=None):
+    """
+    Removes upload sessions idle for more than ``max_age`` seconds
+    (UPLOAD_SESSION_TTL) with their data, and temporary files of the evidence
+    store no session owns. Returns the number of sessions removed.
+    """
+    max_age = max_age if max_age is not None else current_app.config['UPLOAD_SESSION_TTL']
+    stale = UploadSession.query.filter(
+        UploadSession.updated_at < datetime.utcnow() - timedelta(seconds=max_age)).all()
+    for upload in stale:
+        _discard(upload)
+    db.session.commit()
+
+    # Leftovers of crashed requests or sessions deleted by hand
+    live = {f'{upload_id}.part' for (upload_id,) in db.session.query(UploadSession.id)}
+    cutoff = time.time() - max_age
+    tmp = temp_dir()
+    for name in os.listdir(tmp):
+        path = os.path.join(tmp, name)
+        if name not in live and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+    return len(stale)
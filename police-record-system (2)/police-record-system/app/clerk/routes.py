@@ -5,6 +5,8 @@ from app.clerk import clerk
 from app.models import FIR, Case
 from app.utils import roles_required
 from app.forms import FIRForm
+from app.loaders import with_profile
+from app.sequences import next_number
 from datetime import datetime
 
 @clerk.route('/fir/register', methods=['GET', 'POST'])
@@ -13,17 +15,10 @@ from datetime import datetime
 def register_fir():
     form = FIRForm()
     if form.validate_on_submit():
-        # Generate Sequential FIR Number
-        now = datetime.now()
-        year = now.strftime('%Y')
-        fir_prefix = f"FIR-{year}-"
-        fir_count = FIR.query.filter(FIR.fir_number.like(f"{fir_prefix}%")).count()
-        fir_num = f"{fir_prefix}{str(fir_count + 1).zfill(3)}"
-        
-        # Generate Sequential Case Number (Match standard format)
-        case_prefix = f"CASE-{year}-"
-        case_count = Case.query.filter(Case.case_number.like(f"{case_prefix}%")).count()
-        case_num = f"{case_prefix}{str(case_count + 1).zfill(4)}"
+        # Sequential FIR and Case Numbers from the station's counters
+        # (FIR numbers follow Station.fir_prefix_format)
+        fir_num = next_number('fir', current_user.station)
+        case_num = next_number('case', current_user.station)
         
         # Create a Case first
         case = Case(
@@ -81,5 +76,5 @@ def forward_fir(fir_id):
 @roles_required('clerk')
 def dashboard():
     # Fetch pending FIRs for the dashboard view
-    firs = FIR.query.filter_by(status='Pending').all()
+    firs = with_profile(FIR.query, 'fir_row').filter_by(status='Pending').all()
     return render_template('clerk_dashboard.html', firs=firs)
@@ -14,3 +14,43 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS') == 'True'
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+
+    # Search
+    SEARCH_INDEX_MAX_AGE = int(os.environ.get('SEARCH_INDEX_MAX_AGE') or 300) # seconds before a station's name index is rebuilt
+    SEARCH_NGRAM_SIZE = int(os.environ.get('SEARCH_NGRAM_SIZE') or 3) # n-gram length of the search prefilter
+    SEARCH_SHORTLIST_SIZE = int(os.environ.get('SEARCH_SHORTLIST_SIZE') or 500) # candidates kept for fuzzy scoring (0 scores everything)
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE') or 2048) # cached /search_name result lists (0 disables)
+    SEARCH_DEADLINE = float(os.environ.get('SEARCH_DEADLINE') or 2.0) # seconds of scoring before partial results are returned
+    SEARCH_POOL_WORKERS = int(os.environ.get('SEARCH_POOL_WORKERS') or 0) # scoring threads (0 = one per CPU)
+    SEARCH_POOL_BACKLOG = int(os.environ.get('SEARCH_POOL_BACKLOG') or 4) # searches allowed to wait for a thread before 503
+
+    # Case list
+    CASE_COUNT_TTL = int(os.environ.get('CASE_COUNT_TTL') or 60) # seconds a case list total is reused
+    CASE_LIST_PAGE_NUMBERS_MAX = int(os.environ.get('CASE_LIST_PAGE_NUMBERS_MAX') or 200) # larger lists page by cursor
+
+    # Dashboards
+    DASHBOARD_METRICS_TTL = int(os.environ.get('DASHBOARD_METRICS_TTL') or 30) # seconds a station's dashboard figures are reused (0 disables)
+    DASHBOARD_PANEL_PAGE_SIZE = int(os.environ.get('DASHBOARD_PANEL_PAGE_SIZE') or 25) # rows per page of a dashboard panel
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL') or 300) # seconds a station's analytics for one window are reused
+
+    # Case / FIR numbering (FIR format is per station: Station.fir_prefix_format)
+    CASE_NUMBER_FORMAT = os.environ.get('CASE_NUMBER_FORMAT') or 'CASE-{year}-{num}'
+    SEQUENCE_BLOCK_SIZE = int(os.environ.get('SEQUENCE_BLOCK_SIZE') or 1) # numbers reserved per worker at a time
+
+    # Evidence files
+    # Outside app/static: files are only served through the access-checked /evidence/<id>/file route
+    EVIDENCE_STORE = os.environ.get('EVIDENCE_STORE') or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'evidence')
+    EVIDENCE_CHUNK_SIZE = int(os.environ.get('EVIDENCE_CHUNK_SIZE') or 1024 * 1024) # bytes read and hashed at a time
+    UPLOAD_CHUNK_MAX = int(os.environ.get('UPLOAD_CHUNK_MAX') or 64 * 1024 * 1024) # largest chunk accepted by the resumable upload API
+    UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE') or 20 * 1024 ** 3) # largest file a resumable upload may declare
+    UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL') or 24 * 3600) # seconds an idle upload session is kept
+    UPLOAD_CHUNK_CLAIM_TTL = int(os.environ.get('UPLOAD_CHUNK_CLAIM_TTL') or 600) # seconds a chunk writer holds its offset before another request may take it over
+    EVIDENCE_ACCEL_REDIRECT = os.environ.get('EVIDENCE_ACCEL_REDIRECT') # internal nginx location serving EVIDENCE_STORE, e.g. /protected-evidence/ (unset: Flask sends the file)
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE') == 'True' # hand files to Apache/lighttpd mod_xsendfile
+    EVIDENCE_MAX_AGE = int(os.environ.get('EVIDENCE_MAX_AGE') or 3600) # seconds browsers may reuse a downloaded file (private cache only)
+    DERIVATIVE_WORKERS = int(os.environ.get('DERIVATIVE_WORKERS') or 1) # background threads making thumbnails/previews (0 = only `flask derive-evidence`)
+    THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE') or 256) # px, longest side
+    PREVIEW_SIZE = int(os.environ.get('PREVIEW_SIZE') or 1280) # px, longest side
+
+    # Testing: fail any request issuing more SQL statements than this (0 = off)
+    SQL_STATEMENT_LIMIT = int(os.environ.get('SQL_STATEMENT_LIMIT') or 0)
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 dashboard = Blueprint('dashboard', __name__)
 
-from app.dashboard import routes
+from app.dashboard import routes, panels
@@ -0,0 +1,163 @@
+"""
+Station metrics for the dashboards.
+
+All the figures of a station come from two statements: a GROUP BY over the
+station's cases by status, and one row of scalar subqueries for users and
+FIRs. The result is kept per station for DASHBOARD_METRICS_TTL seconds, so
+supervisors reloading the dashboards do not recount anything.
+
+Committed ORM inserts and deletes of cases, FIRs or users, and changes to
+their status or station, drop the cached metrics of the stations concerned;
+bulk query.update()/delete() on those models drop every station. The TTL
+only bounds how stale figures can get from writes made outside this process.
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Case, FIR, User
+
+PENDING_KEY = 'dashboard_metrics_stations'
+ALL_STATIONS = object()
+# Columns whose changes move the figures
+WATCHED = {
+    Case: ('station_id', 'status'),
+    FIR: ('station_id', 'status', 'forwarded_to_sho'),
+    User: ('station_id',),
+}
+WATCHED_MODELS = tuple(WATCHED)
+ACTIVE_STATUSES = ('Open', 'In Progress')
+
+
+class MetricsCache:
+
+    def __init__(self):
+        self._entries = {}
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _generation(self, station_id):
+        return (self._epoch, self._generations.get(station_id, 0))
+
+    def get(self, station_id, compute):
+        ttl = current_app.config.get('DASHBOARD_METRICS_TTL', 30)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(station_id)
+            generation = self._generation(station_id)
+        if hit is not None and hit[1] == generation and now - hit[2] < ttl:
+            return hit[0]
+        metrics = compute(station_id)
+        with self._lock:
+            # An invalidation that raced the computation wins
+            if ttl and self._generation(station_id) == generation:
+                self._entries[station_id] = (metrics, generation, now)
+        return metrics
+
+    def invalidate(self, station_id=ALL_STATIONS):
+        with self._lock:
+            if station_id is ALL_STATIONS:
+                self._epoch += 1
+                self._entries.clear()
+            else:
+                self._generations[station_id] = self._generations.get(station_id, 0) + 1
+                self._entries.pop(station_id, None)
+
+
+metrics_cache = MetricsCache()
+
+
+def compute_metrics(station_id):
+    session = db.session
+    status_counts = dict(session.execute(
+        select(Case.status, func.count()).where(Case.station_id == station_id).group_by(Case.status)
+    ).all())
+    pending_fir = (FIR.station_id == station_id) & (FIR.status == 'Pending')
+    row = session.execute(select(
+        select(func.count(User.id)).where(User.station_id == station_id).scalar_subquery().label('users'),
+        select(func.count(FIR.id)).where(pending_fir).scalar_subquery().label('pending_firs'),
+        select(func.count(FIR.id)).where(pending_fir, FIR.forwarded_to_sho.is_(True))
+        .scalar_subquery().label('forwarded_firs'),
+    )).one()
+
+    total = sum(status_counts.values())
+    closed = status_counts.get('Closed', 0)
+    return {
+        'total_cases': total,
+        'status_counts': status_counts,
+        'closed_cases': closed,
+        'active_cases': sum(status_counts.get(s, 0) for s in ACTIVE_STATUSES),
+        'solved_rate': round(closed / total * 100, 1) if total else 0,
+        'total_users': row.users,
+        'pending_firs': row.pending_firs,
+        'forwarded_firs': row.forwarded_firs,  # Pending and forwarded to the SHO
+    }
+
+
+def station_metrics(station_id):
+    """
+    Case, FIR and user figures of one station (see compute_metrics), cached.
+    """
+    return metrics_cache.get(station_id, compute_metrics)
+
+
+# --- ORM hooks ---
+
+def _station_ids(obj):
+    # Current station and, if it was just moved, the previous one
+    history = inspect(obj).attrs.station_id.history
+    return {obj.station_id, *history.deleted}
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for model in WATCHED_MODELS:
+    # Load the old station before it is replaced, so both get refreshed
+    event.listen(model.station_id, 'set', _load_old_value, active_history=True)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stations(session, flush_context):
+    stations = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, WATCHED_MODELS):
+            stations.update(_station_ids(obj))
+    for obj in session.dirty:
+        if isinstance(obj, WATCHED_MODELS):
+            attrs = inspect(obj).attrs
+            if any(attrs[key].history.has_changes() for key in WATCHED[type(obj)]):
+                stations.update(_station_ids(obj))
+    if stations:
+        session.info.setdefault(PENDING_KEY, set()).update(stations)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_delete or orm_execute_state.is_update:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in WATCHED_MODELS:
+            orm_execute_state.session.info.setdefault(PENDING_KEY, set()).add(ALL_STATIONS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    stations = session.info.pop(PENDING_KEY, None)
+    if not stations:
+        return
+    if ALL_STATIONS in stations:
+        metrics_cache.invalidate()
+        return
+    for station_id in stations:
+        metrics_cache.invalidate(station_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(PENDING_KEY, None)
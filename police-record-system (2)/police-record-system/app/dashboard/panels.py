@@ -0,0 +1,96 @@
+"""
+Dashboard panels served one page at a time.
+
+The admin and inspector dashboards render only the panel frames; each panel
+then fetches its rows as an HTML fragment when it scrolls into view, and
+"Load more" fetches the next page:
+
+    GET /dashboard/panels/active-cases?status=&io=&q=&sort=&after=
+    GET /dashboard/panels/pending-firs?q=&sort=&after=
+
+Filters and sorts are limited to what the (station_id, status, created_at,
+id) indexes answer: ``status``, ``io`` (lead officer id, or "none"), ``q``
+(number prefix) and ``sort`` newest/oldest. Pages are keyset-paged on
+(created_at, id) like the case list, so deep pages cost the same as the
+first. The fragment's last row carries the cursor of the next page.
+"""
+from flask import abort, current_app, render_template, request
+from flask_login import current_user, login_required
+from sqlalchemy import tuple_
+
+from app.cases.pagination import decode_cursor, encode_cursor
+from app.dashboard import dashboard
+from app.loaders import with_profile
+from app.models import Case, FIR
+from app.utils import station_scoped
+
+# Statuses each role's assignment panel lists
+ACTIVE_STATUSES = {
+    'admin': ('Open', 'In Progress', 'Pending'),
+    'inspector': ('Open', 'In Progress'),
+}
+
+
+def _supervisor_only():
+    if current_user.role not in ACTIVE_STATUSES:
+        abort(403)
+
+
+def _prefix(column, text):
+    # Range on the unique index instead of LIKE, which SQLite would not index
+    return (column >= text) & (column < text + '\U0010ffff')
+
+
+def _keyset_page(query, model):
+    """
+    (rows, next cursor) of the page asked for by ``sort`` and ``after``.
+    """
+    per_page = current_app.config.get('DASHBOARD_PANEL_PAGE_SIZE', 25)
+    newest = request.args.get('sort') != 'oldest'
+    key = tuple_(model.created_at, model.id)
+    cursor = decode_cursor(request.args.get('after'))
+    if cursor is not None:
+        query = query.filter(key < tuple_(*cursor) if newest else key > tuple_(*cursor))
+    if newest:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    rows = query.limit(per_page + 1).all()
+    next_cursor = encode_cursor(rows[per_page - 1]) if len(rows) > per_page else None
+    return rows[:per_page], next_cursor
+
+
+@dashboard.route('/dashboard/panels/active-cases')
+@login_required
+def active_cases_panel():
+    _supervisor_only()
+    statuses = ACTIVE_STATUSES[current_user.role]
+    status = request.args.get('status')
+    query = with_profile(station_scoped(Case.query), 'case_row').filter(
+        Case.status == status if status in statuses else Case.status.in_(statuses))
+
+    io = request.args.get('io', '')
+    if io == 'none':
+        query = query.filter(Case.assigned_officer_id.is_(None))
+    elif io.isdigit():
+        query = query.filter(Case.assigned_officer_id == int(io))
+    q = request.args.get('q', '').strip()
+    if q:
+        query = query.filter(_prefix(Case.case_number, q))
+
+    cases, next_cursor = _keyset_page(query, Case)
+    # Rows pick their officer from the dashboard's single datalist
+    return render_template('dashboard/active_cases_rows.html', active_cases=cases, next_cursor=next_cursor)
+
+
+@dashboard.route('/dashboard/panels/pending-firs')
+@login_required
+def pending_firs_panel():
+    _supervisor_only()
+    query = station_scoped(FIR.query).filter(FIR.status == 'Pending', FIR.forwarded_to_sho.is_(True))
+    q = request.args.get('q', '').strip()
+    if q:
+        query = query.filter(_prefix(FIR.fir_number, q))
+
+    firs, next_cursor = _keyset_page(query, FIR)
+    return render_template('dashboard/pending_firs_rows.html', pending_firs_list=firs, next_cursor=next_cursor)
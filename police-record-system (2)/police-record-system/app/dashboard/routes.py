@@ -1,58 +1,53 @@
 from flask import render_template
 from flask_login import login_required, current_user
 from app.dashboard import dashboard
-from app.models import Case, User, FIR
+from app.models import Case, User
 
+from app.dashboard.metrics import station_metrics
+from app.dashboard.panels import ACTIVE_STATUSES
+from app.dashboard.station_stats import CASE_STATUS_COLUMNS, officer_workload, station_stats
+from app.loaders import with_profile
+from app.statement_guard import statement_limit
 from app.utils import station_scoped
 
 @dashboard.route('/dashboard/admin')
 @login_required
+@statement_limit(10)
 def admin_dashboard():
     if current_user.role != 'admin':
         return render_template('403.html'), 403
     
-    # Key Metrics (Station Scoped)
-    total_cases = station_scoped(Case.query).count()
-    total_users = station_scoped(User.query).count()
-    closed_cases = station_scoped(Case.query).filter_by(status='Closed').count()
-    pending_firs = station_scoped(FIR.query).filter_by(status='Pending').count()
-    
-    # Solved Rate
-    solved_rate = round((closed_cases / total_cases * 100), 1) if total_cases > 0 else 0
+    # Key Metrics (Station Scoped, one rollup row)
+    stats = station_stats(current_user.station_id)
+    solved_rate = round((stats.cases_closed / stats.cases_total * 100), 1) if stats.cases_total > 0 else 0
     
     # Recent Activity (Latest 5 cases)
-    recent_cases = station_scoped(Case.query).order_by(Case.created_at.desc()).limit(5).all()
+    recent_cases = with_profile(station_scoped(Case.query), 'case_row').order_by(Case.created_at.desc()).limit(5).all()
     
     # Case Status Distribution
-    status_counts = {
-        'Open': station_scoped(Case.query).filter_by(status='Open').count(),
-        'In Progress': station_scoped(Case.query).filter_by(status='In Progress').count(),
-        'Closed': closed_cases,
-        'Court': station_scoped(Case.query).filter_by(status='Court').count(),
-        'Pending': station_scoped(Case.query).filter_by(status='Pending').count()
-    }
+    status_counts = {status: getattr(stats, column) for status, column in CASE_STATUS_COLUMNS.items()}
+    workload = officer_workload(current_user.station_id)
     
-    # SHO Tasks (Merged for Admin)
-    pending_firs_list = station_scoped(FIR.query).filter_by(status='Pending', forwarded_to_sho=True).all()
-    active_cases = station_scoped(Case.query).filter(Case.status.in_(['Open', 'In Progress', 'Pending'])).all()
+    # SHO Tasks (Merged for Admin): panels load their rows on demand (app/dashboard/panels.py)
     assignable_officers = station_scoped(User.query).filter(User.role.in_(['io', 'officer'])).all()
     
     return render_template('admin_dashboard.html', 
-                           total_cases=total_cases, 
-                           total_users=total_users,
-                           closed_cases=closed_cases,
-                           pending_firs=pending_firs,
+                           total_cases=stats.cases_total, 
+                           total_users=stats.users,
+                           closed_cases=stats.cases_closed,
+                           pending_firs=stats.firs_pending,
                            solved_rate=solved_rate,
+                           workload=workload,
                            recent_cases=recent_cases,
                            status_counts=status_counts,
-                           pending_firs_list=pending_firs_list,
-                           active_cases=active_cases,
+                           active_statuses=ACTIVE_STATUSES['admin'],
                            ios=assignable_officers)
 
 from sqlalchemy import or_
 
 @dashboard.route('/dashboard/officer')
 @login_required
+@statement_limit(5)
 def officer_dashboard():
     # Officer sees cases where they are Lead OR Team Member
     my_cases = Case.query.filter(or_(
@@ -63,19 +58,16 @@ def officer_dashboard():
 
 @dashboard.route('/dashboard/inspector')
 @login_required
+@statement_limit(8)
 def inspector_dashboard():
     # Inspector sees all cases in station + SHO capabilities (Approvals/Assignments)
-    all_cases = station_scoped(Case.query).all()
-    
-    # SHO Tasks (Merged for Inspector)
-    pending_firs_list = station_scoped(FIR.query).filter_by(status='Pending', forwarded_to_sho=True).all()
-    active_cases = station_scoped(Case.query).filter(Case.status.in_(['Open', 'In Progress'])).all()
+    metrics = station_metrics(current_user.station_id)
     
+    # SHO Tasks (Merged for Inspector): panels load their rows on demand (app/dashboard/panels.py)
     # Fetch IOs and Officers for assignment
     assignable_officers = station_scoped(User.query).filter(User.role.in_(['io', 'officer'])).all()
     
     return render_template('inspector_dashboard.html', 
-                           cases=all_cases,
-                           pending_firs_list=pending_firs_list,
-                           active_cases=active_cases,
+                           metrics=metrics,
+                           active_statuses=ACTIVE_STATUSES['inspector'],
                            ios=assignable_officers)
@@ -0,0 +1,275 @@
+"""
+Station statistics rollup.
+
+``station_stats`` holds one row of dashboard figures per station (cases by
+status, pending and forwarded FIRs, open tasks, users) and
+``officer_task_stats`` the open tasks of each assignee, so the admin
+dashboard reads a single row however much history a station has. (The
+inspector dashboard counts through app/dashboard/metrics.py instead.)
+
+Mapper hooks on Case, FIR, Task and User turn every insert, delete and
+relevant change (status, station, assignee, SHO forwarding) into deltas,
+which an after_flush hook adds to the rows in the same transaction: the
+figures commit or roll back together with the writes they count. A station
+or officer without a row yet gets one counted from scratch.
+
+Bulk query.update()/delete() on those models bypass the hooks, as do writes
+from outside the app. ``flask reconcile-station-stats`` recounts everything,
+reports drift and rewrites the rollups.
+"""
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Case, FIR, OfficerTaskStats, Station, StationStats, Task, User
+
+PENDING_KEY = 'station_stats_deltas'
+CASE_STATUS_COLUMNS = {
+    'Open': 'cases_open',
+    'In Progress': 'cases_in_progress',
+    'Closed': 'cases_closed',
+    'Court': 'cases_court',
+    'Pending': 'cases_pending',
+}
+STAT_COLUMNS = ('cases_total', *CASE_STATUS_COLUMNS.values(), 'firs_pending', 'firs_forwarded', 'tasks_open', 'users')
+# Attributes the figures depend on
+TRACKED = {
+    Case: ('station_id', 'status'),
+    FIR: ('station_id', 'status', 'forwarded_to_sho'),
+    Task: ('station_id', 'status', 'assigned_to_id'),
+    User: ('station_id',),
+}
+
+
+def _contribution(model, values):
+    """
+    What one row with ``values`` adds to the rollups:
+    ({(station_id, column): n}, {(station_id, user_id): open tasks}).
+    """
+    station_id = values['station_id']
+    stats, officers = Counter(), Counter()
+    if model is Case:
+        stats[station_id, 'cases_total'] += 1
+        column = CASE_STATUS_COLUMNS.get(values['status'])
+        if column:
+            stats[station_id, column] += 1
+    elif model is FIR:
+        if values['status'] == 'Pending':
+            stats[station_id, 'firs_pending'] += 1
+            if values['forwarded_to_sho']:
+                stats[station_id, 'firs_forwarded'] += 1
+    elif model is Task:
+        if values['status'] != 'Completed':
+            stats[station_id, 'tasks_open'] += 1
+            officers[station_id, values['assigned_to_id']] += 1
+    else:
+        stats[station_id, 'users'] += 1
+    return stats, officers
+
+
+def _values(target, model, before=False):
+    values = {}
+    for key in TRACKED[model]:
+        history = inspect(target).attrs[key].history
+        values[key] = history.deleted[0] if before and history.deleted else getattr(target, key)
+    return values
+
+
+def _record(target, model, values, sign):
+    stats, officers = object_session(target).info.setdefault(PENDING_KEY, (Counter(), Counter()))
+    added_stats, added_officers = _contribution(model, values)
+    for key, n in added_stats.items():
+        stats[key] += sign * n
+    for key, n in added_officers.items():
+        officers[key] += sign * n
+
+
+def _on_insert(mapper, connection, target):
+    _record(target, mapper.class_, _values(target, mapper.class_), 1)
+
+
+def _on_update(mapper, connection, target):
+    model = mapper.class_
+    attrs = inspect(target).attrs
+    if any(attrs[key].history.has_changes() for key in TRACKED[model]):
+        _record(target, model, _values(target, model, before=True), -1)
+        _record(target, model, _values(target, model), 1)
+
+
+def _on_delete(mapper, connection, target):
+    _record(target, mapper.class_, _values(target, mapper.class_, before=True), -1)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for model, keys in TRACKED.items():
+    event.listen(model, 'after_insert', _on_insert)
+    event.listen(model, 'after_update', _on_update)
+    event.listen(model, 'after_delete', _on_delete)
+    for key in keys:
+        # Load the old value before it is replaced, so it can be taken back out
+        event.listen(getattr(model, key), 'set', _load_old_value, active_history=True)
+
+
+# --- Counting from scratch ---
+
+def count_stations(connection, station_id=None):
+    """
+    Rollups counted from the base tables, for one station or all of them:
+    ({station_id: Counter of STAT_COLUMNS}, {(station_id, user_id): open tasks}).
+    """
+    def scoped(query, model):
+        return query if station_id is None else query.where(model.station_id == station_id)
+
+    stations, officers = defaultdict(Counter), {}
+    ids = [station_id] if station_id is not None else connection.execute(select(Station.id)).scalars()
+    for sid in ids:
+        stations[sid]  # every station gets a row, even an empty one
+
+    cases = connection.execute(scoped(
+        select(Case.station_id, Case.status, func.count()).group_by(Case.station_id, Case.status), Case))
+    for sid, status, n in cases:
+        stations[sid]['cases_total'] += n
+        if status in CASE_STATUS_COLUMNS:
+            stations[sid][CASE_STATUS_COLUMNS[status]] += n
+
+    firs = connection.execute(scoped(
+        select(FIR.station_id, func.count(), func.count().filter(FIR.forwarded_to_sho.is_(True)))
+        .where(FIR.status == 'Pending').group_by(FIR.station_id), FIR))
+    for sid, pending, forwarded in firs:
+        stations[sid].update(firs_pending=pending, firs_forwarded=forwarded)
+
+    tasks = connection.execute(scoped(
+        select(Task.station_id, Task.assigned_to_id, func.count())
+        .where(or_(Task.status.is_(None), Task.status != 'Completed'))
+        .group_by(Task.station_id, Task.assigned_to_id), Task))
+    for sid, user_id, n in tasks:
+        stations[sid]['tasks_open'] += n
+        officers[sid, user_id] = n
+
+    users = connection.execute(scoped(
+        select(User.station_id, func.count()).group_by(User.station_id), User))
+    for sid, n in users:
+        if sid is not None:
+            stations[sid]['users'] = n
+    return stations, officers
+
+
+def _station_row(station_id, counts):
+    return {'station_id': station_id, **{column: counts.get(column, 0) for column in STAT_COLUMNS}}
+
+
+def _add_or_count(connection, table, key, change, counted_row):
+    # Adds ``change`` to the row at ``key``; a missing row is counted from
+    # scratch instead, which already includes this flush
+    where = [table.c[column] == value for column, value in key.items()]
+    add = update(table).where(*where).values({column: table.c[column] + n for column, n in change.items()})
+    if connection.execute(add).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(table).values(counted_row()))
+    except IntegrityError:
+        connection.execute(add)  # Another transaction created it first
+
+
+def _apply(connection, stats, officers):
+    changes = defaultdict(dict)
+    for (station_id, column), n in stats.items():
+        if n and station_id is not None:
+            changes[station_id][column] = n
+    for station_id, change in changes.items():
+        _add_or_count(connection, StationStats.__table__, {'station_id': station_id}, change,
+                      lambda: _station_row(station_id, count_stations(connection, station_id)[0][station_id]))
+
+    for (station_id, user_id), n in officers.items():
+        if n and station_id is not None and user_id is not None:
+            _add_or_count(
+                connection, OfficerTaskStats.__table__, {'station_id': station_id, 'user_id': user_id},
+                {'tasks_open': n},
+                lambda: {'station_id': station_id, 'user_id': user_id,
+                         'tasks_open': count_stations(connection, station_id)[1].get((station_id, user_id), 0)})
+
+
+@event.listens_for(Session, 'after_flush')
+def _on_flush(session, flush_context):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        _apply(session.connection(), *pending)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+# --- Reading and reconciling ---
+
+def station_stats(station_id):
+    """
+    The StationStats row of a station; counted on the spot (not stored) for a
+    station that has none yet.
+    """
+    row = db.session.get(StationStats, station_id) if station_id is not None else None
+    if row is None:
+        counts = count_stations(db.session.connection(), station_id)[0][station_id] if station_id else {}
+        row = StationStats(**_station_row(station_id, counts))
+    return row
+
+
+def officer_workload(station_id, limit=10):
+    """
+    (officer name, open tasks) of the busiest assignees of a station.
+    """
+    return db.session.execute(
+        select(User.full_name, OfficerTaskStats.tasks_open)
+        .join(User, User.id == OfficerTaskStats.user_id)
+        .where(OfficerTaskStats.station_id == station_id, OfficerTaskStats.tasks_open > 0)
+        .order_by(OfficerTaskStats.tasks_open.desc(), User.full_name)
+        .limit(limit)
+    ).all()
+
+
+def reconcile(apply=True):
+    """
+    Recounts every station and compares with the rollups. Returns the drift
+    as (station_id, user_id or None, column, stored, counted) tuples; with
+    ``apply`` the rollups are rewritten from the counts and committed.
+    """
+    connection = db.session.connection()
+    stations, officers = count_stations(connection)
+    stored = {row.station_id: row for row in connection.execute(select(StationStats.__table__))}
+    stored_officers = {(row.station_id, row.user_id): row.tasks_open
+                       for row in connection.execute(select(OfficerTaskStats.__table__))}
+
+    drift = []
+    for station_id in sorted(set(stations) | set(stored)):
+        row = stored.get(station_id)
+        if row is None and not any(stations[station_id].values()):
+            continue  # An empty station needs no row yet
+        for column in STAT_COLUMNS:
+            have = getattr(row, column) if row is not None else None
+            want = stations[station_id][column] if station_id in stations else None
+            if have != want:
+                drift.append((station_id, None, column, have, want))
+    for key in sorted(set(officers) | set(stored_officers), key=lambda k: (k[0], k[1] or 0)):
+        have, want = stored_officers.get(key, 0), officers.get(key, 0)
+        if have != want:
+            drift.append((key[0], key[1], 'tasks_open', have, want))
+
+    if apply and drift:
+        connection.execute(delete(OfficerTaskStats.__table__))
+        connection.execute(delete(StationStats.__table__))
+        rows = [_station_row(sid, counts) for sid, counts in stations.items()]
+        if rows:
+            connection.execute(insert(StationStats.__table__), rows)
+        rows = [{'station_id': sid, 'user_id': uid, 'tasks_open': n} for (sid, uid), n in officers.items()]
+        if rows:
+            connection.execute(insert(OfficerTaskStats.__table__), rows)
+        db.session.commit()
+    return drift
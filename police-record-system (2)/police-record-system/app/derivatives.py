@@ -0,0 +1,232 @@
+"""
+Thumbnails, previews and metadata of uploaded evidence.
+
+When a transaction that added Evidence with stored content commits, the new
+rows are handed to a small local thread pool (DERIVATIVE_WORKERS), which
+
+- for images writes a THUMBNAIL_SIZE thumbnail and a PREVIEW_SIZE preview
+  (JPEG, EXIF orientation applied) and records the EXIF tags;
+- for videos grabs a poster frame with ffmpeg, when it is installed, makes the
+  same two images from it and records what ffprobe reports.
+
+Derived files live under <EVIDENCE_STORE>/derived/<aa>/<bb>/<digest>/, keyed
+by the source content, so a duplicate upload is not processed twice. The case
+page shows them instead of the originals. Tags go to evidence_metadata, one
+(key, value) row each, indexed so e.g. every photo from one camera can be
+found.
+
+Images need Pillow and poster frames ffmpeg; without them the evidence just
+has no derivatives. ``flask derive-evidence`` processes rows the pool did not
+(older uploads, or DERIVATIVE_WORKERS=0).
+"""
+import json
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, insert
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.evidence_store import store_root, stored_file, stored_path
+from app.models import Evidence, EvidenceMetadata
+
+try:
+    from PIL import ExifTags, Image, ImageOps
+except ImportError:  # Pillow is optional
+    Image = None
+
+PENDING_KEY = 'evidence_derivatives'
+VALUE_MAX = 255
+POSTER_TIMEOUT = 120  # seconds for ffmpeg/ffprobe on one file
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def derived_location(digest, name):
+    return '/'.join(('derived', digest[:2], digest[2:4], digest, name))
+
+
+def _clean(value):
+    if isinstance(value, bytes):
+        return None  # MakerNote and other binary blobs
+    if isinstance(value, tuple):
+        value = ', '.join(str(v) for v in value)
+    value = str(value).strip('\x00 ')
+    return value[:VALUE_MAX] if value else None
+
+
+def _image_metadata(image):
+    tags = {'width': image.width, 'height': image.height, 'format': image.format}
+    exif = image.getexif()
+    for tag, value in list(exif.items()) + list(exif.get_ifd(ExifTags.IFD.Exif).items()):
+        tags[ExifTags.TAGS.get(tag, str(tag))] = value
+    for tag, value in exif.get_ifd(ExifTags.IFD.GPSInfo).items():
+        tags[ExifTags.GPSTAGS.get(tag, f'GPS{tag}')] = value
+    # IFD pointers, not values
+    tags.pop('ExifOffset', None)
+    tags.pop('GPSInfo', None)
+    return tags
+
+
+def _video_metadata(path):
+    ffprobe = shutil.which('ffprobe')
+    if not ffprobe:
+        return {}
+    try:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, timeout=POSTER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {}
+    if result.returncode:
+        return {}
+    probe = json.loads(result.stdout or b'{}')
+    fmt = probe.get('format', {})
+    tags = {'duration': fmt.get('duration'), 'format': fmt.get('format_name')}
+    tags.update(fmt.get('tags', {}))  # creation_time, location, ...
+    video = next((s for s in probe.get('streams', []) if s.get('codec_type') == 'video'), None)
+    if video:
+        tags.update(codec=video.get('codec_name'), width=video.get('width'), height=video.get('height'))
+    return tags
+
+
+def _video_poster(path):
+    # A frame one second in (or the first, for shorter clips) as a temporary JPEG
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return None
+    fd, poster = tempfile.mkstemp(suffix='.jpg')
+    os.close(fd)
+    for seek in ('1', '0'):
+        try:
+            result = subprocess.run(
+                [ffmpeg, '-v', 'error', '-y', '-ss', seek, '-i', path, '-frames:v', '1', poster],
+                capture_output=True, timeout=POSTER_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            break
+        if result.returncode == 0 and os.path.getsize(poster):
+            return poster
+    os.remove(poster)
+    return None
+
+
+def _write_jpeg(image, location, size):
+    path = os.path.join(store_root(), *location.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    small = image.copy()
+    small.thumbnail((size, size))
+    if small.mode not in ('RGB', 'L'):
+        small = small.convert('RGB')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            small.save(out, 'JPEG', quality=85)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def generate(evidence_id):
+    """
+    Creates the derivatives and metadata of one Evidence row and commits
+    them. Returns False when the row has no stored file to work from.
+    """
+    evidence = db.session.get(Evidence, evidence_id)
+    path = stored_file(evidence) if evidence is not None and evidence.sha256 else None
+    if path is None:
+        return False
+
+    config = current_app.config
+    kind = (mimetypes.guess_type(evidence.filename or '')[0] or '').split('/')[0]
+    tags, source, poster = {}, None, None
+    if kind == 'image':
+        source = path
+    elif kind == 'video':
+        tags = _video_metadata(path)
+        source = poster = _video_poster(path)
+
+    thumbnail = preview = None
+    if source and Image is not None:
+        thumbnail = derived_location(evidence.sha256, 'thumb.jpg')
+        preview = derived_location(evidence.sha256, 'preview.jpg')
+        try:
+            with Image.open(source) as image:
+                if kind == 'image':
+                    tags.update(_image_metadata(image))
+                if not (stored_path(thumbnail) and stored_path(preview)):
+                    # Let the JPEG decoder scale down while reading
+                    image.draft('RGB', (config['PREVIEW_SIZE'], config['PREVIEW_SIZE']))
+                    image = ImageOps.exif_transpose(image)
+                    _write_jpeg(image, preview, config['PREVIEW_SIZE'])
+                    _write_jpeg(image, thumbnail, config['THUMBNAIL_SIZE'])
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            current_app.logger.warning('No derivatives for evidence %s: %s', evidence.id, e)
+            thumbnail = preview = None
+    if poster:
+        os.remove(poster)
+
+    evidence.thumbnail = thumbnail
+    evidence.preview = preview
+    evidence.derived_at = datetime.utcnow()
+    db.session.execute(delete(EvidenceMetadata).where(EvidenceMetadata.evidence_id == evidence.id))
+    rows = [{'evidence_id': evidence.id, 'key': str(key)[:100], 'value': value}
+            for key, value in ((k, _clean(v)) for k, v in tags.items()) if value is not None]
+    if rows:
+        db.session.execute(insert(EvidenceMetadata), rows)
+    db.session.commit()
+    return True
+
+
+def _run(app, evidence_ids):
+    with app.app_context():
+        for evidence_id in evidence_ids:
+            try:
+                generate(evidence_id)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Deriving evidence %s failed', evidence_id)
+
+
+def schedule(evidence_ids):
+    """
+    Queues Evidence rows for derivative generation on the worker pool.
+    Returns the Future, or None when the pool is off.
+    """
+    global _executor
+    workers = current_app.config.get('DERIVATIVE_WORKERS') or 0
+    if not workers or not evidence_ids:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='evidence-derive')
+    return _executor.submit(_run, current_app._get_current_object(), list(evidence_ids))
+
+
+# --- ORM hooks ---
+
+@event.listens_for(Evidence, 'after_insert')
+def _queue_new_evidence(mapper, connection, target):
+    session = object_session(target)
+    if target.sha256 and session is not None:
+        session.info.setdefault(PENDING_KEY, []).append(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    evidence_ids = session.info.pop(PENDING_KEY, None)
+    if evidence_ids and has_app_context():
+        schedule(evidence_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(PENDING_KEY, None)
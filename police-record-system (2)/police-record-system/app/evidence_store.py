@@ -0,0 +1,149 @@
+"""
+Content-addressed evidence storage.
+
+Uploads are streamed to a temporary file in EVIDENCE_CHUNK_SIZE pieces while
+their SHA-256 is computed, then moved into place under their digest:
+
+    <EVIDENCE_STORE>/sha256/ab/cd/abcd1234...
+
+Two levels of two hex characters keep directories small. Identical content is
+stored once however many Evidence rows point at it, and two uploads can never
+overwrite each other as they could with timestamped names. Evidence.location
+holds the path relative to the store root, as it did for the old uploads.
+The store is not public; files are served by the cases.evidence_file route.
+"""
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+
+from flask import current_app
+from werkzeug.security import safe_join
+
+Blob = namedtuple('Blob', 'sha256 size location')
+
+
+def store_root():
+    return current_app.config['EVIDENCE_STORE']
+
+
+def blob_location(digest):
+    return '/'.join(('sha256', digest[:2], digest[2:4], digest))
+
+
+def blob_path(location):
+    """
+    Absolute path of a stored file from its Evidence.location.
+    """
+    return os.path.join(store_root(), *location.split('/'))
+
+
+def stored_path(location):
+    """
+    Absolute path of a file in the store, or None when ``location`` is not
+    one (a shelf, "Pending Upload", a path leading outside the store, ...).
+    """
+    if not location:
+        return None
+    path = safe_join(store_root(), location)
+    return path if path and os.path.isfile(path) else None
+
+
+def stored_file(evidence):
+    return stored_path(evidence.location)
+
+
+def temp_dir():
+    # Inside the store so finished files can be renamed into place
+    path = os.path.join(store_root(), 'tmp')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def ingest(tmp_path, digest, size):
+    """
+    Moves a completely written temporary file (on the store's filesystem) to
+    its place under ``digest``, or drops it when that content is already
+    stored. Returns the Blob.
+    """
+    location = blob_location(digest)
+    path = blob_path(location)
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return Blob(digest, size, location)
+
+
+def save_stream(stream):
+    """
+    Stores everything read from a binary stream. Returns the Blob.
+    """
+    chunk_size = current_app.config['EVIDENCE_CHUNK_SIZE']
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=temp_dir(), prefix='upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        return ingest(tmp_path, digest.hexdigest(), size)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def part_path(upload_id):
+    """
+    Where the received bytes of a resumable upload session are kept.
+    """
+    return os.path.join(temp_dir(), f'{upload_id}.part')
+
+
+def write_at(path, offset, stream):
+    """
+    Writes a binary stream into ``path`` from ``offset`` on, a chunk at a
+    time, cutting off anything after it. Returns (bytes written, SHA-256 hex
+    of those bytes).
+    """
+    chunk_size = current_app.config['EVIDENCE_CHUNK_SIZE']
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as out:
+        out.seek(offset)
+        out.truncate()
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+            written += len(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    return written, digest.hexdigest()
+
+
+def file_digest(path):
+    chunk_size = current_app.config['EVIDENCE_CHUNK_SIZE']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_upload(file):
+    """
+    Stores an uploaded werkzeug FileStorage. Returns the Blob.
+    """
+    return save_stream(file.stream)
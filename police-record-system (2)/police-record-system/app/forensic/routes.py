@@ -2,6 +2,7 @@ from flask import render_template
 from flask_login import login_required
 from app.forensic import forensic
 from app.models import Evidence
+from app.loaders import with_profile
 from app.utils import roles_required
 
 @forensic.route('/forensic/dashboard')
@@ -9,5 +10,5 @@ from app.utils import roles_required
 @roles_required('forensic')
 def dashboard():
     # Show evidence needing analysis
-    evidence = Evidence.query.all()
+    evidence = with_profile(Evidence.query, 'evidence_row').all()
     return render_template('forensic_dashboard.html', evidence=evidence)
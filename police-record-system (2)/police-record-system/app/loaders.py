@@ -0,0 +1,47 @@
+"""
+Named eager-loading profiles.
+
+A view applies the profile matching what its template walks, so each
+relationship is fetched once for the whole page (selectinload for
+collections, joinedload for single related rows) instead of once per row:
+
+    case = with_profile(Case.query, 'case_detail').filter_by(id=case_id).first_or_404()
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Case, Evidence, FIR, Task
+
+# Built on use: backref attributes (Case.tasks, Case.reporter) only exist
+# once the mappers are configured
+PROFILES = {
+    # case_detail.html: team, tasks and their assignees, participants,
+    # evidence and custodians, FIRs, lead officer and reporter
+    'case_detail': lambda: (
+        joinedload(Case.assignee),
+        joinedload(Case.reporter),
+        selectinload(Case.officers),
+        selectinload(Case.participants),
+        selectinload(Case.firs),
+        selectinload(Case.evidence).joinedload(Evidence.custodian),
+        selectinload(Case.tasks).joinedload(Task.assigned_to),
+    ),
+    # Dashboard case rows showing the lead officer
+    'case_row': lambda: (
+        joinedload(Case.assignee),
+    ),
+    # FIR rows showing who filed them
+    'fir_row': lambda: (
+        joinedload(FIR.filer),
+    ),
+    # Evidence rows showing their case number
+    'evidence_row': lambda: (
+        joinedload(Evidence.case),
+    ),
+}
+
+
+def with_profile(query, name):
+    """
+    Applies the named loader profile to a query.
+    """
+    return query.options(*PROFILES[name]())
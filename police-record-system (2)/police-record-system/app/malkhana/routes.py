@@ -2,6 +2,7 @@ from flask import render_template
 from flask_login import login_required
 from app.malkhana import malkhana
 from app.models import Evidence
+from app.loaders import with_profile
 from app.utils import roles_required
 
 @malkhana.route('/malkhana/dashboard')
@@ -9,5 +10,5 @@ from app.utils import roles_required
 @roles_required('malkhana')
 def dashboard():
     # Show evidence in custody
-    evidence = Evidence.query.all()
+    evidence = with_profile(Evidence.query, 'evidence_row').all()
     return render_template('malkhana_dashboard.html', evidence=evidence)
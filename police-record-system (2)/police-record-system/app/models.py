@@ -3,7 +3,11 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer as Serializer
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import validates
 from app import db, login_manager
+from app.phonetic import phonetic_key
+from app.transliteration import to_latin
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -18,6 +22,33 @@ class Station(db.Model):
     settings = db.Column(db.Text) # JSON string for extra settings
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class NumberSequence(db.Model):
+    # Last number handed out per numbering series and year (see app/sequences.py)
+    kind = db.Column(db.String(20), primary_key=True) # case, fir
+    series = db.Column(db.String(50), primary_key=True) # number format, e.g. "FIR-{year}-{num}"
+    year = db.Column(db.Integer, primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+class StationStats(db.Model):
+    # Dashboard figures of a station, kept up to date by deltas (see app/dashboard/station_stats.py)
+    station_id = db.Column(db.Integer, db.ForeignKey('station.id'), primary_key=True)
+    cases_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cases_open = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cases_in_progress = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cases_closed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cases_court = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cases_pending = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    firs_pending = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    firs_forwarded = db.Column(db.Integer, nullable=False, default=0, server_default='0') # Pending and forwarded to the SHO
+    tasks_open = db.Column(db.Integer, nullable=False, default=0, server_default='0') # Not yet Completed
+    users = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class OfficerTaskStats(db.Model):
+    # Open tasks per assignee and station (see app/dashboard/station_stats.py)
+    station_id = db.Column(db.Integer, db.ForeignKey('station.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    tasks_open = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.Integer, db.ForeignKey('station.id'), nullable=False)
@@ -46,6 +77,8 @@ class User(db.Model, UserMixin):
     # Roles: clerk, sho, io, malkhana, forensic, court, admin, inspector, officer
     role = db.Column(db.String(50), nullable=False)
     full_name = db.Column(db.String(120), nullable=False)
+    full_name_phonetic = db.Column(db.String(120), index=True) # phonetic_key(full_name)
+    full_name_latin = db.Column(db.String(120), index=True) # to_latin(full_name), Devanagari names only
     badge_number = db.Column(db.String(50))
     
     # Hierarchy: Officer reports to Inspector
@@ -63,6 +96,12 @@ class User(db.Model, UserMixin):
     
     # assigned_cases relationship handled via backref in Case (Primary Assignee) and Secondary table (Team)
 
+    @validates('full_name')
+    def _set_full_name_keys(self, key, value):
+        self.full_name_phonetic = phonetic_key(value)
+        self.full_name_latin = to_latin(value)
+        return value
+
     def can(self, action, obj=None):
         """
         Checks if user can perform action on object.
@@ -119,11 +158,13 @@ class Case(db.Model):
     
     # Identification
     title = db.Column(db.String(200), nullable=False)
+    title_latin = db.Column(db.String(200), index=True) # to_latin(title), Devanagari titles only
     
     # Incident Details
     offense_type = db.Column(db.String(100)) # Theft, Assault, Cybercrime
     short_description = db.Column(db.String(255))
     description = db.Column(db.Text, nullable=False) # Detailed Description
+    description_latin = db.Column(db.Text) # to_latin(description), indexed through case_fts
     incident_date = db.Column(db.DateTime)
     location = db.Column(db.String(200)) # Address
     gps_coordinates = db.Column(db.String(100)) # "Lat, Long"
@@ -149,6 +190,10 @@ class Case(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    children_updated_at = db.Column(db.DateTime) # Last write to its participants, evidence, FIRs, tasks, statements, updates or team (app/cases/counters.py)
+    evidence_count = db.Column(db.Integer, default=0, server_default='0', nullable=False) # Kept up to date by app/cases/counters.py
+    participant_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    open_task_count = db.Column(db.Integer, default=0, server_default='0', nullable=False) # Tasks not yet Completed
     
     # Foreign Keys
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -166,10 +211,35 @@ class Case(db.Model):
     statements = db.relationship('Statement', backref='case', lazy=True)
     updates = db.relationship('InvestigationUpdate', backref='case', lazy=True)
 
+    __table_args__ = (
+        # Case list order; keyset pagination seeks on (created_at, id) per station
+        db.Index('ix_case_station_id_created_at_id', 'station_id', 'created_at', 'id'),
+        # Dashboard panels filter by status and page on (created_at, id)
+        db.Index('ix_case_station_id_status_created_at_id', 'station_id', 'status', 'created_at', 'id'),
+    )
+
+    @validates('title', 'description')
+    def _set_latin(self, key, value):
+        setattr(self, f'{key}_latin', to_latin(value))
+        return value
+
+    @hybrid_property
+    def last_activity_at(self):
+        # Last edit of the case or of anything shown with it
+        stamps = [t for t in (self.updated_at, self.children_updated_at) if t]
+        return max(stamps) if stamps else None
+
+    @last_activity_at.expression
+    def last_activity_at(cls):
+        return db.case((cls.children_updated_at > cls.updated_at, cls.children_updated_at),
+                       else_=cls.updated_at)
+
 class Participant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     case_id = db.Column(db.Integer, db.ForeignKey('case.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
+    name_phonetic = db.Column(db.String(100), index=True) # phonetic_key(name)
+    name_latin = db.Column(db.String(100), index=True) # to_latin(name), Devanagari names only
     type = db.Column(db.String(50), nullable=False) # Victim, Suspect, Witness, Complainant
     contact_info = db.Column(db.String(200))
     details = db.Column(db.Text) # Statement or Description
@@ -183,6 +253,12 @@ class Participant(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @validates('name')
+    def _set_name_keys(self, key, value):
+        self.name_phonetic = phonetic_key(value)
+        self.name_latin = to_latin(value)
+        return value
+
 class FIR(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.Integer, db.ForeignKey('station.id'), nullable=False)
@@ -202,11 +278,20 @@ class FIR(db.Model):
     station = db.relationship('Station', backref='firs')
     approved_by = db.relationship('User', foreign_keys=[approved_by_id])
 
+    __table_args__ = (
+        # Pending FIR panel: status filter, pages on (created_at, id)
+        db.Index('ix_fir_station_id_status_created_at_id', 'station_id', 'status', 'created_at', 'id'),
+    )
+
 class Criminal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.Integer, db.ForeignKey('station.id'), nullable=False)
     name = db.Column(db.String(120), nullable=False)
     aliases = db.Column(db.String(200))
+    name_phonetic = db.Column(db.String(120), index=True) # phonetic_key(name)
+    aliases_phonetic = db.Column(db.String(200), index=True) # phonetic_key(aliases)
+    name_latin = db.Column(db.String(120), index=True) # to_latin(name), Devanagari names only
+    aliases_latin = db.Column(db.String(200), index=True) # to_latin(aliases)
     dob = db.Column(db.Date)
     gender = db.Column(db.String(20))
     address = db.Column(db.Text)
@@ -217,6 +302,12 @@ class Criminal(db.Model):
     
     station = db.relationship('Station', backref='criminals')
 
+    @validates('name', 'aliases')
+    def _set_keys(self, key, value):
+        setattr(self, f'{key}_phonetic', phonetic_key(value))
+        setattr(self, f'{key}_latin', to_latin(value))
+        return value
+
 # Association Table for Case <-> Criminal
 case_criminal = db.Table('case_criminal',
     db.Column('case_id', db.Integer, db.ForeignKey('case.id'), primary_key=True),
@@ -231,6 +322,12 @@ class Evidence(db.Model):
     type = db.Column(db.String(50)) # Physical, Digital, Document
     custodian_id = db.Column(db.Integer, db.ForeignKey('user.id')) # Current holder (Malkhana/IO)
     location = db.Column(db.String(100)) # Shelf A, Server, etc.
+    sha256 = db.Column(db.String(64), index=True) # Digest of uploaded content (see app/evidence_store.py)
+    size = db.Column(db.BigInteger) # Bytes
+    filename = db.Column(db.String(255)) # Name the file was uploaded as
+    thumbnail = db.Column(db.String(100)) # Store location of the small JPEG (see app/derivatives.py)
+    preview = db.Column(db.String(100)) # Store location of the screen-sized JPEG
+    derived_at = db.Column(db.DateTime) # When derivatives were last generated
     status = db.Column(db.String(50), default='In Custody') # In Custody, Checked Out, Destroyed
     qr_code = db.Column(db.String(100))
     collected_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -239,6 +336,34 @@ class Evidence(db.Model):
     station = db.relationship('Station', backref='evidence')
     custodian = db.relationship('User', foreign_keys=[custodian_id])
 
+class EvidenceMetadata(db.Model):
+    # EXIF / container tags of an evidence file, one row per tag (app/derivatives.py)
+    id = db.Column(db.Integer, primary_key=True)
+    evidence_id = db.Column(db.Integer, db.ForeignKey('evidence.id'), nullable=False, index=True)
+    key = db.Column(db.String(100), nullable=False) # e.g. Model, DateTimeOriginal, duration
+    value = db.Column(db.String(255))
+
+    evidence = db.relationship('Evidence', backref=db.backref('metadata_entries', lazy=True, cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.Index('ix_evidence_metadata_key_value', 'key', 'value'),
+    )
+
+class UploadSession(db.Model):
+    # Resumable evidence upload in progress (app/cases/uploads.py)
+    id = db.Column(db.String(32), primary_key=True) # Random token
+    station_id = db.Column(db.Integer, db.ForeignKey('station.id'), nullable=False)
+    case_id = db.Column(db.Integer, db.ForeignKey('case.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.String(200))
+    size = db.Column(db.BigInteger, nullable=False) # Declared total bytes
+    sha256 = db.Column(db.String(64)) # Expected digest of the whole file, if the client sent one
+    received = db.Column(db.BigInteger, nullable=False, default=0) # Bytes stored so far
+    chunk_token = db.Column(db.String(32)) # Request currently writing the chunk at ``received``, if any
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True) # Last chunk; stale sessions are collected
+
 class Statement(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     station_id = db.Column(db.Integer, db.ForeignKey('station.id'), nullable=False)
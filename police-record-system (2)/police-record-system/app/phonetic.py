@@ -0,0 +1,66 @@
+"""
+Phonetic keys for Indian names.
+
+A Double-Metaphone-style reduction tuned for transliterated Indic names, so
+common spelling variants share a key:
+
+    Deshmukh / Deshmuk / देशमुख  -> DSMK
+    Rathod / Rathore / राठोड     -> RTR
+
+Each word of a name is keyed separately and the keys are joined with spaces
+("Ajay Rathod" -> "AJ RTR"). Devanagari is transliterated to ITRANS first.
+"""
+import re
+
+from indic_transliteration import sanscript
+
+from app.transliteration import has_devanagari
+
+# Aspirated and alternative spellings of the same sound; longest first
+_REPLACEMENTS = (
+    ('chh', 'c'), ('ksh', 'ks'), ('ch', 'c'), ('sh', 's'), ('kh', 'k'),
+    ('gh', 'g'), ('th', 't'), ('dh', 'd'), ('bh', 'b'), ('ph', 'f'),
+    ('jh', 'j'), ('ck', 'k'), ('x', 'ks'), ('q', 'k'), ('z', 'j'), ('w', 'v'),
+)
+_VOWELS = 'aeiouy'
+
+
+def word_key(word):
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    for old, new in _REPLACEMENTS:
+        word = word.replace(old, new)
+
+    # Silent endings: schwa / final e (Rama, Rathore) and a trailing h (Shah)
+    if len(word) > 2:
+        word = word.rstrip('h')
+        word = re.sub(r'(?<=.)[ae]$', '', word)
+    # Retroflex flap: a final d or r after a vowel is the same sound (Rathod/Rathore)
+    word = re.sub(r'(?<=[aeiouy])[dr]$', 'R', word)
+    # Nasal before a labial (Champak/Chanpak)
+    word = re.sub(r'm(?=[bp])', 'n', word)
+
+    first, rest = word[0], word[1:]
+    key = 'A' if first in _VOWELS else first.upper()
+    for ch in rest:
+        if ch in _VOWELS or ch == 'h':
+            continue
+        ch = ch.upper()
+        if key[-1] != ch:
+            key += ch
+    return key
+
+
+def phonetic_key(name):
+    """
+    Returns the phonetic key of a name, or None for an empty name.
+    """
+    if not name:
+        return None
+    if has_devanagari(name):
+        name = sanscript.transliterate(name, sanscript.DEVANAGARI, sanscript.ITRANS)
+        # ITRANS writes the anusvara as M; it is heard as n (shiMde -> Shinde)
+        name = name.replace('M', 'n')
+    keys = [k for k in (word_key(w) for w in name.split()) if k]
+    return ' '.join(keys) or None
@@ -0,0 +1,82 @@
+"""
+Result cache for /search_name.
+
+The typeahead sends the same prefixes over and over ("ra", "raj", "raje"...)
+from every officer of a station, so finished result lists are kept in a
+bounded LRU keyed by (station_id, generation, query, mode, threshold, limit).
+The query is keyed in the folded form it is scored in (scoring.fold), so
+"Patil", "patil" and " PATIL " share one entry.
+
+Every station has a generation counter that is bumped whenever a committed
+write touches its searchable records or its name index is rebuilt. Bumping
+makes all older keys of that station unreachable; they are never looked up
+again and age out of the LRU on their own.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from app.search.scoring import fold
+
+
+class ResultCache:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, station_id, query, mode, threshold, limit):
+        generation = (self._epoch, self._generations.get(station_id, 0))
+        return (station_id, generation, fold(query), mode, threshold, limit)
+
+    def get(self, key):
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key, results):
+        max_size = current_app.config.get('SEARCH_CACHE_SIZE')
+        if not max_size:
+            return
+        with self._lock:
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def bump(self, station_id=None):
+        """
+        Starts a new generation for a station, or for every station.
+        """
+        with self._lock:
+            if station_id is None:
+                self._epoch += 1
+            else:
+                self._generations[station_id] = self._generations.get(station_id, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': current_app.config.get('SEARCH_CACHE_SIZE'),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache()
@@ -0,0 +1,468 @@
+"""
+In-process fuzzy name index for /search_name.
+
+Each station gets a StationIndex holding the search candidates (name, source,
+id, details, url) of its Cases, Criminals, Participants and Users. The index is
+built from the database the first time a station is searched and is then kept
+current from ORM write events, so a keystroke never reloads the station tables.
+
+Writes are collected from the mapper after_insert/after_update/after_delete
+hooks while the session flushes and are only applied once the transaction
+commits; a rollback discards them. Every change to a station's index also
+starts a new generation of that station in the /search_name result cache.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Case, Criminal, Participant, User
+from app.phonetic import phonetic_key
+from app.search.cache import result_cache
+from app.search.ngrams import ngrams, normalize, transposed_ngrams
+
+PENDING_KEY = 'search_index_ops'
+# Execution option for bulk statements whose index updates the caller queues
+# itself (see queue_participants); they then skip the blanket invalidation
+SYNCED_OPTION = 'search_index_synced'
+
+
+# --- Candidate builders ---
+
+def case_candidates(c):
+    candidates = [
+        # Case Number (High value)
+        {'name': c.case_number, 'source': 'Case', 'id': c.id,
+         'details': c.title, 'url': f"/cases/{c.id}"},
+        {'name': c.title, 'source': 'Case Title', 'id': c.id,
+         'details': f"#{c.case_number}", 'url': f"/cases/{c.id}",
+         'latin': c.title_latin},
+    ]
+    if c.offense_type:
+        candidates.append({'name': c.offense_type, 'source': 'Incident Type', 'id': c.id,
+                           'details': f"Case #{c.case_number}", 'url': f"/cases/{c.id}"})
+    if c.location:
+        candidates.append({'name': c.location, 'source': 'Incident Location', 'id': c.id,
+                           'details': f"Case #{c.case_number}", 'url': f"/cases/{c.id}"})
+    return candidates
+
+
+def criminal_candidates(c):
+    candidates = [
+        {'name': c.name, 'source': 'Suspect/Criminal', 'id': c.id,
+         'details': f"Status: {c.status}", 'url': f"/criminals/{c.id}",
+         'phonetic': c.name_phonetic, 'latin': c.name_latin},
+    ]
+    if c.aliases:
+        candidates.append({'name': c.aliases, 'source': f'Alias ({c.name})', 'id': c.id,
+                           'details': f"Status: {c.status}", 'url': f"/criminals/{c.id}",
+                           'phonetic': c.aliases_phonetic, 'latin': c.aliases_latin})
+    return candidates
+
+
+def participant_candidates(p, case_number):
+    return [
+        {'name': p.name, 'source': f'{p.type} (Name)', 'id': p.id,
+         'details': f"Case: {case_number or 'Unknown'}", 'url': f"/cases/{p.case_id}",
+         'phonetic': p.name_phonetic, 'latin': p.name_latin},
+    ]
+
+
+def user_candidates(u):
+    return [
+        {'name': u.full_name, 'source': f'Officer ({u.role})', 'id': u.id,
+         'details': u.badge_number, 'url': "/admin/users",
+         'phonetic': u.full_name_phonetic, 'latin': u.full_name_latin},
+    ]
+
+
+# --- Index ---
+
+class StationIndex:
+    """
+    Candidates of a single station.
+
+    Records are keyed by (kind, id), e.g. ('case', 12); one record expands to
+    one or more candidates, each stored in a slot of the parallel ``names``,
+    ``latin`` (shadow spelling of Devanagari names, '' if none) and ``entries``
+    lists. ``postings`` maps every n-gram to the slots containing
+    it, so a query can be narrowed to a shortlist before any fuzzy scoring;
+    ``phonetic`` does the same for the words of a name's stored phonetic key.
+
+    Names of at most ``ngram_size + 1`` characters (an alias like "Don" or
+    "भाऊ") are kept in ``short`` and always join the shortlist: they have too
+    few grams to rank by overlap, yet WRatio's partial matching can score
+    them above the threshold against a longer query.
+    """
+
+    def __init__(self, station_id, ngram_size=3):
+        self.station_id = station_id
+        self.ngram_size = ngram_size
+        self.built_at = time.monotonic()
+        self.stale = False
+        self.records = {}
+        self.names = []
+        self.latin = []
+        self.entries = []
+        self.postings = defaultdict(set)
+        self.phonetic = defaultdict(set)
+        self.short = set()
+        self._free = []
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def __len__(self):
+        return len(self.names) - len(self._free)
+
+    def is_fresh(self, max_age=None):
+        if self.stale:
+            return False
+        return not (max_age and time.monotonic() - self.built_at > max_age)
+
+    def put(self, record_key, candidates):
+        with self._lock:
+            self._release(record_key)
+            slots = []
+            for c in candidates:
+                if not c['name']:
+                    continue
+                name, latin = str(c['name']), c.get('latin') or ''
+                if self._free:
+                    slot = self._free.pop()
+                    self.names[slot], self.latin[slot], self.entries[slot] = name, latin, c
+                else:
+                    slot = len(self.names)
+                    self.names.append(name)
+                    self.latin.append(latin)
+                    self.entries.append(c)
+                for gram in self._grams(slot):
+                    self.postings[gram].add(slot)
+                for word_key in (c.get('phonetic') or '').split():
+                    self.phonetic[word_key].add(slot)
+                if self._is_short(name) or self._is_short(latin):
+                    self.short.add(slot)
+                slots.append(slot)
+            self.records[record_key] = slots
+            self._snapshot = None
+
+    def remove(self, record_key):
+        """
+        Drops a record's candidates; returns False if the record was not here.
+        """
+        with self._lock:
+            if record_key not in self.records:
+                return False
+            self._release(record_key)
+            self._snapshot = None
+            return True
+
+    def _release(self, record_key):
+        for slot in self.records.pop(record_key, ()):
+            for gram in self._grams(slot):
+                _discard(self.postings, gram, slot)
+            for word_key in (self.entries[slot].get('phonetic') or '').split():
+                _discard(self.phonetic, word_key, slot)
+            self.short.discard(slot)
+            self.names[slot], self.latin[slot], self.entries[slot] = '', '', None
+            self._free.append(slot)
+
+    def _is_short(self, text):
+        return 0 < len(normalize(text)) <= self.ngram_size + 1
+
+    def _grams(self, slot):
+        return ngrams(self.names[slot], self.ngram_size) | ngrams(self.latin[slot], self.ngram_size)
+
+    def _view(self, slots):
+        return (tuple(self.names[s] for s in slots), tuple(self.latin[s] for s in slots),
+                tuple(self.entries[s] for s in slots))
+
+    def snapshot(self):
+        """
+        Returns (names, latin, entries) of every candidate as parallel tuples.
+        """
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._view([s for s, e in enumerate(self.entries) if e is not None])
+                snap = self._snapshot
+        return snap
+
+    def shortlist(self, queries, size):
+        """
+        Returns (names, latin, entries) of the ``size`` candidates sharing the
+        most n-grams with any of the queries (or with one of their transposed
+        spellings), followed by every short candidate.
+        """
+        grams = set()
+        for q in queries:
+            grams |= ngrams(q, self.ngram_size) | transposed_ngrams(q, self.ngram_size)
+        with self._lock:
+            counts = Counter()
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting:
+                    counts.update(posting)
+            slots = [slot for slot, _ in counts.most_common(size)]
+            slots += sorted(self.short.difference(slots))
+            return self._view(slots)
+
+    def phonetic_matches(self, queries, size):
+        """
+        Returns (names, latin, entries) of at most ``size`` candidates whose
+        name shares a phonetic word key with any of the queries, most shared first.
+        """
+        word_keys = set()
+        for q in queries:
+            word_keys.update((phonetic_key(q) or '').split())
+        with self._lock:
+            counts = Counter()
+            for word_key in word_keys:
+                posting = self.phonetic.get(word_key)
+                if posting:
+                    counts.update(posting)
+            slots = [slot for slot, _ in counts.most_common(size)]
+            return self._view(slots)
+
+    def candidates(self, queries, shortlist_size=None):
+        """
+        Candidates worth scoring for the queries: the n-gram shortlist when the
+        station is larger than ``shortlist_size``, otherwise everything.
+        """
+        if shortlist_size and len(self) > shortlist_size:
+            return self.shortlist(queries, shortlist_size)
+        return self.snapshot()
+
+
+def _discard(postings, key, slot):
+    posting = postings.get(key)
+    if posting is not None:
+        posting.discard(slot)
+        if not posting:
+            del postings[key]
+
+
+class NameIndex:
+    """
+    Registry of StationIndex objects for this process.
+
+    Another worker process never sees our commits, so each station index is
+    also rebuilt once it is older than SEARCH_INDEX_MAX_AGE seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stations = {}
+        self._building = {}
+        self._build_locks = {}
+
+    def get(self, station_id):
+        max_age = current_app.config.get('SEARCH_INDEX_MAX_AGE')
+        index = self._stations.get(station_id)
+        if index is not None and index.is_fresh(max_age):
+            return index
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(station_id, threading.Lock())
+        with build_lock:
+            index = self._stations.get(station_id)
+            if index is not None and index.is_fresh(max_age):
+                return index
+
+            # Writes committed while we load are queued and replayed afterwards
+            with self._lock:
+                self._building[station_id] = []
+            try:
+                index = self._load(station_id)
+            except Exception:
+                with self._lock:
+                    self._building.pop(station_id, None)
+                raise
+            with self._lock:
+                for op in self._building.pop(station_id):
+                    self._apply_to(index, op)
+                self._stations[station_id] = index
+            result_cache.bump(station_id)
+        return index
+
+    def _load(self, station_id):
+        """
+        Loads a station with one column-only query per source; rows are tuples
+        carrying just the fields the candidate builders read.
+        """
+        index = StationIndex(station_id, current_app.config.get('SEARCH_NGRAM_SIZE', 3))
+        session = db.session
+
+        # 1. Cases & Incidents (Case Number, Title, Offense, Location)
+        cases = session.execute(
+            select(Case.id, Case.case_number, Case.title, Case.title_latin, Case.offense_type, Case.location)
+            .where(Case.station_id == station_id)
+        )
+        for c in cases:
+            index.put(('case', c.id), case_candidates(c))
+
+        # 2. Suspects (Criminals)
+        criminals = session.execute(
+            select(Criminal.id, Criminal.name, Criminal.aliases, Criminal.status,
+                   Criminal.name_phonetic, Criminal.aliases_phonetic,
+                   Criminal.name_latin, Criminal.aliases_latin)
+            .where(Criminal.station_id == station_id)
+        )
+        for c in criminals:
+            index.put(('criminal', c.id), criminal_candidates(c))
+
+        # 3. Names (Participants), scoped and labelled through their Case
+        participants = session.execute(
+            select(Participant.id, Participant.name, Participant.name_phonetic, Participant.name_latin, Participant.type,
+                   Participant.case_id, Case.case_number)
+            .join(Case, Participant.case_id == Case.id)
+            .where(Case.station_id == station_id)
+        )
+        for p in participants:
+            index.put(('participant', p.id), participant_candidates(p, p.case_number))
+
+        # 4. Names (Officers/Users)
+        users = session.execute(
+            select(User.id, User.full_name, User.full_name_phonetic, User.full_name_latin, User.role, User.badge_number)
+            .where(User.station_id == station_id)
+        )
+        for u in users:
+            index.put(('user', u.id), user_candidates(u))
+
+        return index
+
+    def apply(self, ops):
+        with self._lock:
+            for op in ops:
+                for queue in self._building.values():
+                    queue.append(op)
+                for index in self._stations.values():
+                    self._apply_to(index, op)
+
+    def _apply_to(self, index, op):
+        action, station_id, record_key, candidates = op
+        if action == 'invalidate':
+            if station_id is None or station_id == index.station_id:
+                index.stale = True
+                result_cache.bump(index.station_id)
+            return
+        # A record may move between stations (e.g. a transferred officer)
+        changed = index.remove(record_key)
+        if action == 'put' and station_id == index.station_id:
+            index.put(record_key, candidates)
+            changed = True
+        if changed:
+            result_cache.bump(index.station_id)
+
+    def invalidate(self, station_id=None):
+        """
+        Marks a station's index (or every index) for a rebuild on next use.
+        """
+        with self._lock:
+            for index in self._stations.values():
+                if station_id is None or index.station_id == station_id:
+                    index.stale = True
+                    result_cache.bump(index.station_id)
+
+
+name_index = NameIndex()
+
+
+# --- ORM hooks ---
+
+def _queue(target, op):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, []).append(op)
+
+
+def _queue_put(target, kind):
+    if kind == 'case':
+        _queue(target, ('put', target.station_id, ('case', target.id), case_candidates(target)))
+    elif kind == 'criminal':
+        _queue(target, ('put', target.station_id, ('criminal', target.id), criminal_candidates(target)))
+    elif kind == 'user':
+        _queue(target, ('put', target.station_id, ('user', target.id), user_candidates(target)))
+
+
+def _participant_put(connection, target):
+    row = connection.execute(
+        select(Case.station_id, Case.case_number).where(Case.id == target.case_id)
+    ).first()
+    if row is None:
+        return
+    _queue(target, ('put', row.station_id, ('participant', target.id),
+                    participant_candidates(target, row.case_number)))
+
+
+def queue_participants(session, case, participants, removed_ids=()):
+    """
+    Queues index updates for participants of ``case`` written with bulk
+    statements, which bypass the mapper hooks. ``participants`` are the
+    inserted or updated rows (anything with the Participant columns the
+    candidate builder reads).
+    """
+    ops = session.info.setdefault(PENDING_KEY, [])
+    # Removals first: SQLite may hand a deleted id straight to a new row
+    for pid in removed_ids:
+        ops.append(('remove', case.station_id, ('participant', pid), None))
+    for p in participants:
+        ops.append(('put', case.station_id, ('participant', p.id), participant_candidates(p, case.case_number)))
+
+
+def _register(model, kind):
+    @event.listens_for(model, 'after_insert')
+    def after_insert(mapper, connection, target):
+        if kind == 'participant':
+            _participant_put(connection, target)
+        else:
+            _queue_put(target, kind)
+
+    @event.listens_for(model, 'after_update')
+    def after_update(mapper, connection, target):
+        if kind == 'participant':
+            _participant_put(connection, target)
+            return
+        if kind == 'case' and db.inspect(target).attrs.case_number.history.has_changes():
+            # Participant candidates embed the case number; reload the station
+            _queue(target, ('invalidate', target.station_id, None, None))
+        _queue_put(target, kind)
+
+    @event.listens_for(model, 'after_delete')
+    def after_delete(mapper, connection, target):
+        _queue(target, ('remove', None, (kind, target.id), None))
+
+
+_register(Case, 'case')
+_register(Criminal, 'criminal')
+_register(Participant, 'participant')
+_register(User, 'user')
+
+INDEXED_MAPPERS = {db.inspect(m) for m in (Case, Criminal, Participant, User)}
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_statement(orm_execute_state):
+    # query.delete()/update() bypass the mapper hooks; rebuild affected stations lazily
+    if orm_execute_state.is_delete or orm_execute_state.is_update:
+        if orm_execute_state.execution_options.get(SYNCED_OPTION):
+            return
+        if orm_execute_state.bind_mapper in INDEXED_MAPPERS:
+            orm_execute_state.session.info.setdefault(PENDING_KEY, []).append(
+                ('invalidate', None, None, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    ops = session.info.pop(PENDING_KEY, None)
+    if ops:
+        name_index.apply(ops)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,57 @@
+"""
+Character n-grams for the search prefilter.
+
+Names are normalised before they are split so spelling noise does not change
+the grams: Latin text is case-folded and stripped of accents, Devanagari text
+has nukta letters folded to their base consonant (ज़ -> ज), chandrabindu folded
+to anusvara and zero-width joiners removed. Matras and viramas are kept since
+they carry the vowel.
+"""
+import re
+import unicodedata
+
+_NUKTA = '\u093c'
+_FOLD = str.maketrans({
+    '\u0901': '\u0902',  # chandrabindu -> anusvara
+    '\u200c': None,  # ZWNJ
+    '\u200d': None,  # ZWJ
+    _NUKTA: None,
+})
+_COMBINING_LATIN = re.compile(r'[\u0300-\u036f]')
+_SEPARATORS = re.compile(r'[^\w\u0900-\u097f]+')
+
+
+def normalize(text):
+    # NFD splits precomposed nukta letters and accented Latin letters
+    text = unicodedata.normalize('NFD', text or '')
+    text = _COMBINING_LATIN.sub('', text).translate(_FOLD)
+    text = unicodedata.normalize('NFC', text).casefold()
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def ngrams(text, n=3):
+    """
+    Returns the set of n-grams of the normalised text, padded with one space
+    on either side so word starts and ends get grams of their own.
+    """
+    norm = normalize(text)
+    if not norm:
+        return set()
+    padded = f' {norm} '
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def transposed_ngrams(text, n=3):
+    """
+    Returns the n-grams of every spelling of the text with two adjacent
+    letters of one word swapped ("Jadahv" -> "Jadhav"). A transposition
+    typo breaks up to n + 1 grams of the word, too many for a short name to
+    keep its place in the shortlist.
+    """
+    grams = set()
+    for word in normalize(text).split():
+        for i in range(len(word) - 1):
+            grams |= ngrams(word[:i] + word[i + 1] + word[i] + word[i + 2:], n)
+    return grams
@@ -0,0 +1,64 @@
+"""
+Bounded worker pool for search scoring.
+
+Fuzzy scoring is CPU-bound; running it on a small shared pool instead of the
+request thread keeps a burst of large searches from tying up every WSGI
+worker (and the FIR and dashboard requests queued behind them).
+
+The pool is a thread pool: candidates live in this process's name index and
+rapidfuzz releases the GIL while it scores, so threads run in parallel without
+copying the index into other processes. Each search scores on its own thread
+only (cdist with workers=1): parallelism comes from running several searches
+at once, so scoring never uses more than SEARCH_POOL_WORKERS cores however
+many searches are in flight. Admission is capped at
+SEARCH_POOL_WORKERS running plus SEARCH_POOL_BACKLOG waiting tasks; past that
+``run`` fails fast with PoolSaturated instead of queueing without bound.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class ScoringPool:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                workers = current_app.config.get('SEARCH_POOL_WORKERS') or os.cpu_count() or 2
+                backlog = current_app.config.get('SEARCH_POOL_BACKLOG') or 0
+                self._slots = threading.BoundedSemaphore(workers + backlog)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search-score')
+        return self._executor
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Runs fn on the pool and waits up to ``timeout`` seconds for its result.
+
+        Raises PoolSaturated when no slot is free and
+        concurrent.futures.TimeoutError when the wait runs out; the task
+        keeps its slot until it actually finishes.
+        """
+        executor = self._executor or self._start()
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future.result(timeout=timeout)
+
+
+scoring_pool = ScoringPool()
@@ -1,12 +1,17 @@
-from flask import request, jsonify, render_template
+from flask import request, jsonify, render_template, current_app
 from flask_login import login_required, current_user
 from app.search import search
-from app.models import Participant, Criminal, User, Case
-from app.utils import station_scoped
-from rapidfuzz import process, fuzz
-from indic_transliteration import sanscript
-from indic_transliteration.sanscript import SchemeMap, SCHEMES, transliterate
+from app.search.cache import result_cache
+from app.search.index import name_index
+from app.search.pool import PoolSaturated, scoring_pool
+from app.search.scoring import fold, top_matches
+from app.transliteration import query_variants
+from concurrent.futures import TimeoutError as FuturesTimeout
 import re
+import time
+
+# Extra wait for a task that overshoots its deadline inside its last chunk
+SCORING_GRACE = 0.5
 
 def detect_script(text):
     # Simple check for Devanagari range
@@ -28,132 +33,122 @@ def validate_input(q):
         return False
     return True
 
+INDEX_ONLY_KEYS = ('phonetic', 'latin')
+
+def to_result(entry, score, match):
+    res = {k: v for k, v in entry.items() if k not in INDEX_ONLY_KEYS}
+    res['score'] = score
+    res['match'] = match
+    return res
+
 @search.route('/search_name', methods=['GET'])
 @login_required
 def search_name():
     q = request.args.get('q', '').strip()
     limit = int(request.args.get('limit', 10))
     threshold = int(request.args.get('threshold', 60))
+    mode = request.args.get('mode', 'fuzzy') # fuzzy | phonetic
     
     if not validate_input(q):
         return jsonify({'results': []})
-        
+    # Scored folded (scoring.fold), so the variants and the cache key agree
+    q = fold(q)
+
+    index = name_index.get(current_user.station_id)
+    # Typeahead repeats the same prefixes; the key carries the station's
+    # generation (taken after the index is current), so any committed change
+    # there misses the old entries
+    cache_key = result_cache.key(current_user.station_id, q, mode, threshold, limit)
+    results = result_cache.get(cache_key)
+    if results is not None:
+        return jsonify({'results': results})
+
     # Transliteration Logic
     query_variations = {q}
     if detect_script(q) == 'devanagari':
-        # Transliterate Hindi to English (ITRANS or HK)
-        transliterated = transliterate(q, sanscript.DEVANAGARI, sanscript.HK)
-        query_variations.add(transliterated)
-    
-    # Fetch Candidates (Scoped to Station)
-    candidates = []
-    
-    # 1. Cases & Incidents (Case Number, Title, Description, Location)
-    cases = station_scoped(Case.query).all()
-    for c in cases:
-        # Case Number (High value)
-        candidates.append({
-            'name': c.case_number,
-            'source': 'Case',
-            'id': c.id,
-            'details': c.title,
-            'url': f"/cases/{c.id}"
-        })
-        # Title
-        candidates.append({
-            'name': c.title,
-            'source': 'Case Title',
-            'id': c.id,
-            'details': f"#{c.case_number}",
-            'url': f"/cases/{c.id}"
-        })
-        # Incident / Offense
-        if c.offense_type:
-            candidates.append({
-                'name': c.offense_type,
-                'source': 'Incident Type',
-                'id': c.id,
-                'details': f"Case #{c.case_number}",
-                'url': f"/cases/{c.id}"
-            })
-        # Location
-        if c.location:
-             candidates.append({
-                'name': c.location,
-                'source': 'Incident Location',
-                'id': c.id,
-                'details': f"Case #{c.case_number}",
-                'url': f"/cases/{c.id}"
-            })
-
-    # 2. Suspects (Criminals)
-    criminals = station_scoped(Criminal.query).all()
-    for c in criminals:
-        candidates.append({
-            'name': c.name,
-            'source': 'Suspect/Criminal',
-            'id': c.id,
-            'details': f"Status: {c.status}",
-            'url': f"/criminals/{c.id}" # Placeholder
-        })
-        if c.aliases:
-            candidates.append({
-                'name': c.aliases,
-                'source': f'Alias ({c.name})',
-                'id': c.id,
-                'details': f"Status: {c.status}",
-                'url': f"/criminals/{c.id}"
-            })
-            
-    # 3. Names (Participants)
-    # Join with Case to scope properly
-    participants = Participant.query.join(Case).filter(Case.station_id == current_user.station_id).all()
-    for p in participants:
-         # Find associated case
-         case = Case.query.get(p.case_id)
-         candidates.append({
-            'name': p.name,
-            'source': f'{p.type} (Name)',
-            'id': p.id,
-            'details': f"Case: {case.case_number if case else 'Unknown'}",
-            'url': f"/cases/{p.case_id}"
-         })
-         
-    # 4. Names (Officers/Users)
-    users = station_scoped(User.query).all()
-    for u in users:
-        candidates.append({
-            'name': u.full_name,
-            'source': f'Officer ({u.role})',
-            'id': u.id,
-            'details': u.badge_number,
-            'url': f"/admin/users" 
-        })
-
-    # Fuzzy Matching
-    results = []
-    
-    # Extract names for RapidFuzz
-    # Ensure all names are strings
-    choices = [str(c['name']) for c in candidates]
-    
-    matched_indices = set()
-    
-    for query_var in query_variations:
-        # returns list of (match, score, index)
-        # We lower the limit for extraction to optimize, then sort manually
-        matches = process.extract(query_var, choices, scorer=fuzz.WRatio, limit=None)
-        
-        for name, score, idx in matches:
-            if score >= threshold:
-                if idx not in matched_indices:
-                    res = candidates[idx].copy()
-                    res['score'] = score
-                    results.append(res)
-                    matched_indices.add(idx)
-    
-    # Sort by score desc, then by source priority (Case > Suspect > Name)
-    # Just Score is distinct usually.
-    results.sort(key=lambda x: x['score'], reverse=True)
-    
-    return jsonify({'results': results[:limit]})
+        # Latin renderings (plain, HK, ITRANS, IAST), memoised per query;
+        # stored Devanagari names carry their own Latin shadow in the index
+        query_variations.update(query_variants(q))
+
+    # Scoring runs on the bounded pool with a deadline; a saturated pool
+    # answers 503 at once rather than queueing the request
+    shortlist_size = current_app.config.get('SEARCH_SHORTLIST_SIZE')
+    budget = current_app.config.get('SEARCH_DEADLINE')
+    deadline = time.monotonic() + budget if budget else None
+    progress = []
+    try:
+        results, complete = scoring_pool.run(
+            score_candidates, index, query_variations, mode, threshold, limit, shortlist_size, deadline, progress,
+            timeout=budget + SCORING_GRACE if budget else None)
+    except PoolSaturated:
+        response = jsonify({'results': [], 'status': 'error', 'message': 'Search is busy, please retry.'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    except FuturesTimeout:
+        # The last chunk overran the grace period: answer with what it had
+        results, complete = list(progress), False
+
+    if not complete:
+        # Best-so-far results; not cached so the next keystroke can do better
+        return jsonify({'results': results, 'partial': True})
+    result_cache.put(cache_key, results)
+    return jsonify({'results': results})
+
+def score_candidates(index, query_variations, mode, threshold, limit, shortlist_size, deadline=None,
+                     progress=None):
+    """
+    Ranks the station's candidates for the query variations. Returns
+    (results, complete); complete is False when the deadline cut scoring short.
+
+    Runs on a scoring pool thread, so cdist is held to that one thread. When
+    given, the ``progress`` list is kept holding the best results so far, for
+    a caller that stops waiting before this returns.
+    """
+    def publish(found):
+        if progress is not None:
+            progress[:] = found
+
+    # Phonetic mode: sound-alike names from the phonetic key index come first,
+    # ranked among themselves by fuzzy closeness
+    results, seen, complete = [], set(), True
+    if mode == 'phonetic':
+        names, latin, entries = index.phonetic_matches(query_variations, shortlist_size or limit)
+
+        def phonetic_results(matches):
+            return [to_result(entries[idx], score, 'phonetic') for idx, score in matches]
+
+        matches, complete = top_matches(query_variations, names, 0, limit, latin, workers=1, deadline=deadline,
+                                        on_chunk=lambda m: publish(phonetic_results(m)))
+        results = phonetic_results(matches)
+        seen = {id(entries[idx]) for idx, _ in matches}
+        publish(results)
+
+    # Fuzzy Matching over the station's index, narrowed by n-grams
+    if len(results) < limit and complete:
+        if deadline is not None and time.monotonic() >= deadline:
+            return results, False
+        names, latin, entries = index.candidates(query_variations, shortlist_size)
+        first = results
+
+        def fuzzy_results(matches):
+            found = list(first)
+            for idx, score in matches:
+                if len(found) >= limit:
+                    break
+                if id(entries[idx]) not in seen:
+                    found.append(to_result(entries[idx], score, 'fuzzy'))
+            return found
+
+        matches, complete = top_matches(query_variations, names, threshold, limit + len(seen), latin,
+                                        workers=1, deadline=deadline,
+                                        on_chunk=lambda m: publish(fuzzy_results(m)))
+        results = fuzzy_results(matches)
+    return results, complete
+
+@search.route('/search_stats', methods=['GET'])
+@login_required
+def search_stats():
+    # Result cache counters, for sizing SEARCH_CACHE_SIZE
+    if current_user.role != 'admin':
+        return jsonify({'status': 'error', 'message': 'Access denied'}), 403
+    return jsonify({'cache': result_cache.stats()})
@@ -0,0 +1,72 @@
+"""
+Batched fuzzy scoring for /search_name.
+
+All query variations (e.g. the Devanagari input and its transliteration) are
+scored against the station's names with rapidfuzz ``cdist`` calls spread over
+every core. Scores under the threshold are cut inside the scorer, and only the
+best ``limit`` candidates are kept with a heap instead of sorting everything.
+
+Queries and names are compared in their folded form (``fold``): NFC,
+case-folded, with runs of whitespace collapsed. Queries that fold alike score
+alike, which is what the /search_name result cache keys on.
+
+Names are scored in chunks so a search with a deadline can stop between two
+chunks and still return the best matches found so far.
+"""
+import heapq
+import time
+import unicodedata
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+CHUNK_SIZE = 20000
+
+
+def fold(text):
+    """
+    The form a query or name is scored in.
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).casefold().split())
+
+
+def top_matches(queries, names, threshold, limit, alternates=None, workers=-1,
+                deadline=None, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """
+    Returns (matches, complete): up to ``limit`` (index, score) pairs into
+    ``names``, best first, and whether every name was scored.
+
+    A candidate's score is its best score over all ``queries`` and, when given,
+    over its alternate spelling in the parallel ``alternates`` sequence (e.g. the
+    Latin shadow of a Devanagari name; '' for none). Ties keep index order.
+    Once ``deadline`` (a time.monotonic() value) has passed, scoring stops after
+    the current chunk and the matches so far are returned as incomplete.
+    ``on_chunk``, if given, is called with the ranked matches so far after
+    every chunk.
+    """
+    if not queries or not names or limit <= 0:
+        return [], True
+
+    queries = list(queries)
+    top = []
+    for start in range(0, len(names), chunk_size):
+        if deadline is not None and start and time.monotonic() >= deadline:
+            return _ranked(top), False
+        end = start + chunk_size
+        scores = process.cdist(queries, names[start:end], scorer=fuzz.WRatio, processor=fold,
+                               score_cutoff=threshold, workers=workers)
+        best = scores.max(axis=0)
+        if alternates is not None:
+            alt_scores = process.cdist(queries, alternates[start:end], scorer=fuzz.WRatio, processor=fold,
+                                       score_cutoff=threshold, workers=workers)
+            best = np.maximum(best, alt_scores.max(axis=0))
+        hits = np.flatnonzero(best >= threshold) if threshold > 0 else np.arange(len(best))
+        chunk_top = ((float(best[i]), -(start + i)) for i in hits.tolist())
+        top = heapq.nlargest(limit, [*top, *chunk_top])
+        if on_chunk is not None:
+            on_chunk(_ranked(top))
+    return _ranked(top), True
+
+
+def _ranked(top):
+    return [(-neg_index, score) for score, neg_index in top]
@@ -0,0 +1,200 @@
+"""
+Case and FIR number allocation.
+
+Numbers come from the ``number_sequence`` table: one counter row per
+(kind, series, year), where the series is the number format with its {year}
+and {num} placeholders: the station's ``fir_prefix_format`` for FIRs and
+CASE_NUMBER_FORMAT for cases. Stations with their own format count on their
+own; stations sharing a format share a counter, as they share the unique
+number space.
+
+A number is taken with a single UPDATE ... RETURNING in its own short
+transaction, so concurrent registrations can never be handed the same value.
+With SEQUENCE_BLOCK_SIZE > 1 every worker process reserves a block of numbers
+at once and hands them out locally; numbers stay unique but are no longer
+issued in strict order across processes, and what is left of a block when the
+process exits is skipped. A number taken by a request that later fails is not
+reused either.
+
+SQLite has a single writer, so when the caller's session has already written
+the counter is updated inside that transaction instead (one number at a time).
+Whether it has is tracked from the session's flushes and bulk statements.
+"""
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Case, FIR, NumberSequence
+
+DEFAULT_FORMATS = {
+    'case': 'CASE-{year}-{num}',
+    'fir': 'FIR-{year}-{num}',
+}
+# kind -> (numbered column, zero padding of {num})
+NUMBERED = {
+    'case': (Case.case_number, 4),
+    'fir': (FIR.fir_number, 3),
+}
+
+# Set in session.info once the session's transaction has written something
+WRITTEN_KEY = 'sequences_session_written'
+
+_blocks = {}
+_blocks_lock = threading.Lock()
+
+
+def series_for(kind, station=None):
+    """
+    Number format used for ``kind`` at a station. Falls back to the default
+    when the configured format is missing {num} or does not render.
+    """
+    if kind == 'fir':
+        template = station.fir_prefix_format if station is not None else None
+    else:
+        template = current_app.config.get('CASE_NUMBER_FORMAT')
+    if not template or template.count('{num}') != 1:
+        return DEFAULT_FORMATS[kind]
+    try:
+        template.format(year=2000, num=1)
+    except (KeyError, IndexError, ValueError):
+        return DEFAULT_FORMATS[kind]
+    return template
+
+
+def render(kind, series, year, value):
+    return series.format(year=year, num=str(value).zfill(NUMBERED[kind][1]))
+
+
+def _escape_like(text):
+    return re.sub(r'([\\%_])', r'\\\1', text)
+
+
+def _existing_max(conn, kind, series, year):
+    # Highest number already issued in this series and year; a one-off scan
+    # when the counter row is first created
+    column = NUMBERED[kind][0]
+    prefix, suffix = series.format(year=year, num='\x00').split('\x00')
+    pattern = re.compile(re.escape(prefix) + r'(\d+)' + re.escape(suffix))
+    numbers = conn.execute(
+        select(column).where(column.like(_escape_like(prefix) + '%' + _escape_like(suffix), escape='\\'))
+    ).scalars()
+    return max((int(m.group(1)) for m in map(pattern.fullmatch, numbers) if m), default=0)
+
+
+def _counter(kind, series, year):
+    return ((NumberSequence.kind == kind) & (NumberSequence.series == series)
+            & (NumberSequence.year == year))
+
+
+@contextmanager
+def _transaction(conn=None):
+    # Own short transaction, or a savepoint in the caller's
+    if conn is None:
+        with db.engine.begin() as own:
+            yield own
+    else:
+        with conn.begin_nested():
+            yield conn
+
+
+def _session_writing():
+    session = db.session()
+    return (session.in_transaction() and session.info.get(WRITTEN_KEY, False)
+            and session.get_bind().dialect.name == 'sqlite')
+
+
+@event.listens_for(Session, 'after_flush')
+def _on_flush(session, flush_context):
+    session.info[WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    session.info.pop(WRITTEN_KEY, None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(WRITTEN_KEY, None)
+
+
+def _reserve(kind, series, year, count, conn=None):
+    """
+    Atomically takes the next ``count`` numbers; returns the last of them.
+    """
+    take = (update(NumberSequence).where(_counter(kind, series, year))
+            .values(last_value=NumberSequence.last_value + count)
+            .returning(NumberSequence.last_value))
+    for _ in range(2):
+        with _transaction(conn) as tx:
+            last = tx.execute(take).scalar()
+        if last is not None:
+            return last
+        try:
+            with _transaction(conn) as tx:
+                start = _existing_max(tx, kind, series, year)
+                tx.execute(insert(NumberSequence).values(kind=kind, series=series, year=year, last_value=start))
+        except IntegrityError:
+            pass  # Another worker created the counter first
+    raise RuntimeError(f'Could not allocate a {kind} number for {series!r} {year}')
+
+
+def _next_value(kind, series, year):
+    if _session_writing():
+        # A second connection would wait on our own write lock
+        return _reserve(kind, series, year, 1, conn=db.session.connection())
+    size = max(1, current_app.config.get('SEQUENCE_BLOCK_SIZE') or 1)
+    if size == 1:
+        return _reserve(kind, series, year, 1)
+
+    key = (kind, series, year)
+    with _blocks_lock:
+        block = _blocks.get(key)
+        # A forked worker must not reuse its parent's block
+        if block is None or block[0] != os.getpid() or block[1] > block[2]:
+            last = _reserve(kind, series, year, size)
+            block = _blocks[key] = [os.getpid(), last - size + 1, last]
+        value = block[1]
+        block[1] += 1
+    return value
+
+
+def next_number(kind, station=None, year=None):
+    """
+    Allocates the next case ('case') or FIR ('fir') number for a station.
+    """
+    year = year or datetime.now().year
+    series = series_for(kind, station)
+    column = NUMBERED[kind][0]
+    while True:
+        number = render(kind, series, year, _next_value(kind, series, year))
+        # Hand-entered numbers may sit ahead of the counter; skip past them
+        if db.session.execute(select(column).where(column == number)).first() is None:
+            return number
+
+
+def peek_number(kind, station=None, year=None):
+    """
+    The number next_number would most likely return, without allocating it.
+    """
+    year = year or datetime.now().year
+    series = series_for(kind, station)
+    with db.engine.connect() as conn:
+        last = conn.execute(select(NumberSequence.last_value).where(_counter(kind, series, year))).scalar()
+        if last is None:
+            last = _existing_max(conn, kind, series, year)
+    return render(kind, series, year, last + 1)
@@ -0,0 +1,62 @@
+"""
+SQL statement budget per request, for tests.
+
+With SQL_STATEMENT_LIMIT set (e.g. in a test config), every request counts
+the statements it sends to the database and fails with TooManyStatements once
+it goes over the limit, so an N+1 loop that creeps back into a view or
+template breaks the test run instead of slowing production. A view that
+legitimately needs more can raise its own budget:
+
+    @statement_limit(40)
+    def bulk_import(): ...
+
+Off (limit 0) in normal runs.
+"""
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class TooManyStatements(AssertionError):
+    pass
+
+
+def statement_limit(limit):
+    """
+    Overrides SQL_STATEMENT_LIMIT for one view.
+    """
+    def decorator(f):
+        f.statement_limit = limit
+        return f
+    return decorator
+
+
+def _count_statement(*args):
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+
+
+def _limit_for_request():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, 'statement_limit', current_app.config.get('SQL_STATEMENT_LIMIT'))
+
+
+def init_app(app):
+    if not app.config.get('SQL_STATEMENT_LIMIT'):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+
+    @app.before_request
+    def start_counting():
+        g.sql_statements = 0
+
+    @app.after_request
+    def check_statement_count(response):
+        limit = _limit_for_request()
+        count = g.pop('sql_statements', 0)
+        if limit and count > limit:
+            raise TooManyStatements(
+                f'{request.method} {request.path} issued {count} SQL statements (limit {limit})')
+        return response
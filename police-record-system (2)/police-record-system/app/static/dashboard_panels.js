@@ -0,0 +1,160 @@
+// Dashboard panels (app/dashboard/panels.py): each [data-panel] loads its
+// rows when it scrolls into view, reloads when its filters change and
+// appends the next page on "Load more". Assignment forms submit in place,
+// picking the officer from the page's single #assignable-officers datalist.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-panel]').forEach(setupPanel);
+
+    // Delegated: assignment rows arrive after page load
+    document.addEventListener('submit', async function (e) {
+        const form = e.target.closest('form[action*="/assign"]');
+        if (!form) return;
+        e.preventDefault();
+
+        // The officer picked from the shared datalist; left empty when the
+        // text matches none, which the server answers with an error
+        const nameInput = form.querySelector('input[name="io_name"]');
+        if (nameInput) {
+            form.querySelector('input[name="io_id"]').value = officerIds().get(nameInput.value.trim()) || '';
+        }
+
+        const submitBtn = form.querySelector('button[type="submit"]');
+        const originalBtnText = submitBtn.innerText;
+        submitBtn.innerText = '...';
+        submitBtn.disabled = true;
+
+        let assigned = false;
+        try {
+            const response = await fetch(form.action, {
+                method: 'POST',
+                body: new FormData(form),
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            const data = await response.json();
+
+            if (data.status === 'success') {
+                assigned = true;
+                const ioCell = form.closest('tr').querySelector('td:nth-child(3)'); // Current IO
+                ioCell.innerText = data.io_name;
+                ioCell.classList.add('text-green-400', 'font-bold');
+                if (nameInput) nameInput.value = '';
+                showNotification(data.message, 'success');
+            } else {
+                showNotification(data.message || 'Error assigning case', 'error');
+            }
+        } catch (error) {
+            console.error('Error:', error);
+            showNotification('An unexpected error occurred.', 'error');
+        } finally {
+            if (assigned) {
+                submitBtn.innerText = 'Assigned';
+                setTimeout(() => {
+                    submitBtn.innerText = originalBtnText;
+                    submitBtn.disabled = false;
+                }, 2000);
+            } else {
+                // Failed: give the button back at once so the row can be retried
+                submitBtn.innerText = originalBtnText;
+                submitBtn.disabled = false;
+            }
+        }
+    });
+});
+
+let officerIdsByLabel = null;
+
+function officerIds() {
+    if (!officerIdsByLabel) {
+        officerIdsByLabel = new Map();
+        document.querySelectorAll('#assignable-officers option').forEach(option => {
+            officerIdsByLabel.set(option.value, option.dataset.id);
+        });
+    }
+    return officerIdsByLabel;
+}
+
+function setupPanel(panel) {
+    const rows = panel.querySelector('.panel-rows');
+    const filters = panel.querySelector('.panel-filters');
+    const status = panel.querySelector('.panel-status');
+    const more = panel.querySelector('.panel-more');
+    let cursor = null;
+    let request = 0;
+
+    async function load(reset) {
+        const params = new URLSearchParams(new FormData(filters));
+        if (!reset && cursor) params.set('after', cursor);
+        const mine = ++request; // Only the latest request may fill the panel
+        status.innerText = 'Loading...';
+        status.classList.remove('hidden');
+        more.classList.add('hidden');
+
+        try {
+            const response = await fetch(`${panel.dataset.panel}?${params}`);
+            if (!response.ok) throw new Error(response.statusText);
+            const html = await response.text();
+            if (mine !== request) return;
+
+            const page = document.createElement('tbody');
+            page.innerHTML = html;
+            const marker = page.querySelector('tr[data-next-cursor]');
+            cursor = marker ? marker.dataset.nextCursor : null;
+            if (marker) marker.remove();
+            if (reset) rows.innerHTML = '';
+            rows.append(...page.children);
+            status.classList.add('hidden');
+            more.classList.toggle('hidden', !cursor);
+        } catch (error) {
+            if (mine !== request) return;
+            console.error('Error:', error);
+            status.innerText = 'Could not load this panel.';
+        }
+    }
+
+    let timer;
+    filters.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(() => load(true), 300);
+    });
+    filters.addEventListener('submit', function (e) {
+        e.preventDefault();
+        load(true);
+    });
+    more.querySelector('button').addEventListener('click', () => load(false));
+
+    if ('IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(function (entries) {
+            if (entries.some(entry => entry.isIntersecting)) {
+                observer.disconnect();
+                load(true);
+            }
+        });
+        observer.observe(panel);
+    } else {
+        load(true);
+    }
+}
+
+function showNotification(message, type) {
+    let container = document.getElementById('notification-container');
+    if (!container) {
+        container = document.createElement('div');
+        container.id = 'notification-container';
+        container.className = 'fixed top-4 right-4 z-50 space-y-2';
+        document.body.appendChild(container);
+    }
+
+    const notif = document.createElement('div');
+    const bgColor = type === 'success' ? 'bg-green-600' : 'bg-red-600';
+    notif.className = `${bgColor} text-white px-6 py-3 rounded shadow-lg transition-opacity duration-500 transform translate-x-full`;
+    notif.innerText = message;
+    container.appendChild(notif);
+
+    requestAnimationFrame(() => {
+        notif.classList.remove('translate-x-full');
+    });
+    setTimeout(() => {
+        notif.classList.add('opacity-0');
+        setTimeout(() => notif.remove(), 500);
+    }, 3000);
+}
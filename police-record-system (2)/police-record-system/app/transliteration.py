@@ -0,0 +1,96 @@
+"""
+Devanagari -> Latin transliteration for search.
+
+Names and titles written in Devanagari get a plain Latin spelling stored next
+to them at write time (the ``*_latin`` shadow columns), and Devanagari queries
+are expanded to their Latin renderings here. Both sides meet in Latin script,
+so no row has to be transliterated while a search runs.
+
+Results are memoised: the typeahead sends the same prefixes over and over.
+"""
+from functools import lru_cache
+import re
+
+from indic_transliteration import sanscript
+
+QUERY_SCHEMES = (sanscript.HK, sanscript.ITRANS, sanscript.IAST)
+
+_CONSONANT = re.compile(r'[\u0915-\u0939\u0958-\u095f]')
+_MATRA_OR_VIRAMA = re.compile(r'[\u093e-\u094d\u0962\u0963]')
+_NUKTA = '\u093c'
+_VIRAMA = '\u094d'
+_NASAL_OR_VISARGA = '\u0901\u0902\u0903'  # chandrabindu, anusvara, visarga
+# ITRANS spellings that read better as plain Latin
+_ITRANS_PLAIN = (('RRi', 'ri'), ('RRI', 'ri'), ('LLi', 'li'), ('GY', 'gy'), ('j~n', 'gy'), ('~N', 'n'),
+                 ('~n', 'n'), ('.N', 'n'), ('M', 'n'), ('H', 'h'), ('.a', ''), ('.h', ''))
+
+
+def has_devanagari(text):
+    return any('\u0900' <= ch <= '\u097f' for ch in text or '')
+
+
+def _syllables(word):
+    # [consonant or '', vowel sign ('' = inherent schwa), trailing nasal/visarga]
+    units = []
+    for ch in word:
+        if _CONSONANT.match(ch):
+            units.append([ch, '', ''])
+        elif ch == _NUKTA and units:
+            units[-1][0] += ch
+        elif _MATRA_OR_VIRAMA.match(ch) and units and units[-1][0]:
+            units[-1][1] = ch
+        elif ch in _NASAL_OR_VISARGA and units:
+            units[-1][2] += ch
+        else:
+            units.append(['', ch, ''])
+    return units
+
+
+def _delete_schwa(word):
+    """
+    Hindi/Marathi schwa deletion: drops the word-final inherent 'a' and a
+    medial one between a vowel+consonant and a consonant+vowel, scanning right
+    to left (देशमुख -> desh-mukh, not de-sha-mu-kha).
+    """
+    units = _syllables(word)
+
+    def inherent(u):
+        return u[0] and not u[1] and not u[2]
+
+    if len(units) > 1 and inherent(units[-1]):
+        units[-1][1] = _VIRAMA
+    for i in range(len(units) - 2, 0, -1):
+        prev, unit, nxt = units[i - 1], units[i], units[i + 1]
+        if inherent(unit) and prev[1] != _VIRAMA and nxt[0] and nxt[1] != _VIRAMA:
+            unit[1] = _VIRAMA
+    return ''.join(''.join(u) for u in units)
+
+
+@lru_cache(maxsize=4096)
+def to_latin(text):
+    """
+    Plain lower-case Latin spelling of Devanagari text, as an officer would
+    type it (राजेश देशमुख -> rajesh deshmukh). Returns None when the text has
+    no Devanagari in it.
+    """
+    if not text or not has_devanagari(text):
+        return None
+    words = [_delete_schwa(w) if has_devanagari(w) else w for w in text.split()]
+    latin = sanscript.transliterate(' '.join(words), sanscript.DEVANAGARI, sanscript.ITRANS)
+    for old, new in _ITRANS_PLAIN:
+        latin = latin.replace(old, new)
+    return re.sub(r'[.~^]', '', latin).lower()
+
+
+@lru_cache(maxsize=4096)
+def query_variants(text):
+    """
+    Latin renderings of a Devanagari query: the plain spelling plus the HK,
+    ITRANS and IAST schemes. Empty for text without Devanagari.
+    """
+    if not has_devanagari(text):
+        return ()
+    variants = [to_latin(text)]
+    for scheme in QUERY_SCHEMES:
+        variants.append(sanscript.transliterate(text, sanscript.DEVANAGARI, scheme))
+    return tuple(dict.fromkeys(variants))
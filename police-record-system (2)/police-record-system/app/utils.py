@@ -3,14 +3,15 @@ from flask_login import current_user
 from app import db, login_manager
 from functools import wraps
 from app.models import AuditLog
+from app.transliteration import to_latin
 from datetime import datetime
 
 def transliterate_to_english(text):
     """
-    Placeholder for transliteration logic.
-    Returns the text as is for now.
+    Plain Latin spelling of Devanagari text (cached, see app/transliteration.py).
+    Returns the text as is when it has no Devanagari.
     """
-    return text
+    return to_latin(text) or text
 
 def roles_required(*roles):
     def wrapper(f):
@@ -0,0 +1,79 @@
+"""Add case_fts full-text index
+
+Revision ID: 7b1f0c2d9e4a
+Revises: 461cb113e9c8
+Create Date: 2026-01-12 10:04:51.220931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1f0c2d9e4a'
+down_revision = '461cb113e9c8'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['case_number', 'title', 'short_description', 'description',
+           'location', 'tags', 'ipc_sections']
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    cols = ', '.join(COLUMNS)
+    new_cols = ', '.join(f'new.{c}' for c in COLUMNS)
+    old_cols = ', '.join(f'old.{c}' for c in COLUMNS)
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE case_fts USING fts5({cols}, "
+        f"content='case', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(f"""
+        CREATE TRIGGER case_fts_ai AFTER INSERT ON "case" BEGIN
+            INSERT INTO case_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER case_fts_ad AFTER DELETE ON "case" BEGIN
+            INSERT INTO case_fts(case_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER case_fts_au AFTER UPDATE OF {cols} ON "case" BEGIN
+            INSERT INTO case_fts(case_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO case_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+
+    # Backfill existing cases in id ranges so large tables are not indexed in one statement
+    last_id = 0
+    while True:
+        batch_end = bind.execute(
+            sa.text('SELECT MAX(id) FROM (SELECT id FROM "case" WHERE id > :last_id ORDER BY id LIMIT :n)'),
+            {'last_id': last_id, 'n': BATCH_SIZE}
+        ).scalar()
+        if batch_end is None:
+            break
+        bind.execute(
+            sa.text(f'INSERT INTO case_fts(rowid, {cols}) '
+                    f'SELECT id, {cols} FROM "case" WHERE id > :last_id AND id <= :batch_end'),
+            {'last_id': last_id, 'batch_end': batch_end}
+        )
+        last_id = batch_end
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    op.execute('DROP TRIGGER IF EXISTS case_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS case_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS case_fts_ai')
+    op.execute('DROP TABLE IF EXISTS case_fts')
@@ -0,0 +1,137 @@
+"""Add Latin shadow columns
+
+Revision ID: c4d2a7e9f813
+Revises: a3c5e8f1b270
+Create Date: 2026-01-27 11:15:36.904122
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d2a7e9f813'
+down_revision = 'a3c5e8f1b270'
+branch_labels = None
+depends_on = None
+
+OLD_FTS_COLUMNS = ['case_number', 'title', 'short_description', 'description',
+                   'location', 'tags', 'ipc_sections']
+NEW_FTS_COLUMNS = OLD_FTS_COLUMNS + ['title_latin', 'description_latin']
+BATCH_SIZE = 1000
+
+
+def drop_case_fts():
+    op.execute('DROP TRIGGER IF EXISTS case_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS case_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS case_fts_ai')
+    op.execute('DROP TABLE IF EXISTS case_fts')
+
+
+def create_case_fts(columns):
+    """
+    (Re)creates case_fts and its sync triggers over the given columns and
+    indexes the existing cases in id batches.
+    """
+    bind = op.get_bind()
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f'new.{c}' for c in columns)
+    old_cols = ', '.join(f'old.{c}' for c in columns)
+
+    drop_case_fts()
+    op.execute(
+        f"CREATE VIRTUAL TABLE case_fts USING fts5({cols}, "
+        f"content='case', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(f"""
+        CREATE TRIGGER case_fts_ai AFTER INSERT ON "case" BEGIN
+            INSERT INTO case_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER case_fts_ad AFTER DELETE ON "case" BEGIN
+            INSERT INTO case_fts(case_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER case_fts_au AFTER UPDATE OF {cols} ON "case" BEGIN
+            INSERT INTO case_fts(case_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO case_fts(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """)
+
+    last_id = 0
+    while True:
+        batch_end = bind.execute(
+            sa.text('SELECT MAX(id) FROM (SELECT id FROM "case" WHERE id > :last_id ORDER BY id LIMIT :n)'),
+            {'last_id': last_id, 'n': BATCH_SIZE}
+        ).scalar()
+        if batch_end is None:
+            break
+        bind.execute(
+            sa.text(f'INSERT INTO case_fts(rowid, {cols}) '
+                    f'SELECT id, {cols} FROM "case" WHERE id > :last_id AND id <= :batch_end'),
+            {'last_id': last_id, 'batch_end': batch_end}
+        )
+        last_id = batch_end
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('case', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('title_latin', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('description_latin', sa.Text(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_case_title_latin'), ['title_latin'], unique=False)
+
+    with op.batch_alter_table('criminal', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_latin', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('aliases_latin', sa.String(length=200), nullable=True))
+        batch_op.create_index(batch_op.f('ix_criminal_aliases_latin'), ['aliases_latin'], unique=False)
+        batch_op.create_index(batch_op.f('ix_criminal_name_latin'), ['name_latin'], unique=False)
+
+    with op.batch_alter_table('participant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_latin', sa.String(length=100), nullable=True))
+        batch_op.create_index(batch_op.f('ix_participant_name_latin'), ['name_latin'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('full_name_latin', sa.String(length=120), nullable=True))
+        batch_op.create_index(batch_op.f('ix_user_full_name_latin'), ['full_name_latin'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # The shadow columns are filled by `flask backfill-transliteration`
+    if op.get_bind().dialect.name == 'sqlite':
+        create_case_fts(NEW_FTS_COLUMNS)
+
+
+def downgrade():
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    if sqlite:
+        # Dropping columns rebuilds the case table, which would take the triggers with it
+        drop_case_fts()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_full_name_latin'))
+        batch_op.drop_column('full_name_latin')
+
+    with op.batch_alter_table('participant', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_participant_name_latin'))
+        batch_op.drop_column('name_latin')
+
+    with op.batch_alter_table('criminal', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_criminal_name_latin'))
+        batch_op.drop_index(batch_op.f('ix_criminal_aliases_latin'))
+        batch_op.drop_column('aliases_latin')
+        batch_op.drop_column('name_latin')
+
+    with op.batch_alter_table('case', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_case_title_latin'))
+        batch_op.drop_column('description_latin')
+        batch_op.drop_column('title_latin')
+
+    # ### end Alembic commands ###
+
+    if sqlite:
+        create_case_fts(OLD_FTS_COLUMNS)
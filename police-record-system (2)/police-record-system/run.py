@@ -1,3 +1,4 @@
+import click
 from app import create_app, db
 from app.models import User, Case  # Import models to ensure they are registered
 
@@ -31,5 +32,95 @@ def reset_data():
         db.session.rollback()
         print(f"Error resetting data: {e}")
 
+@app.cli.command("backfill-transliteration")
+@click.option('--batch-size', default=500, help='Rows read and updated per transaction.')
+def backfill_transliteration(batch_size):
+    """Fills the Latin shadow columns (*_latin) of existing Devanagari names and case text."""
+    from sqlalchemy import select, update
+    from app.models import Case, Participant, Criminal, User
+    from app.transliteration import to_latin
+
+    # model -> columns that have a `<column>_latin` shadow
+    targets = [
+        (Participant, ['name']),
+        (Criminal, ['name', 'aliases']),
+        (User, ['full_name']),
+        (Case, ['title', 'description']),
+    ]
+    for model, columns in targets:
+        # Carry updated_at through so the backfill does not look like an edit
+        keep = ['updated_at'] if hasattr(model, 'updated_at') else []
+        last_id, updated = 0, 0
+        while True:
+            rows = db.session.execute(
+                select(model.id, *[getattr(model, c) for c in columns + keep])
+                .where(model.id > last_id).order_by(model.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                values = {f'{c}_latin': to_latin(getattr(row, c)) for c in columns}
+                if any(values.values()):
+                    values['id'] = row.id
+                    values.update({k: getattr(row, k) for k in keep})
+                    params.append(values)
+            if params:
+                db.session.execute(update(model), params)
+            db.session.commit()
+            updated += len(params)
+            last_id = rows[-1].id
+        print(f"{model.__name__}: {updated} rows transliterated")
+
+@app.cli.command("gc-uploads")
+@click.option('--max-age', type=int, default=None, help='Seconds idle before an upload is removed (default UPLOAD_SESSION_TTL).')
+def gc_uploads(max_age):
+    """Removes abandoned resumable evidence uploads and their partial files."""
+    from app.cases.uploads import collect_stale_uploads
+
+    removed = collect_stale_uploads(max_age)
+    print(f"{removed} stale upload sessions removed")
+
+@app.cli.command("derive-evidence")
+@click.option('--all', 'redo', is_flag=True, help='Also redo evidence that already has derivatives.')
+def derive_evidence(redo):
+    """Makes thumbnails, previews and metadata of stored evidence files."""
+    from app.models import Evidence
+    from app.derivatives import generate
+
+    query = db.session.query(Evidence.id).filter(Evidence.sha256.isnot(None))
+    if not redo:
+        query = query.filter(Evidence.derived_at.is_(None))
+    evidence_ids = [evidence_id for (evidence_id,) in query.order_by(Evidence.id)]
+    done = sum(1 for evidence_id in evidence_ids if generate(evidence_id))
+    print(f"{done} of {len(evidence_ids)} evidence files processed")
+
+@app.cli.command("repair-case-counters")
+@click.option('--check', is_flag=True, help='Only report drift; exit with status 1 if there is any.')
+def repair_case_counters(check):
+    """Recomputes the evidence, participant and open task counts of every case."""
+    from app.cases.counters import find_drift, repair
+
+    drift = find_drift() if check else repair()
+    for case_id, counter, stored, actual in drift:
+        print(f"case {case_id}: {counter} was {stored}, counted {actual}")
+    print(f"{len(drift)} drifted counters {'found' if check else 'repaired'}")
+    if check and drift:
+        raise SystemExit(1)
+
+@app.cli.command("reconcile-station-stats")
+@click.option('--check', is_flag=True, help='Only report drift; exit with status 1 if there is any.')
+def reconcile_station_stats(check):
+    """Recounts the station_stats and officer_task_stats rollups from scratch."""
+    from app.dashboard.station_stats import reconcile
+
+    drift = reconcile(apply=not check)
+    for station_id, user_id, column, stored, counted in drift:
+        officer = f" officer {user_id}" if user_id is not None else ""
+        print(f"station {station_id}{officer}: {column} was {stored}, counted {counted}")
+    print(f"{len(drift)} drifted figures {'found' if check else 'repaired'}")
+    if check and drift:
+        raise SystemExit(1)
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
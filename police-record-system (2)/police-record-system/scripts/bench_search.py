@@ -0,0 +1,287 @@
+"""
+Search benchmark: search_name and list_cases search on synthetic stations.
+
+For every size a fresh SQLite database is migrated to head and filled by
+scripts/synthetic_data.py (a benchmark station of that size plus a noise
+station a tenth of the size). Then, through the Flask test client:
+
+  search_name   cold latency (name index build + first query), warm latency
+                with the result cache off, cached latency, index memory and
+                SQL statements per request
+  list_cases    cold latency (fresh connection), warm latency and SQL
+                statements per request
+
+Queries are drawn from the same seed: prefixes, full names, misspellings and
+Devanagari names. The JSON report can be compared with another run:
+
+    python scripts/bench_search.py --sizes 10000,100000 --out bench.json
+    python scripts/bench_search.py --sizes 10000,100000 --compare bench.json
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from flask_migrate import upgrade
+from sqlalchemy import event
+
+from app import create_app, db
+from app.config import Config
+from app.models import Case, Criminal, Participant
+from app.search.cache import result_cache
+from app.search.index import name_index
+from scripts.synthetic_data import PASSWORD, populate_station
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+
+
+def make_app(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        WTF_CSRF_ENABLED = False
+        TESTING = True
+    return create_app(BenchConfig)
+
+
+class StatementCounter:
+    """
+    Counts SQL statements sent to the engine.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def timed(client, url, params, counter):
+    before = counter.count
+    start = time.perf_counter()
+    response = client.get(url, query_string=params)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} {params} -> {response.status_code}')
+    return elapsed, counter.count - before
+
+
+def summary(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+    return {'n': len(ordered), 'mean': round(statistics.fmean(ordered), 2),
+            'p50': pct(50), 'p95': pct(95), 'p99': pct(99), 'max': round(ordered[-1], 2)}
+
+
+def misspell(rng, word):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    op = rng.choice(('swap', 'drop', 'double'))
+    if op == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if op == 'drop':
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def build_queries(station_id, count, seed):
+    """
+    Name queries (prefixes, full names, misspellings, Devanagari) and case
+    search terms drawn from the benchmark station's own data.
+    """
+    rng = random.Random(seed)
+    names = [n for (n,) in db.session.query(Participant.name)
+             .join(Case, Participant.case_id == Case.id)
+             .filter(Case.station_id == station_id).limit(5000)]
+    names += [n for (n,) in db.session.query(Criminal.name).filter_by(station_id=station_id).limit(1000)]
+    titles = [t for (t,) in db.session.query(Case.title).filter_by(station_id=station_id).limit(2000)]
+
+    name_queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.4:
+            name_queries.append(name[:rng.randint(2, max(2, min(6, len(name))))])
+        elif kind < 0.7:
+            name_queries.append(name)
+        else:
+            name_queries.append(' '.join(misspell(rng, w) for w in name.split()))
+
+    case_queries = []
+    for _ in range(count):
+        words = [w for w in rng.choice(titles).split() if len(w) > 2]
+        case_queries.append(' '.join(rng.sample(words, min(len(words), rng.choice((1, 1, 2))))))
+    return name_queries, case_queries
+
+
+def ensure_database(path, size, seed, reuse):
+    if reuse and os.path.exists(path):
+        return False
+    if os.path.exists(path):
+        os.remove(path)
+    app = make_app(path)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        populate_station(size, seed, name='Benchmark Station')
+        populate_station(max(1000, size // 10), seed + 1, name='Noise Station')
+    return True
+
+
+def bench_size(size, args):
+    path = os.path.join(args.workdir, f'bench_{size}_{args.seed}.db')
+    t0 = time.perf_counter()
+    generated = ensure_database(path, size, args.seed, args.reuse)
+    generate_s = round(time.perf_counter() - t0, 1)
+
+    app = make_app(path)
+    report = {'records': size, 'database_mb': None, 'generate_s': generate_s if generated else None}
+    with app.app_context():
+        station_id = db.session.query(Case.station_id).order_by(Case.id).limit(1).scalar()
+        name_queries, case_queries = build_queries(station_id, args.queries, args.seed)
+        engine = db.engine
+    counter = StatementCounter(engine)
+
+    # Requests run outside any app context, so each gets its own session
+    client = app.test_client()
+    client.post('/login', data={'username': f'admin_{station_id}', 'password': PASSWORD})
+
+    # --- search_name ---
+    name_index.invalidate()
+    result_cache.bump()
+    cold_ms, cold_statements = timed(client, '/search_name', {'q': name_queries[0]}, counter)
+
+    app.config['SEARCH_CACHE_SIZE'] = 0
+    warm, statements = [], []
+    for q in name_queries:
+        ms, n = timed(client, '/search_name', {'q': q}, counter)
+        warm.append(ms)
+        statements.append(n)
+
+    app.config['SEARCH_CACHE_SIZE'] = Config.SEARCH_CACHE_SIZE
+    for q in name_queries:
+        timed(client, '/search_name', {'q': q}, counter)
+    cached = [timed(client, '/search_name', {'q': q}, counter)[0] for q in name_queries]
+
+    with app.app_context():
+        name_index.invalidate(station_id)
+        tracemalloc.start()
+        index = name_index.get(station_id)
+        index_bytes, build_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    report['search_name'] = {
+        'candidates': len(index),
+        'cold_ms': round(cold_ms, 2),
+        'cold_statements': cold_statements,
+        'warm_ms': summary(warm),
+        'cached_ms': summary(cached),
+        'statements_per_request': max(statements),
+        'index_mb': round(index_bytes / 2 ** 20, 1),
+        'build_peak_mb': round(build_peak / 2 ** 20, 1),
+    }
+
+    # --- list_cases search ---
+    engine.dispose()
+    cold_ms, cold_statements = timed(client, '/cases', {'search': case_queries[0]}, counter)
+    warm, statements = [], []
+    for q in case_queries:
+        ms, n = timed(client, '/cases', {'search': q}, counter)
+        warm.append(ms)
+        statements.append(n)
+    report['list_cases'] = {
+        'cold_ms': round(cold_ms, 2),
+        'cold_statements': cold_statements,
+        'warm_ms': summary(warm),
+        'statements_per_request': max(statements),
+    }
+    report['database_mb'] = round(os.path.getsize(path) / 2 ** 20, 1)
+    return report
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """
+    Prints p50/p95 changes against a previous report.
+    """
+    old = {r['records']: r for r in baseline['results']}
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for r in report['results']:
+        base = old.get(r['records'])
+        if base is None:
+            continue
+        for endpoint in ('search_name', 'list_cases'):
+            for stat in ('p50', 'p95'):
+                before, after = base[endpoint]['warm_ms'][stat], r[endpoint]['warm_ms'][stat]
+                change = (after - before) / before * 100 if before else 0.0
+                print(f"  {r['records']:>8} {endpoint:<12} {stat}: {before:9.2f} -> {after:9.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark search_name and list_cases search.')
+    parser.add_argument('--sizes', default='10000,100000',
+                        help='comma-separated station sizes in records, e.g. 10000,100000,1000000')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--queries', type=int, default=100, help='queries per endpoint and size')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'police-bench'),
+                        help='where the generated databases are kept')
+    parser.add_argument('--reuse', action='store_true', help='reuse generated databases of the same size and seed')
+    parser.add_argument('--out', default='bench_search.json')
+    parser.add_argument('--compare', help='previous report to compare against')
+    args = parser.parse_args()
+    os.makedirs(args.workdir, exist_ok=True)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'seed': args.seed,
+            'queries': args.queries,
+        },
+        'results': [],
+    }
+    for size in (int(s) for s in args.sizes.split(',')):
+        print(f"Benchmarking {size} records...")
+        result = bench_size(size, args)
+        report['results'].append(result)
+        print(f"  search_name warm p50 {result['search_name']['warm_ms']['p50']} ms, "
+              f"list_cases warm p50 {result['list_cases']['warm_ms']['p50']} ms")
+    report['meta']['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Concurrent FIR registration stress test for the number allocator.
+
+Creates a fresh SQLite database with two stations and one clerk per worker,
+then has every worker process run several threads that register FIRs through
+/fir/register at the same time. Afterwards it checks that every registration
+succeeded and that no FIR or case number was handed out twice.
+
+    python scripts/stress_numbering.py --processes 4 --threads 4 --registrations 25
+    python scripts/stress_numbering.py --block-size 10
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import multiprocessing
+import tempfile
+import threading
+from collections import Counter
+
+from flask_migrate import upgrade
+
+from app import create_app, db
+from app.config import Config
+from app.models import Case, FIR, Station, User
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+PASSWORD = 'stress123'
+STATION_FORMATS = ['FIR-{year}-{num}', 'NND/{num}/{year}']
+
+
+def make_app(db_path, block_size):
+    class StressConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        # SQLite serialises writers; let them wait rather than fail
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 60}}
+        SEQUENCE_BLOCK_SIZE = block_size
+        WTF_CSRF_ENABLED = False
+        TESTING = True
+    return create_app(StressConfig)
+
+
+def setup(db_path, clerks):
+    app = make_app(db_path, 1)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        stations = [Station(name=f'Stress Station {i}', fir_prefix_format=fmt)
+                    for i, fmt in enumerate(STATION_FORMATS)]
+        db.session.add_all(stations)
+        db.session.flush()
+        for i in range(clerks):
+            user = User(username=f'clerk{i}', email=f'clerk{i}@stress.police.gov', role='clerk',
+                        full_name=f'Clerk {i}', station_id=stations[i % len(stations)].id)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+
+
+def worker(db_path, block_size, first_clerk, threads, registrations, errors):
+    app = make_app(db_path, block_size)
+
+    def register(clerk):
+        client = app.test_client()
+        client.post('/login', data={'username': clerk, 'password': PASSWORD})
+        for n in range(registrations):
+            response = client.post('/fir/register', data={
+                'fir_number': 'auto', 'details': f'Stress registration {n} by {clerk}', 'witnesses': ''})
+            if response.status_code != 302:
+                errors.put(f'{clerk}: HTTP {response.status_code}')
+
+    pool = [threading.Thread(target=register, args=(f'clerk{first_clerk + t}',)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress concurrent FIR registration.')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='threads (clerks) per process')
+    parser.add_argument('--registrations', type=int, default=25, help='FIRs per clerk')
+    parser.add_argument('--block-size', type=int, default=1, help='SEQUENCE_BLOCK_SIZE for the workers')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='police-stress-'), 'stress.db')
+    setup(db_path, args.processes * args.threads)
+
+    errors = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(db_path, args.block_size, p * args.threads,
+                                                          args.threads, args.registrations, errors))
+             for p in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    failures = []
+    while not errors.empty():
+        failures.append(errors.get())
+    expected = args.processes * args.threads * args.registrations
+    app = make_app(db_path, 1)
+    with app.app_context():
+        fir_numbers = [n for (n,) in db.session.query(FIR.fir_number)]
+        case_numbers = [n for (n,) in db.session.query(Case.case_number)]
+    duplicates = [n for n, c in (Counter(fir_numbers) + Counter(case_numbers)).items() if c > 1]
+
+    print(f'{expected} registrations, {len(fir_numbers)} FIRs, {len(case_numbers)} cases, '
+          f'{len(failures)} failed requests, {len(duplicates)} duplicate numbers')
+    for line in failures[:10]:
+        print('  ', line)
+    print('Sample numbers:', sorted(fir_numbers)[:3], sorted(case_numbers)[:3])
+    ok = not failures and not duplicates and len(fir_numbers) == expected == len(case_numbers)
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Seeded synthetic station data for benchmarks.
+
+Extends seed_data.py (stations and role users) and populate_data.py (cases
+with locations and offense types) to arbitrary sizes: a station of N records
+gets roughly 30% cases, 60% participants and 10% criminals, with Marathi,
+Hindi and English names, aliases, locations and case titles in both Latin and
+Devanagari script. The same seed always produces the same rows.
+
+Rows are written with bulk inserts, so the phonetic keys and Latin shadows
+that the model validators normally fill are computed here.
+
+Usage:
+    python scripts/synthetic_data.py --records 10000 --seed 42
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import User, Station, Case, Participant, Criminal
+from app.phonetic import phonetic_key
+from app.transliteration import to_latin
+
+FIRST_NAMES = [
+    # Marathi / Hindi (Latin)
+    'Rajesh', 'Sunil', 'Amit', 'Vikas', 'Santosh', 'Ganesh', 'Mahesh', 'Ramesh', 'Suresh', 'Prakash',
+    'Sachin', 'Nitin', 'Ajay', 'Vijay', 'Sanjay', 'Ravi', 'Anil', 'Dinesh', 'Pravin', 'Sandeep',
+    'Sunita', 'Anita', 'Priya', 'Pooja', 'Kavita', 'Savita', 'Meena', 'Rekha', 'Manisha', 'Jyoti',
+    'Balaji', 'Dnyaneshwar', 'Tukaram', 'Vitthal', 'Shivaji', 'Sambhaji', 'Raju', 'Babu', 'Gajanan', 'Laxman',
+    # English
+    'John', 'David', 'Michael', 'Peter', 'Thomas', 'Mary', 'Sarah', 'Joseph', 'Daniel', 'Grace',
+]
+FIRST_NAMES_DEVANAGARI = [
+    'राजेश', 'सुनील', 'अमित', 'विकास', 'संतोष', 'गणेश', 'महेश', 'रमेश', 'सचिन', 'नितीन',
+    'अजय', 'विजय', 'संजय', 'रवी', 'सुनीता', 'अनिता', 'प्रिया', 'पूजा', 'कविता', 'ज्योती',
+    'बालाजी', 'तुकाराम', 'विठ्ठल', 'शिवाजी', 'राजू', 'गजानन', 'लक्ष्मण',
+]
+SURNAMES = [
+    'Deshmukh', 'Patil', 'Jadhav', 'Pawar', 'Shinde', 'Kale', 'Rathod', 'Gaikwad', 'Kulkarni', 'Joshi',
+    'More', 'Chavan', 'Bhosale', 'Kadam', 'Wagh', 'Salunkhe', 'Sawant', 'Gore', 'Kamble', 'Sonawane',
+    'Sharma', 'Verma', 'Yadav', 'Singh', 'Gupta', 'Mishra', 'Tiwari', 'Pandey', 'Chauhan', 'Khan',
+    'Shaikh', 'Pathan', 'Ansari', "D'Souza", 'Fernandes', 'Smith', 'Williams', 'Brown', 'Taylor', 'Wilson',
+]
+SURNAMES_DEVANAGARI = [
+    'देशमुख', 'पाटील', 'जाधव', 'पवार', 'शिंदे', 'काळे', 'राठोड', 'गायकवाड', 'कुलकर्णी', 'जोशी',
+    'मोरे', 'चव्हाण', 'भोसले', 'कदम', 'वाघ', 'शर्मा', 'यादव', 'सिंह', 'गुप्ता', 'मिश्रा',
+]
+ALIASES = ['Bhau', 'Pappu', 'Dada', 'Bunty', 'Chhotu', 'Golu', 'Kalya', 'Tiger', 'Master', 'Don',
+           'भाऊ', 'पप्पू', 'दादा', 'टकल्या', 'बंटी', 'छोटू']
+LOCATIONS = [
+    'Shivaji Nagar', 'Vazirabad', 'Anand Nagar', 'Sarafa Bazar', 'Railway Station', 'Cidco',
+    'Hingoli Gate', 'Itwara', 'Taroda Naka', 'Vishnupuri', 'Bhagya Nagar', 'Station Road',
+    'शिवाजी नगर', 'वजीराबाद', 'आनंद नगर', 'सराफा बाजार', 'रेल्वे स्थानक', 'सिडको',
+]
+CITIES = ['Nanded', 'Latur', 'Parbhani', 'Hingoli', 'नांदेड', 'लातूर']
+OFFENSES = ['Theft', 'Burglary', 'Assault', 'Cybercrime', 'Fraud', 'Homicide', 'Drug', 'Other']
+TITLES = [
+    'Theft at {loc}', 'Motorcycle stolen from {loc}', 'Assault near {loc}', 'Chain snatching in {loc}',
+    'House break-in at {loc}', 'Online banking fraud reported by {name}', 'Mobile theft near {loc}',
+    'Hit and run on {loc} road', 'Domestic violence complaint by {name}', 'Drug seizure at {loc}',
+    '{loc} येथे मोबाइल चोरी', '{loc} येथे घरफोडी', '{name} यांची फसवणूक', '{loc} मध्ये मारहाण',
+    '{loc} में चोरी', '{name} के साथ धोखाधड़ी',
+]
+DESCRIPTIONS = [
+    'Complainant {name} reported the incident at {loc}. Statements of witnesses are being recorded.',
+    'Suspect fled towards {loc}. CCTV footage requested from nearby shops.',
+    'तक्रारदार {name} यांनी {loc} येथे घडलेल्या घटनेची माहिती दिली.',
+    'शिकायतकर्ता {name} ने {loc} में हुई घटना की सूचना दी।',
+]
+PARTICIPANT_TYPES = ['Victim', 'Suspect', 'Witness', 'Complainant']
+STATUSES = ['Open', 'In Progress', 'Closed', 'Court', 'Pending']
+CRIMINAL_STATUSES = ['Wanted', 'Arrested', 'In Custody']
+# seed_data.py roles, one user each per station
+STATION_ROLES = ['admin', 'inspector', 'io', 'clerk', 'malkhana', 'forensic', 'court']
+
+BATCH_SIZE = 5000
+PASSWORD = 'bench123'
+
+
+class Generator:
+    """
+    Produces rows for one station from a seeded random.Random.
+    """
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def name(self, devanagari_share=0.3):
+        if self.rng.random() < devanagari_share:
+            return f'{self.rng.choice(FIRST_NAMES_DEVANAGARI)} {self.rng.choice(SURNAMES_DEVANAGARI)}'
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(SURNAMES)}'
+
+    def location(self):
+        return f'{self.rng.choice(LOCATIONS)}, {self.rng.choice(CITIES)}'
+
+    def moment(self, now, days=3 * 365):
+        return now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def case(self, station_id, seq, creator_id, officer_ids, now):
+        loc, name = self.rng.choice(LOCATIONS), self.name()
+        title = self.rng.choice(TITLES).format(loc=loc, name=name)
+        description = self.rng.choice(DESCRIPTIONS).format(loc=loc, name=name)
+        created_at = self.moment(now)
+        return {
+            'station_id': station_id,
+            'case_number': f'CASE-{station_id}-{created_at.year}-{seq:07d}',
+            'title': title, 'title_latin': to_latin(title),
+            'description': description, 'description_latin': to_latin(description),
+            'offense_type': self.rng.choice(OFFENSES),
+            'location': self.location(),
+            'status': self.rng.choice(STATUSES),
+            'priority': self.rng.choice(['Low', 'Medium', 'High', 'Critical']),
+            'created_by_id': creator_id,
+            'assigned_officer_id': self.rng.choice(officer_ids),
+            'created_at': created_at, 'updated_at': created_at,
+        }
+
+    def participant(self, case_id, now):
+        name = self.name()
+        return {
+            'case_id': case_id, 'name': name,
+            'name_phonetic': phonetic_key(name), 'name_latin': to_latin(name),
+            'type': self.rng.choice(PARTICIPANT_TYPES),
+            'address': self.location(), 'created_at': self.moment(now),
+        }
+
+    def criminal(self, station_id, now):
+        name = self.name()
+        aliases = self.rng.choice(ALIASES) if self.rng.random() < 0.4 else None
+        return {
+            'station_id': station_id, 'name': name,
+            'name_phonetic': phonetic_key(name), 'name_latin': to_latin(name),
+            'aliases': aliases, 'aliases_phonetic': phonetic_key(aliases), 'aliases_latin': to_latin(aliases),
+            'status': self.rng.choice(CRIMINAL_STATUSES),
+            'address': self.location(), 'created_at': self.moment(now),
+        }
+
+
+def _flush(model, rows):
+    if rows:
+        db.session.execute(insert(model), rows)
+        db.session.commit()
+        rows.clear()
+
+
+def populate_station(records, seed=42, name=None):
+    """
+    Creates one station with about ``records`` searchable records and its
+    users. Returns the station id. Must run inside an app context.
+    """
+    gen = Generator(seed)
+    now = datetime(2026, 1, 1)
+    password_hash = generate_password_hash(PASSWORD)
+
+    station = Station(name=name or f'Synthetic Station {seed}-{records}',
+                      address=gen.location(), fir_prefix_format='FIR-{year}-{num}')
+    db.session.add(station)
+    db.session.commit()
+
+    n_cases = max(1, records * 3 // 10)
+    n_participants = records * 6 // 10
+    n_criminals = records - n_cases - n_participants
+    n_officers = max(10, records // 2000)
+
+    users = []
+    for role in STATION_ROLES:
+        users.append({'username': f'{role}_{station.id}', 'role': role})
+    for i in range(n_officers):
+        users.append({'username': f'officer_{station.id}_{i}', 'role': 'officer'})
+    for u in users:
+        full_name = gen.name()
+        u.update(station_id=station.id, email=f"{u['username']}@bench.police.gov",
+                 password_hash=password_hash, full_name=full_name,
+                 full_name_phonetic=phonetic_key(full_name), full_name_latin=to_latin(full_name),
+                 badge_number=f"BNCH-{u['username'].upper()}", is_active=True, created_at=now)
+    _flush(User, users)
+
+    admin_id = db.session.query(User.id).filter_by(username=f'admin_{station.id}').scalar()
+    officer_ids = [uid for (uid,) in db.session.query(User.id).filter_by(station_id=station.id, role='officer')]
+
+    rows = []
+    first_case_id = (db.session.query(db.func.max(Case.id)).scalar() or 0) + 1
+    for seq in range(n_cases):
+        rows.append(gen.case(station.id, seq, admin_id, officer_ids, now))
+        if len(rows) >= BATCH_SIZE:
+            _flush(Case, rows)
+    _flush(Case, rows)
+    case_ids = [cid for (cid,) in db.session.query(Case.id).filter(
+        Case.station_id == station.id, Case.id >= first_case_id)]
+
+    for _ in range(n_participants):
+        rows.append(gen.participant(gen.rng.choice(case_ids), now))
+        if len(rows) >= BATCH_SIZE:
+            _flush(Participant, rows)
+    _flush(Participant, rows)
+
+    for _ in range(n_criminals):
+        rows.append(gen.criminal(station.id, now))
+        if len(rows) >= BATCH_SIZE:
+            _flush(Criminal, rows)
+    _flush(Criminal, rows)
+
+    return station.id
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        station_id = populate_station(args.records, args.seed)
+        print(f"Created station {station_id} with {args.records} records "
+              f"(log in as admin_{station_id} / {PASSWORD})")
@@ -0,0 +1,102 @@
+"""
+Shared fixtures: every test gets its own SQLite database, copied from one
+migrated to head at the start of the session, and a Flask app on it.
+"""
+import os
+import shutil
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import event
+
+from app import create_app, db
+from app.config import Config
+from app.dashboard.metrics import metrics_cache
+from app.models import Station, User
+from app.search.cache import result_cache
+from app.search.index import name_index
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+
+
+def make_config(db_path, store):
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        # SQLite serialises writers; threads in a test wait rather than fail
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+        WTF_CSRF_ENABLED = False
+        TESTING = True
+        EVIDENCE_STORE = str(store)
+        DERIVATIVE_WORKERS = 0
+        SQL_STATEMENT_LIMIT = 30  # Views with a tighter budget set their own (statement_limit)
+    return TestConfig
+
+
+@pytest.fixture(scope='session')
+def migrated_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp('migrated') / 'police.db'
+    app = create_app(make_config(path, tmp_path_factory.mktemp('store')))
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        db.engine.dispose()
+    return path
+
+
+@pytest.fixture
+def app(migrated_db, tmp_path):
+    path = tmp_path / 'police.db'
+    shutil.copy(migrated_db, path)
+    app = create_app(make_config(path, tmp_path / 'evidence'))
+    # The name index and the caches live in the process, keyed by station id
+    name_index.invalidate()
+    result_cache.bump()
+    metrics_cache.invalidate()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class StatementCounter:
+    """
+    Counts the SQL statements sent to an engine.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+@pytest.fixture
+def statements(app):
+    with app.app_context():
+        return StatementCounter(db.engine)
+
+
+def add_station(name='Test Station', roles=('admin', 'inspector', 'officer', 'io', 'clerk')):
+    """
+    Creates a station with one user per role (username '<role>_<station id>',
+    password 'password'). Returns the station id. Needs an app context.
+    """
+    station = Station(name=name)
+    db.session.add(station)
+    db.session.flush()
+    for role in roles:
+        user = User(username=f'{role}_{station.id}', email=f'{role}_{station.id}@test.police.gov',
+                    role=role, full_name=f'{role.title()} {station.id}', station_id=station.id)
+        user.set_password('password')
+        db.session.add(user)
+    db.session.commit()
+    return station.id
+
+
+def login(client, username, password='password'):
+    return client.post('/login', data={'username': username, 'password': password})
@@ -0,0 +1,182 @@
+"""
+The stored per-case counters (app/cases/counters.py) and the station rollups
+(app/dashboard/station_stats.py) must match a fresh COUNT(*) after any ORM
+write: adds, deletes, moves between cases, task status changes, delete-orphan
+cascades and the bulk participant/officer sync.
+"""
+import pytest
+from sqlalchemy import delete
+
+from app import db
+from app.cases.counters import find_drift, repair
+from app.cases.sync import sync_officers, sync_participants
+from app.dashboard.station_stats import reconcile
+from app.models import Case, Evidence, FIR, Participant, Task, User
+
+from tests.conftest import add_station
+
+
+def assert_no_drift():
+    # What `flask repair-case-counters --check` and
+    # `flask reconcile-station-stats --check` report
+    assert find_drift() == []
+    assert reconcile(apply=False) == []
+
+
+def counters(case):
+    db.session.refresh(case)
+    return case.evidence_count, case.participant_count, case.open_task_count
+
+
+@pytest.fixture
+def station(app):
+    with app.app_context():
+        station_id = add_station()
+        users = {u.role: u.id for u in User.query.filter_by(station_id=station_id)}
+        yield station_id, users
+
+
+def new_case(station, number):
+    station_id, users = station
+    case = Case(station_id=station_id, case_number=f'TEST-{number}', title=f'Case {number}',
+                description='Counter test', created_by_id=users['officer'])
+    db.session.add(case)
+    db.session.flush()
+    return case
+
+
+def new_evidence(case, n=1):
+    items = [Evidence(station_id=case.station_id, case_id=case.id, description=f'Item {i}') for i in range(n)]
+    db.session.add_all(items)
+    return items
+
+
+def new_fir(station, case, number):
+    fir = FIR(station_id=case.station_id, fir_number=f'FIR-{number}', case_id=case.id,
+              filed_by_id=station[1]['officer'], details='Counter test')
+    db.session.add(fir)
+    return fir
+
+
+def new_task(station, case, status='Pending'):
+    task = Task(station_id=case.station_id, case_id=case.id, title='Counter test', status=status,
+                assigned_to_id=station[1]['io'], assigned_by_id=station[1]['inspector'])
+    db.session.add(task)
+    return task
+
+
+def participant(name):
+    return {'name': name, 'type': 'Witness', 'contact_info': '', 'details': '',
+            'dob': None, 'national_id': None, 'address': None}
+
+
+def test_add_and_delete(station):
+    case = new_case(station, 1)
+    evidence = new_evidence(case, 3)
+    firs = [new_fir(station, case, i) for i in range(2)]
+    tasks = [new_task(station, case), new_task(station, case), new_task(station, case, 'Completed')]
+    case.participants.append(Participant(name='Sunita Jadhav', type='Witness'))
+    db.session.commit()
+    assert counters(case) == (3, 1, 2)
+    assert_no_drift()
+
+    db.session.delete(evidence[0])
+    db.session.delete(firs[0])
+    db.session.delete(tasks[0])
+    db.session.delete(tasks[2])
+    db.session.commit()
+    assert counters(case) == (2, 1, 1)
+    assert_no_drift()
+
+
+def test_reassign_between_cases(station):
+    first, second = new_case(station, 1), new_case(station, 2)
+    evidence = new_evidence(first, 2)
+    fir = new_fir(station, first, 1)
+    open_task, done_task = new_task(station, first), new_task(station, first, 'Completed')
+    db.session.commit()
+    assert counters(first) == (2, 0, 1)
+
+    # By foreign key and by relationship
+    evidence[0].case_id = second.id
+    fir.case = second
+    open_task.case_id = second.id
+    done_task.case = second
+    db.session.commit()
+    assert counters(first) == (1, 0, 0)
+    assert counters(second) == (1, 0, 1)
+    assert_no_drift()
+
+    # Moved and reopened/closed in the same flush
+    open_task.case_id, open_task.status = first.id, 'Completed'
+    done_task.case_id, done_task.status = first.id, 'In Progress'
+    db.session.commit()
+    assert counters(first) == (1, 0, 1)
+    assert counters(second) == (1, 0, 0)
+    assert_no_drift()
+
+
+def test_delete_orphan_cascade(station):
+    case, other = new_case(station, 1), new_case(station, 2)
+    case.participants.extend(Participant(name=name, type='Witness') for name in ('Ravi', 'Asha', 'Meena'))
+    other.participants.append(Participant(name='Kiran Patil', type='Victim'))
+    db.session.commit()
+    assert counters(case)[1] == 3
+
+    case.participants.remove(case.participants[0])
+    db.session.commit()
+    assert counters(case)[1] == 2
+    assert_no_drift()
+
+    # Deleting the case takes its participants along
+    db.session.delete(case)
+    db.session.commit()
+    assert counters(other)[1] == 1
+    assert_no_drift()
+
+
+def test_rollback_discards_changes(station):
+    case = new_case(station, 1)
+    db.session.commit()
+    new_evidence(case, 2)
+    new_task(station, case)
+    db.session.flush()
+    db.session.rollback()
+    assert counters(case) == (0, 0, 0)
+    assert_no_drift()
+
+
+def test_bulk_sync(station):
+    case = new_case(station, 1)
+    db.session.commit()
+    sync_participants(case, [(None, participant('Ravi')), (None, participant('Asha'))])
+    db.session.commit()
+    assert counters(case)[1] == 2
+    assert_no_drift()
+
+    ravi, asha = sorted(case.participants, key=lambda p: p.name, reverse=True)
+    # Rename one, keep one as stored, add one; nothing is deleted
+    sync_participants(case, [(ravi.id, participant('Ravi Kumar')), (asha.id, None), (None, participant('Meena'))])
+    db.session.commit()
+    assert counters(case)[1] == 3
+    assert_no_drift()
+
+    sync_participants(case, [(asha.id, participant('Asha'))])
+    sync_officers(case, list(station[1].values()))
+    db.session.commit()
+    assert counters(case)[1] == 1
+    assert_no_drift()
+
+
+def test_check_reports_bulk_deletes(station):
+    # query.delete() bypasses the hooks; the check must notice and repair fix it
+    case = new_case(station, 1)
+    new_evidence(case, 2)
+    db.session.commit()
+    db.session.execute(delete(Evidence).where(Evidence.case_id == case.id))
+    db.session.commit()
+    assert find_drift() == [(case.id, 'evidence_count', 2, 0)]
+
+    repair()
+    assert counters(case)[0] == 0
+    assert find_drift() == []
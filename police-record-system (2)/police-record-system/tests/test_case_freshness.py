@@ -0,0 +1,80 @@
+"""
+Conditional GETs of a case (app/cases/freshness.py): an unchanged case is a
+304 by ETag, or by Last-Modified for clients that send no ETag back; any
+write shown on the page, and a CSRF token period ending, make it a 200.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import db
+from app.cases import freshness
+from app.models import Case, Evidence, User
+
+from tests.conftest import add_station, login
+
+
+@pytest.fixture
+def case_page(app, client):
+    with app.app_context():
+        station_id = add_station()
+        clerk = User.query.filter_by(station_id=station_id, role='clerk').one()
+        case = Case(station_id=station_id, case_number='FRESH-1', title='Fresh case',
+                    description='Freshness test', created_by_id=clerk.id)
+        db.session.add(case)
+        db.session.commit()
+        case_id = case.id
+    login(client, f'admin_{station_id}')
+    client.get(f'/cases/{case_id}')  # Shows the login flash message
+    return case_id
+
+
+def fetch(client, url, **headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code in (200, 304)
+    return response
+
+
+@pytest.mark.parametrize('url', ['/cases/{case_id}', '/api/cases/{case_id}'])
+def test_unchanged_case_is_not_modified(client, case_page, url):
+    url = url.format(case_id=case_page)
+    first = fetch(client, url)
+    assert first.status_code == 200
+    etag, modified = first.headers['ETag'], first.headers['Last-Modified']
+
+    by_etag = fetch(client, url, **{'If-None-Match': etag})
+    assert by_etag.status_code == 304
+    assert by_etag.headers['ETag'] == etag
+    assert fetch(client, url, **{'If-Modified-Since': modified}).status_code == 304
+    # If-None-Match wins over a matching If-Modified-Since
+    assert fetch(client, url, **{'If-None-Match': '"other"', 'If-Modified-Since': modified}).status_code == 200
+
+
+def test_child_write_changes_validators(app, client, case_page):
+    url = f'/cases/{case_page}'
+    first = fetch(client, url)
+    with app.app_context():
+        case = db.session.get(Case, case_page)
+        db.session.add(Evidence(station_id=case.station_id, case_id=case.id, description='New item'))
+        db.session.commit()
+
+    response = fetch(client, url, **{'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert b'New item' in response.data
+    assert response.headers['ETag'] != first.headers['ETag']
+
+
+def test_csrf_period_ends_revalidation(app, client, case_page, monkeypatch):
+    app.config.update(WTF_CSRF_ENABLED=True, WTF_CSRF_TIME_LIMIT=600)
+    clock = SimpleNamespace(now=time.time())
+    monkeypatch.setattr(freshness, 'time', SimpleNamespace(time=lambda: clock.now))
+    url = f'/cases/{case_page}'
+    first = fetch(client, url)
+    etag, modified = first.headers['ETag'], first.headers['Last-Modified']
+    assert fetch(client, url, **{'If-None-Match': etag}).status_code == 304
+
+    # Half the time limit later the embedded token is due for a new page
+    clock.now += 300
+    assert fetch(client, url, **{'If-None-Match': etag}).status_code == 200
+    assert fetch(client, url, **{'If-Modified-Since': modified}).status_code == 200
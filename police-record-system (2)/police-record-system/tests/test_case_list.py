@@ -0,0 +1,60 @@
+"""
+Paging the case list (app/cases/routes.py list_cases): search results are
+ordered by relevance and page by number; a cursor only pages the plain list.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Case, User
+
+from tests.conftest import add_station, login
+
+MATCHES = 25
+
+
+@pytest.fixture
+def station(app, client):
+    with app.app_context():
+        station_id = add_station()
+        clerk = User.query.filter_by(station_id=station_id, role='clerk').one()
+        start = datetime(2026, 1, 1)
+        for i in range(MATCHES + 5):
+            # Relevance order differs from age: later cases mention it less
+            text = ' '.join(['burglary'] * (1 + i % 4)) if i < MATCHES else 'traffic accident'
+            db.session.add(Case(station_id=station_id, case_number=f'LIST-{i:03d}', title=f'Case {i}',
+                                description=f'Report of {text} near the market', created_by_id=clerk.id,
+                                created_at=start + timedelta(hours=i)))
+        db.session.commit()
+    login(client, f'admin_{station_id}')
+    return station_id
+
+
+def listed(response):
+    assert response.status_code == 200
+    return re.findall(r'LIST-\d{3}', response.get_data(as_text=True))
+
+
+def cursor(response, name):
+    match = re.search(rf'{name}=([\w-]+)', response.get_data(as_text=True))
+    return match and match.group(1)
+
+
+def test_search_pages_cover_every_match_once(client, station):
+    seen = []
+    for page in range(1, MATCHES // 10 + 2):
+        seen += listed(client.get('/cases', query_string={'search': 'burglary', 'page': page}))
+    assert sorted(seen) == [f'LIST-{i:03d}' for i in range(MATCHES)]
+
+
+def test_search_ignores_cursor(app, client, station):
+    app.config['CASE_LIST_PAGE_NUMBERS_MAX'] = 5  # Plain list pages by cursor
+    first = client.get('/cases')
+    after = cursor(first, 'after')
+    assert after and listed(first) == [f'LIST-{i:03d}' for i in range(MATCHES + 4, MATCHES - 6, -1)]
+    assert listed(client.get('/cases', query_string={'after': after}))[0] == f'LIST-{MATCHES - 6:03d}'
+
+    ranked = listed(client.get('/cases', query_string={'search': 'burglary'}))
+    assert listed(client.get('/cases', query_string={'search': 'burglary', 'after': after})) == ranked
@@ -0,0 +1,65 @@
+"""
+The dashboard metrics service (app/dashboard/metrics.py): two GROUP BY
+statements per station, none on a cache hit, and committed writes drop the
+cached figures of the stations they touch.
+"""
+import pytest
+
+from app import db
+from app.dashboard.metrics import station_metrics
+from app.dashboard.station_stats import station_stats
+from app.models import Case, FIR, User
+
+from tests.conftest import add_station, login
+
+
+@pytest.fixture
+def station(app):
+    with app.app_context():
+        station_id = add_station()
+        officer = User.query.filter_by(username=f'officer_{station_id}').one()
+        for i, status in enumerate(('Open', 'Open', 'In Progress', 'Closed', 'Court')):
+            case = Case(station_id=station_id, case_number=f'TEST-{i}', title=f'Case {i}', status=status,
+                        description='Metrics test', created_by_id=officer.id)
+            db.session.add(case)
+            db.session.flush()
+            db.session.add(FIR(station_id=station_id, fir_number=f'FIR-{i}', case_id=case.id,
+                               filed_by_id=officer.id, details='Metrics test', forwarded_to_sho=i % 2 == 0))
+        db.session.commit()
+        yield station_id
+
+
+def test_figures_match_rollup(station):
+    metrics, stats = station_metrics(station), station_stats(station)
+    assert metrics['total_cases'] == stats.cases_total == 5
+    assert metrics['closed_cases'] == stats.cases_closed == 1
+    assert metrics['active_cases'] == stats.cases_open + stats.cases_in_progress == 3
+    assert metrics['pending_firs'] == stats.firs_pending == 5
+    assert metrics['forwarded_firs'] == stats.firs_forwarded == 3
+    assert metrics['total_users'] == stats.users == 5
+
+
+def test_cached_until_a_write_commits(station, statements):
+    before = statements.count
+    station_metrics(station)
+    assert statements.count - before == 2
+
+    before = statements.count
+    assert station_metrics(station)['active_cases'] == 3
+    assert statements.count == before
+
+    case = Case.query.filter_by(station_id=station, status='Open').first()
+    case.status = 'Closed'
+    db.session.flush()
+    # Not committed yet: the cached figures stay
+    assert station_metrics(station)['active_cases'] == 3
+    db.session.commit()
+    assert station_metrics(station)['active_cases'] == 2
+    assert station_metrics(station)['closed_cases'] == 2
+
+
+def test_inspector_dashboard(client, station):
+    login(client, f'inspector_{station}')
+    response = client.get('/dashboard/inspector')
+    assert response.status_code == 200
+    assert b'>5</p>' in response.data and b'>3</p>' in response.data
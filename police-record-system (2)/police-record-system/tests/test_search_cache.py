@@ -0,0 +1,69 @@
+"""
+/search_name result cache keys (app/search/cache.py): queries that are scored
+alike (the same after scoring.fold) share an entry, anything else misses.
+"""
+import unicodedata
+
+import pytest
+
+from app.search.cache import ResultCache, result_cache
+from app.search.scoring import top_matches
+
+from tests.conftest import add_station, login
+
+NAMES = ['Sunita Patil', 'Rajesh Patel', 'राजेश पाटील', 'José Dsouza']
+
+
+def nfd(text):
+    return unicodedata.normalize('NFD', text)
+
+
+@pytest.mark.parametrize('query, same', [
+    ('Patil', ' patil '),
+    ('Sunita Patil', 'SUNITA   patil'),
+    ('José', nfd('josé')),
+    ('राजेश', nfd('राजेश')),
+])
+def test_equivalent_queries_share_a_key(query, same):
+    cache = ResultCache()
+    assert cache.key(1, query, 'fuzzy', 60, 10) == cache.key(1, same, 'fuzzy', 60, 10)
+    # ...because they score alike
+    assert top_matches([query], NAMES, 0, 10) == top_matches([same], NAMES, 0, 10)
+
+
+@pytest.mark.parametrize('other', [
+    ('Patel', 'fuzzy', 60, 10),
+    ('Pa til', 'fuzzy', 60, 10),
+    ('Patil', 'phonetic', 60, 10),
+    ('Patil', 'fuzzy', 70, 10),
+    ('Patil', 'fuzzy', 60, 5),
+])
+def test_different_searches_miss(other):
+    cache = ResultCache()
+    assert cache.key(1, 'Patil', 'fuzzy', 60, 10) != cache.key(1, *other)
+    assert cache.key(1, 'Patil', 'fuzzy', 60, 10) != cache.key(2, 'Patil', 'fuzzy', 60, 10)
+
+
+def test_bump_starts_a_new_generation():
+    cache = ResultCache()
+    key = cache.key(1, 'Patil', 'fuzzy', 60, 10)
+    cache.bump(1)
+    assert cache.key(1, 'Patil', 'fuzzy', 60, 10) != key
+    assert cache.key(2, 'Patil', 'fuzzy', 60, 10) == cache.key(2, 'Patil', 'fuzzy', 60, 10)
+
+
+def test_search_hits_and_misses(app, client):
+    with app.app_context():
+        station_id = add_station()
+    login(client, f'admin_{station_id}')
+
+    def search(q):
+        hits, misses = result_cache.hits, result_cache.misses
+        response = client.get('/search_name', query_string={'q': q})
+        assert response.status_code == 200
+        return response.get_json()['results'], result_cache.hits - hits, result_cache.misses - misses
+
+    first, hits, misses = search('Inspector')
+    assert first and (hits, misses) == (0, 1)
+    assert search('  INSPECTOR ') == (first, 1, 0)
+    assert search('Inspecter')[1:] == (0, 1)
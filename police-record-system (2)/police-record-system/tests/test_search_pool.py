@@ -0,0 +1,77 @@
+"""
+Admission control of /search_name (app/search/pool.py): a full pool answers
+503 at once, and a search that outlives its wait answers with the best
+results found so far.
+"""
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+import pytest
+
+from app.search import routes
+from app.search.pool import ScoringPool
+
+from tests.conftest import add_station, login
+
+
+@pytest.fixture
+def pool(app, client, monkeypatch):
+    """
+    A one-thread pool with room for one waiting search, swapped in for the
+    shared one. Yields a function that occupies a slot until the test ends.
+    """
+    app.config.update(SEARCH_POOL_WORKERS=1, SEARCH_POOL_BACKLOG=1, SEARCH_CACHE_SIZE=0)
+    pool = ScoringPool()
+    monkeypatch.setattr(routes, 'scoring_pool', pool)
+    with app.app_context():
+        station_id = add_station()
+        pool._start()
+    login(client, f'admin_{station_id}')
+
+    release = threading.Event()
+
+    def occupy():
+        # The slot is taken before run stops waiting, and held until release
+        with pytest.raises(FuturesTimeout):
+            pool.run(release.wait, timeout=0)
+
+    yield occupy
+    release.set()
+
+
+def search(client, q='Admin'):
+    return client.get('/search_name', query_string={'q': q})
+
+
+def test_full_pool_answers_503(pool, client):
+    pool()  # Running
+    pool()  # Waiting
+    response = search(client)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['results'] == []
+
+
+def test_timeout_returns_best_so_far(app, pool, client, monkeypatch):
+    expected = search(client).get_json()['results']
+    assert expected
+
+    # Scoring finishes its results, then overruns the wait on its last chunk
+    overrun = threading.Event()
+    score = routes.score_candidates
+
+    def overrunning(*args):
+        *args, deadline, progress = args
+        found = score(*args, None, progress)
+        overrun.wait(5)
+        return found
+
+    app.config['SEARCH_DEADLINE'] = 0.1
+    monkeypatch.setattr(routes, 'SCORING_GRACE', 0)
+    monkeypatch.setattr(routes, 'score_candidates', overrunning)
+    try:
+        response = search(client)
+    finally:
+        overrun.set()
+    assert response.status_code == 200
+    assert response.get_json() == {'results': expected, 'partial': True}
@@ -0,0 +1,64 @@
+"""
+/search_name must not query per candidate: once a station's name index is
+built, a search costs the same handful of statements however large the
+station is, and building the index costs one query per source.
+"""
+import pytest
+
+from app import db
+from scripts.synthetic_data import PASSWORD, populate_station
+
+from tests.conftest import login
+
+SOURCES = 4  # cases, criminals, participants, users
+
+
+def search_statements(app, client, statements, station_id):
+    login(client, f'admin_{station_id}', PASSWORD)
+
+    before = statements.count
+    assert client.get('/search_name', query_string={'q': 'Rajesh'}).status_code == 200
+    cold = statements.count - before
+
+    warm = []
+    for q in ('Patil', 'Sunita Jadhav', 'Deshmuk', 'राजेश'):
+        before = statements.count
+        response = client.get('/search_name', query_string={'q': q})
+        assert response.status_code == 200
+        assert response.get_json()['results']
+        warm.append(statements.count - before)
+    return cold, warm
+
+
+@pytest.fixture
+def stations(app):
+    with app.app_context():
+        small = populate_station(200, seed=1, name='Small Station')
+        large = populate_station(3000, seed=2, name='Large Station')
+    # Every warm search must reach the database path, not the result cache
+    app.config['SEARCH_CACHE_SIZE'] = 0
+    return small, large
+
+
+def test_warm_search_statements_do_not_grow_with_station_size(app, statements, stations):
+    small, large = stations
+    small_cold, small_warm = search_statements(app, app.test_client(), statements, small)
+    large_cold, large_warm = search_statements(app, app.test_client(), statements, large)
+
+    assert len(set(small_warm + large_warm)) == 1, (small_warm, large_warm)
+    # Building the index adds one column-only query per source
+    assert small_cold == large_cold == small_warm[0] + SOURCES
+
+
+def test_index_build_is_one_query_per_source(app, statements, stations):
+    from app.search.index import name_index
+
+    small, large = stations
+    with app.app_context():
+        for station_id in (small, large):
+            name_index.invalidate(station_id)
+            before = statements.count
+            index = name_index.get(station_id)
+            assert statements.count - before == SOURCES
+            assert len(index) > 0
+        db.session.remove()
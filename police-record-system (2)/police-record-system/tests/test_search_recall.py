@@ -0,0 +1,88 @@
+"""
+Recall of the search shortlists: on a station larger than the shortlist,
+scoring only the n-gram shortlist (or, in phonetic mode, the phonetic key
+matches) must find the same top-k as scoring every candidate with cdist.
+"""
+import random
+
+import pytest
+
+from app.search.index import name_index
+from app.search.scoring import top_matches
+from app.transliteration import query_variants
+from scripts.bench_search import misspell
+from scripts.synthetic_data import populate_station
+
+SHORTLIST = 500
+TOP_K = 10
+THRESHOLD = 60
+
+
+@pytest.fixture
+def station_index(app):
+    with app.app_context():
+        station_id = populate_station(4000, seed=7, name='Recall Station')
+        index = name_index.get(station_id)
+    assert len(index) > 4 * SHORTLIST
+    return index
+
+
+def _names(index, devanagari):
+    return sorted({name for name in index.snapshot()[0]
+                   if len(name.split()) == 2 and (name.isascii() != devanagari)})
+
+
+def _queries(index, kind, count=15, seed=11):
+    rng = random.Random(seed)
+    if kind == 'devanagari':
+        return rng.sample(_names(index, devanagari=True), count)
+    names = rng.sample(_names(index, devanagari=False), count)
+    if kind == 'misspelled':
+        return [' '.join(misspell(rng, word) for word in name.split()) for name in names]
+    return names
+
+
+def _variations(q):
+    return [q, *query_variants(q)]
+
+
+def _top(queries, view, threshold):
+    names, latin, entries = view
+    matches, complete = top_matches(queries, names, threshold, TOP_K, latin, workers=1)
+    assert complete
+    return [(entries[i], score) for i, score in matches]
+
+
+def _assert_same_top(full, short):
+    # Same scores; names tied at the cut-off score may be swapped for equals
+    assert [score for _, score in short] == [score for _, score in full]
+    cutoff = full[-1][1] if len(full) == TOP_K else -1
+    assert ({id(e) for e, s in short if s > cutoff} == {id(e) for e, s in full if s > cutoff})
+
+
+@pytest.mark.parametrize('kind', ['latin', 'devanagari', 'misspelled'])
+def test_ngram_shortlist_matches_full_scan(station_index, kind):
+    for q in _queries(station_index, kind):
+        queries = _variations(q)
+        full = _top(queries, station_index.snapshot(), THRESHOLD)
+        short = _top(queries, station_index.candidates(queries, SHORTLIST), THRESHOLD)
+        assert full, q
+        _assert_same_top(full, short)
+
+
+@pytest.mark.parametrize('kind', ['latin', 'devanagari', 'misspelled'])
+def test_phonetic_shortlist_matches_full_scan(station_index, kind):
+    # Phonetic mode ranks the sound-alike names by fuzzy score: scoring the
+    # phonetic key matches must equal scoring everything and keeping the
+    # candidates that share a phonetic word key
+    from app.phonetic import phonetic_key
+
+    for q in _queries(station_index, kind):
+        queries = _variations(q)
+        keys = {k for v in queries for k in (phonetic_key(v) or '').split()}
+        names, latin, entries = station_index.snapshot()
+        alike = [i for i, e in enumerate(entries) if keys & set((e.get('phonetic') or '').split())]
+        full = _top(queries, ([names[i] for i in alike], [latin[i] for i in alike],
+                              [entries[i] for i in alike]), 0)
+        short = _top(queries, station_index.phonetic_matches(queries, SHORTLIST), 0)
+        _assert_same_top(full, short)
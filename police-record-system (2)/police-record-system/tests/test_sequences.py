@@ -0,0 +1,98 @@
+"""
+Concurrent registrations through app/sequences.py, against the file-backed
+SQLite database of the test app: every number is handed out once, and the
+numbers of a series have no gaps.
+"""
+import threading
+
+import pytest
+
+from app import db, sequences
+from app.models import Case, FIR, Station, User
+from app.sequences import next_number, render
+
+from tests.conftest import add_station
+
+THREADS = 8
+REGISTRATIONS = 15
+
+
+@pytest.fixture
+def stations(app):
+    sequences._blocks.clear()  # Blocks reserved against another test's database
+    with app.app_context():
+        first, second = add_station('First Station'), add_station('Second Station')
+        db.session.get(Station, second).fir_prefix_format = 'NND/{num}/{year}'
+        db.session.commit()
+    yield first, second
+    sequences._blocks.clear()
+
+
+def register(app, station_id, count, errors):
+    # What clerk.register_fir does, without the HTTP round trip
+    try:
+        with app.app_context():
+            station = db.session.get(Station, station_id)
+            clerk = User.query.filter_by(station_id=station_id, role='clerk').one()
+            for _ in range(count):
+                fir_number = next_number('fir', station)
+                case = Case(station_id=station_id, case_number=next_number('case', station),
+                            title=f'FIR Case {fir_number}', description='Stress', created_by_id=clerk.id)
+                db.session.add(case)
+                db.session.flush()
+                db.session.add(FIR(station_id=station_id, fir_number=fir_number, case_id=case.id,
+                                   filed_by_id=clerk.id, details='Stress'))
+                db.session.commit()
+    except Exception as exc:  # Reported by the test thread
+        errors.append(exc)
+
+
+def register_concurrently(app, station_ids):
+    errors = []
+    threads = [threading.Thread(target=register, args=(app, station_ids[i % len(station_ids)], REGISTRATIONS, errors))
+               for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def numbers(column, **filters):
+    return sorted(db.session.scalars(db.select(column).filter_by(**filters)))
+
+
+def expected(kind, series, count):
+    year = sequences.datetime.now().year
+    return sorted(render(kind, series, year, n) for n in range(1, count + 1))
+
+
+@pytest.mark.parametrize('block_size', [1, 5])
+def test_concurrent_registrations(app, stations, block_size):
+    app.config['SEQUENCE_BLOCK_SIZE'] = block_size
+    register_concurrently(app, stations)
+
+    first, second = stations
+    per_station = THREADS // 2 * REGISTRATIONS
+    with app.app_context():
+        # Case numbers share one series; each FIR format counts on its own
+        assert numbers(Case.case_number) == expected('case', 'CASE-{year}-{num}', THREADS * REGISTRATIONS)
+        assert numbers(FIR.fir_number, station_id=first) == expected('fir', 'FIR-{year}-{num}', per_station)
+        assert numbers(FIR.fir_number, station_id=second) == expected('fir', 'NND/{num}/{year}', per_station)
+
+
+def test_allocates_inside_a_written_transaction(app, stations):
+    with app.app_context():
+        station = db.session.get(Station, stations[0])
+        clerk = User.query.filter_by(station_id=station.id, role='clerk').one()
+        assert not sequences._session_writing()
+        db.session.add(Case(station_id=station.id, case_number=next_number('case', station),
+                            title='First', description='Stress', created_by_id=clerk.id))
+        db.session.flush()
+        # Holding the write lock: a second connection would wait for us forever
+        assert sequences._session_writing()
+        db.session.add(Case(station_id=station.id, case_number=next_number('case', station),
+                            title='Second', description='Stress', created_by_id=clerk.id))
+        db.session.commit()
+        assert not sequences._session_writing()
+        assert numbers(Case.case_number) == expected('case', 'CASE-{year}-{num}', 2)
@@ -0,0 +1,67 @@
+"""
+The statement guard (app/statement_guard.py) is on in the test config: the
+case page and the dashboards must stay within their statement_limit budgets
+however many participants, evidence items, FIRs and tasks a case has.
+"""
+import pytest
+
+from app import db
+from app.models import Case, Evidence, FIR, Participant, Task, User
+from app.statement_guard import TooManyStatements
+
+from tests.conftest import add_station, login
+
+ROWS = 40
+
+
+@pytest.fixture
+def busy_case(app):
+    with app.app_context():
+        station_id = add_station()
+        users = {u.role: u for u in User.query.filter_by(station_id=station_id)}
+        case = Case(station_id=station_id, case_number='BUSY-1', title='Busy case', description='Budget test',
+                    created_by_id=users['clerk'].id, assigned_officer_id=users['inspector'].id,
+                    officers=[users['officer'], users['io']])
+        # A custodian and an assignee of their own per row, so a lazy load per
+        # row would show
+        staff = [User(username=f'busy_{i}', email=f'busy_{i}@test.police.gov', role='officer',
+                      full_name=f'Officer {i}', station_id=station_id, password_hash='!')
+                 for i in range(2 * ROWS)]
+        db.session.add_all([case, *staff])
+        db.session.flush()
+        for i, (custodian, assignee) in enumerate(zip(staff[:ROWS], staff[ROWS:])):
+            case.participants.append(Participant(name=f'Witness {i}', type='Witness'))
+            db.session.add_all([
+                Evidence(station_id=station_id, case_id=case.id, description=f'Item {i}',
+                         custodian_id=custodian.id),
+                FIR(station_id=station_id, fir_number=f'BUSY-FIR-{i}', case_id=case.id,
+                    filed_by_id=users['clerk'].id, details='Budget test'),
+                Task(station_id=station_id, case_id=case.id, title=f'Task {i}',
+                     assigned_to_id=assignee.id, assigned_by_id=users['inspector'].id),
+            ])
+        db.session.commit()
+        return station_id, case.id
+
+
+@pytest.mark.parametrize('role, url', [
+    ('admin', '/cases/{case_id}'),
+    ('io', '/cases/{case_id}'),
+    ('admin', '/dashboard/admin'),
+    ('inspector', '/dashboard/inspector'),
+    ('officer', '/dashboard/officer'),
+])
+def test_pages_stay_within_budget(app, client, busy_case, role, url):
+    station_id, case_id = busy_case
+    login(client, f'{role}_{station_id}')
+    url = url.format(case_id=case_id)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert app.view_functions[app.url_map.bind('').match(url)[0]].statement_limit < 30
+
+
+def test_guard_fails_a_request_over_budget(app, client, busy_case, monkeypatch):
+    station_id, case_id = busy_case
+    login(client, f'admin_{station_id}')
+    monkeypatch.setattr(app.view_functions['cases.case_detail'], 'statement_limit', 3)
+    with pytest.raises(TooManyStatements):
+        client.get(f'/cases/{case_id}')